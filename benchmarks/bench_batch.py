@@ -0,0 +1,43 @@
+"""Batch throughput (symbols per second) across `--concurrency` levels.
+
+Runs `info` fetches through `stockcli.runner.run_many` against the local
+stand-in server, with the response cache disabled.
+
+    python -m benchmarks.bench_batch --symbols 200 --latency 0.05
+"""
+import argparse
+import os
+import time
+import warnings
+
+from benchmarks import standin
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--symbols', type=int, default=200)
+    parser.add_argument('--latency', type=float, default=0.05, help='stand-in response time in seconds')
+    parser.add_argument('--dataset', default='info')
+    parser.add_argument('--levels', default='1,2,4,8,16,32')
+    args = parser.parse_args()
+
+    warnings.simplefilter('ignore')
+    server = standin.serve(latency=args.latency)
+    os.environ['STOCKCLI_YAHOO_URL'] = server.url
+
+    from stockcli import cache, data
+    from stockcli.runner import run_many
+    cache.enabled = False
+    symbols = [f'S{i:04d}' for i in range(args.symbols)]
+
+    print(f"{'concurrency':>12}{'seconds':>10}{'symbols/s':>12}{'failed':>8}")
+    for level in map(int, args.levels.split(',')):
+        start = time.perf_counter()
+        failed = sum(error is not None for _, _, error in run_many(lambda s: data.get(s, args.dataset), symbols, level))
+        elapsed = time.perf_counter() - start
+        print(f"{level:>12}{elapsed:>10.2f}{len(symbols) / elapsed:>12.1f}{failed:>8}")
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
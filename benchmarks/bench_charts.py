@@ -0,0 +1,49 @@
+"""Charts per second, and per core, of `chart --out` rendering.
+
+Renders --charts synthetic 5m histories of --bars bars each to image files,
+once per worker count, and once more without downsampling on one worker:
+
+    python -m benchmarks.bench_charts --charts 32 --bars 4680
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from tests.synthetic import history
+
+
+def bench(charts, bars, workers, max_bars, image_format='png'):
+    """Charts per second of rendering `charts` histories on `workers` processes."""
+    from stockcli import charts as render
+    hist = history(bars)
+    with tempfile.TemporaryDirectory() as out:
+        start = time.perf_counter()
+        results = list(render.save(((f'S{i:03d}', hist) for i in range(charts)), out, '5m', image_format, workers, max_bars))
+        elapsed = time.perf_counter() - start
+    errors = [error for _, _, error in results if error is not None]
+    if errors:
+        raise errors[0]
+    return charts / elapsed
+
+
+def main():
+    from stockcli.charts import MAX_BARS
+    cores = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--charts', type=int, default=4 * cores)
+    parser.add_argument('--bars', type=int, default=4680, help='bars per chart (4680: 60 days of 5m bars)')
+    parser.add_argument('--image-format', default='png')
+    args = parser.parse_args()
+
+    counts = sorted({1, 2, cores} | {n for n in (4, 8, 16) if n < cores})
+    print(f"{'workers':>8}{'max bars':>10}{'charts/s':>10}{'per core':>10}")
+    for workers in counts:
+        rate = bench(args.charts, args.bars, workers, MAX_BARS, args.image_format)
+        print(f'{workers:>8}{MAX_BARS:>10}{rate:>10.2f}{rate / min(workers, cores):>10.2f}')
+    rate = bench(args.charts, args.bars, 1, 0, args.image_format)
+    print(f'{1:>8}{"all":>10}{rate:>10.2f}{rate:>10.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""Bars per second of the indicator engine, on 1M-bar series and stacked symbols.
+
+For each default indicator it times
+  one call     over --bars bars of one symbol
+  stacked      one call over --symbols symbols of --stacked-bars bars each
+  update       appending one bar to the one-call state (O(new bars))
+
+    python -m benchmarks.bench_indicators --bars 1000000
+"""
+import argparse
+import time
+
+from stockcli import indicators
+from tests.synthetic import history
+
+
+def timed(function, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench(spec, bars, symbols, stacked_bars, repeat=3):
+    """Seconds of one call, one stacked call and one single-bar update of `spec`."""
+    one = indicators.arrays(history(bars), sessions=True)
+    many = indicators.stack([history(stacked_bars, seed=i) for i in range(symbols)], sessions=True)
+    engine = indicators.Engine([indicators.parse(spec)])
+    call = timed(lambda: indicators.Engine([indicators.parse(spec)]).update(one), repeat)
+    stacked = timed(lambda: indicators.Engine([indicators.parse(spec)]).update(many), repeat)
+    engine.update(one)
+    last = {name: values[-1:] for name, values in one.items()}
+    update = timed(lambda: engine.update(last), repeat * 100)
+    return call, stacked, update
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--bars', type=int, default=1_000_000)
+    parser.add_argument('--symbols', type=int, default=500)
+    parser.add_argument('--stacked-bars', type=int, default=2000, help='bars per stacked symbol')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'indicator':<14}{'call (s)':>10}{'Mbars/s':>9}{'stacked (s)':>13}{'Mbars/s':>9}{'update (us)':>13}")
+    for spec in indicators.DEFAULT:
+        call, stacked, update = bench(spec, args.bars, args.symbols, args.stacked_bars, args.repeat)
+        print(f'{spec:<14}{call:>10.3f}{args.bars / call / 1e6:>9.1f}{stacked:>13.3f}'
+              f'{args.symbols * args.stacked_bars / stacked / 1e6:>9.1f}{update * 1e6:>13.1f}')
+
+
+if __name__ == '__main__':
+    main()
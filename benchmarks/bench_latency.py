@@ -0,0 +1,58 @@
+"""Per-command latency: fixed-sleep spinner threads vs `stockcli.runner.run`.
+
+The old commands started a non-daemon spinner thread that slept for a fixed
+time, so the process could not finish before that sleep ended. This replays
+that pattern next to the runner for every command, using a simulated fetch.
+
+    python -m benchmarks.bench_latency --fetch-latency 0.2
+"""
+import argparse
+import threading
+import time
+
+from stockcli.runner import run
+
+# Spinner sleep each command used before the runner was introduced
+OLD_SPINNER_SLEEP = {
+    'markets': 2, 'info': 5, 'chart': 2, 'actions': 0.5, 'splits': 0.5,
+    'finance': 5, 'holders': 5, 'institutional-holders': 5, 'balance-sheet': 5,
+    'cashflow': 5, 'earning': 5, 'sustainability': 5, 'recommendations': 5,
+    'calendar': 5, 'news': 0.5,
+}
+
+
+def old_pattern(fetch, sleep):
+    def spinner():
+        time.sleep(sleep)
+    t1 = threading.Thread(target=fetch)
+    t2 = threading.Thread(target=spinner)
+    t1.start()
+    t2.start()
+    t1.join()
+    # The interpreter waits for every non-daemon thread before exiting
+    t2.join()
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--fetch-latency', type=float, default=0.2, help='simulated fetch time in seconds')
+    args = parser.parse_args()
+
+    def fetch():
+        time.sleep(args.fetch_latency)
+
+    print(f"{'command':<24}{'before (s)':>12}{'after (s)':>12}{'speedup':>10}")
+    for command, sleep in OLD_SPINNER_SLEEP.items():
+        before = timed(old_pattern, fetch, sleep)
+        after = timed(run, fetch)
+        print(f"{command:<24}{before:>12.3f}{after:>12.3f}{before / after:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""Seconds of `portfolio` over --symbols synthetic markets of --days daily bars.
+
+Times each phase the command goes through once the bars are local:
+  load      reading the closes and dividends of every market from the history store
+  align     building the (markets, days) price and dividend matrices
+  metrics   returns, volatility, drawdowns and beta of every market
+  matrix    the covariance and correlation matrices
+  rolling   the rolling metrics of the portfolio
+
+    python -m benchmarks.bench_portfolio --symbols 1000 --days 2520
+"""
+import argparse
+import os
+import resource
+import tempfile
+import time
+
+from tests.synthetic import closes
+
+
+def store_all(series):
+    """Save `series` to the history store as the daily bars of S0000, S0001..."""
+    import numpy as np
+    import pandas as pd
+    from stockcli import store
+    for i, (days, prices) in enumerate(series):
+        frame = pd.DataFrame({column: prices for column in store.COLUMNS}, index=pd.DatetimeIndex(days, tz='UTC'))
+        frame['Volume'] = np.ones(len(days))
+        frame['Dividends'] = np.zeros(len(days))
+        store.save(f'S{i:04d}', '1d', frame, {'tz': 'America/New_York', 'covered_from': None, 'synced': time.time()})
+
+
+def bench(symbols, days, window=63):
+    """Seconds of every phase, and the peak RSS in MiB."""
+    import numpy as np
+    from stockcli import portfolio, store
+    series = closes(symbols, days)
+    saved = os.environ.get('STOCKCLI_CACHE_DIR')
+    with tempfile.TemporaryDirectory() as cache_dir:
+        os.environ['STOCKCLI_CACHE_DIR'] = cache_dir
+        try:
+            store_all(series)
+            del series
+            timings = {}
+            start = time.perf_counter()
+            loaded = []
+            for i in range(symbols):
+                hist, _ = store.load(f'S{i:04d}', '1d')
+                loaded.append((hist.index.tz_localize(None).values, hist['Close'].to_numpy(), hist['Dividends'].to_numpy()))
+            timings['load'] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            dates, prices = portfolio.matrix([s[:2] for s in loaded])
+            _, dividends = portfolio.matrix([s[::2] for s in loaded])
+            timings['align'] = time.perf_counter() - start
+
+            weights = np.full(symbols, 1 / symbols)
+            start = time.perf_counter()
+            returns = portfolio.returns(prices, dividends)
+            portfolio.metrics([f'S{i:04d}' for i in range(symbols)], weights, returns, returns[0], window)
+            timings['metrics'] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            portfolio.correlation(portfolio.covariance(returns))
+            timings['matrix'] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            portfolio.rolling(dates[1:], portfolio.combine(returns, weights), returns[0], window)
+            timings['rolling'] = time.perf_counter() - start
+        finally:
+            if saved is None:
+                os.environ.pop('STOCKCLI_CACHE_DIR')
+            else:
+                os.environ['STOCKCLI_CACHE_DIR'] = saved
+    return timings, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--symbols', type=int, default=1000)
+    parser.add_argument('--days', type=int, default=2520)
+    parser.add_argument('--window', type=int, default=63)
+    args = parser.parse_args()
+    timings, rss = bench(args.symbols, args.days, args.window)
+    for phase, seconds in timings.items():
+        print(f'{phase:<8}{seconds:>8.3f} s')
+    print(f"{'total':<8}{sum(timings.values()):>8.3f} s, peak RSS {rss:.0f} MiB, "
+          f'price matrix {args.symbols * args.days * 8 / 2 ** 20:.0f} MiB')
+
+
+if __name__ == '__main__':
+    main()
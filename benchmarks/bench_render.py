@@ -0,0 +1,76 @@
+"""Table construction: per-row `iterrows()` + `str()` vs the column-wise renderer.
+
+Builds an `actions`-shaped frame (Date, Dividends, Stock Splits) and a wider
+statement-shaped one, then times building the rich/prettytable objects.
+Pass --print to also time writing the rich table to a null console.
+
+    python -m benchmarks.bench_render --rows 10000,100000
+"""
+import argparse
+import io
+import time
+
+import numpy as np
+import pandas as pd
+
+from stockcli import render
+
+
+def frames(rows):
+    dates = pd.date_range('1900-01-01', periods=rows, freq='D', tz='America/New_York')
+    rng = np.random.default_rng(0)
+    actions = pd.DataFrame({'Date': dates, 'Dividends': rng.random(rows).round(4),
+                            'Stock Splits': np.where(rng.random(rows) < 0.01, 2.0, 0.0)})
+    wide = pd.DataFrame(rng.random((rows, 6)) * 1e9, columns=[f'c{i}' for i in range(6)])
+    wide.insert(0, 'Attribute', [f'Row {i}' for i in range(rows)])
+    return {'actions': actions, 'statement': wide}
+
+
+def iterrows_rich(df):
+    from rich.table import Table
+    headers = df.columns.values.tolist()
+    table = Table(*[str(h) for h in headers])
+    for index, row in df.iterrows():
+        table.add_row(*[str(row[h]) for h in headers], end_section=True)
+    return table
+
+
+def iterrows_color(df):
+    from prettytable.colortable import ColorTable, Themes
+    from prettytable import ALL
+    headers = df.columns.values.tolist()
+    table = ColorTable(theme=Themes.OCEAN)
+    table.field_names = headers
+    table.hrules = ALL
+    for index, row in df.iterrows():
+        table.add_row([row[headers[i]] for i in range(len(row))])
+    return table
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', default='10000,100000')
+    parser.add_argument('--print', action='store_true', help='also time printing the rich table')
+    args = parser.parse_args()
+
+    print(f"{'frame':<12}{'rows':>8}{'style':>7}{'iterrows (s)':>14}{'columns (s)':>13}{'speedup':>9}")
+    for rows in map(int, args.rows.split(',')):
+        for name, df in frames(rows).items():
+            for style, old in (('rich', iterrows_rich), ('color', iterrows_color)):
+                before, _ = timed(old, df)
+                after, table = timed(render.build, df, style)
+                print(f"{name:<12}{rows:>8}{style:>7}{before:>14.3f}{after:>13.3f}{before / after:>8.1f}x")
+                if args.print and style == 'rich':
+                    from rich.console import Console
+                    printed, _ = timed(Console(file=io.StringIO(), width=120).print, table)
+                    print(f"{'':<12}{'':>8}{'':>7}  print: {printed:.3f}s")
+
+
+if __name__ == '__main__':
+    main()
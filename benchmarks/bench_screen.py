@@ -0,0 +1,49 @@
+"""Milliseconds to load a snapshot of --symbols symbols and screen it.
+
+    python -m benchmarks.bench_screen --symbols 10000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from tests.synthetic import snapshot
+
+WHERE = "trailingPE < 15 and marketCap > 10B and sector == 'Technology'"
+SORT = '-marketCap'
+
+
+def bench(symbols, repeat=20):
+    """Best (load, screen) seconds over a snapshot of `symbols` symbols saved to disk."""
+    from stockcli import screen
+    saved = os.environ.get('STOCKCLI_CACHE_DIR')
+    with tempfile.TemporaryDirectory() as cache_dir:
+        os.environ['STOCKCLI_CACHE_DIR'] = cache_dir
+        try:
+            screen.save(snapshot(symbols))
+            load = run = float('inf')
+            for _ in range(repeat):
+                start = time.perf_counter()
+                loaded = screen.load()
+                middle = time.perf_counter()
+                screen.evaluate(loaded, WHERE, SORT)
+                load, run = min(load, middle - start), min(run, time.perf_counter() - middle)
+        finally:
+            if saved is None:
+                os.environ.pop('STOCKCLI_CACHE_DIR')
+            else:
+                os.environ['STOCKCLI_CACHE_DIR'] = saved
+    return load, run
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--symbols', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    load, run = bench(args.symbols, args.repeat)
+    print(f'{args.symbols} symbols: load {load * 1000:.2f} ms, screen {run * 1000:.2f} ms ({WHERE}, sort {SORT})')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,312 @@
+"""Local stand-in for the Yahoo endpoints yfinance uses and the screener views.
+
+Prices are a deterministic function of (symbol, timestamp), so every run and
+every window of the same symbol agree. Symbols starting with `ZZ` are unknown.
+Recorded responses can be served instead: with `--fixtures DIR`, a request for
+`/v8/finance/chart/AAPL` is answered with `DIR/v8/finance/chart/AAPL` (or the
+same path plus `.json` or `.html`) when that file exists.
+
+No recordings ship with the repository, so the suite and the tests run on the
+generated responses. Yahoo's responses can't be redistributed, and a
+recording only stays accurate until Yahoo changes the format. To check stockcli
+against the real thing, save responses with `curl` into a directory laid out
+like the URL paths and pass it with `--fixtures`.
+
+    python -m benchmarks.standin --port 8800 --latency 0.05
+    STOCKCLI_YAHOO_URL=http://127.0.0.1:8800 stockcli info AAPL
+    STOCKCLI_MARKETS_URL=http://127.0.0.1:8800 stockcli markets --all
+"""
+import argparse
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+from collections import Counter
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+DAY = 86400
+RANGES = {'1d': 1, '5d': 5, '1mo': 30, '3mo': 90, '6mo': 180, '1y': 365, '2y': 730,
+          '5y': 5 * 365, '10y': 10 * 365, 'ytd': 365, 'max': 20 * 365}
+STEPS = {'1m': 60, '2m': 120, '5m': 300, '15m': 900, '30m': 1800, '60m': 3600, '90m': 5400,
+         '1h': 3600, '1d': DAY, '5d': 5 * DAY, '1wk': 7 * DAY, '1mo': 30 * DAY, '3mo': 90 * DAY}
+VIEWS = ['trending-tickers', 'most-active', 'gainers', 'losers']
+
+
+def seed(symbol):
+    return int(hashlib.md5(symbol.encode()).hexdigest()[:8], 16)
+
+
+def known(symbol):
+    return not symbol.upper().startswith('ZZ')
+
+
+def price(symbol, ts):
+    s = seed(symbol)
+    base = 20 + s % 400
+    return round(base * (1 + 0.2 * math.sin(ts / (30 * DAY) + s) + 0.02 * math.sin(ts / 3600 + s)), 4)
+
+
+def split_ts(symbol):
+    # One 2:1 split per symbol, somewhere in the last ten years
+    return (int(time.time()) // DAY - 10 * 365 + seed(symbol) % (10 * 365)) * DAY
+
+
+def chart(symbol, query):
+    if not known(symbol):
+        return {'chart': {'result': None, 'error': {'code': 'Not Found', 'description': 'No data found, symbol may be delisted'}}}
+    interval = query.get('interval', '1d')
+    step = STEPS.get(interval, DAY)
+    now = int(time.time())
+    if 'period1' in query:
+        start, end = int(query['period1']), int(query.get('period2', now))
+    else:
+        start, end = now - RANGES.get(query.get('range', '1mo'), 30) * DAY, now
+    # Intraday bars are only served for the last 60 days, daily for 20 years
+    start = max(start, now - (60 * DAY if step < DAY else 20 * 365 * DAY))
+    first = (start // step + 1) * step if start % step else start
+    stamps = list(range(first, end, step))
+    closes = [price(symbol, ts) for ts in stamps]
+    rnd = random.Random(seed(symbol))
+    opens = [round(c * (1 + rnd.uniform(-0.01, 0.01)), 4) for c in closes]
+    highs = [round(max(o, c) * 1.01, 4) for o, c in zip(opens, closes)]
+    lows = [round(min(o, c) * 0.99, 4) for o, c in zip(opens, closes)]
+    volumes = [1000000 + (seed(symbol) + ts) % 500000 for ts in stamps]
+    events = {}
+    if query.get('events') and stamps:
+        divs = {str(ts): {'amount': 0.25, 'date': ts} for ts in stamps if ts // DAY % 91 == 0}
+        split = split_ts(symbol)
+        splits = {str(split): {'date': split, 'numerator': 2, 'denominator': 1, 'splitRatio': '2:1'}} if start <= split < end else {}
+        events = {'dividends': divs} if divs else {}
+        if splits:
+            events['splits'] = splits
+    result = {
+        'meta': {'symbol': symbol, 'currency': 'USD', 'exchangeTimezoneName': 'America/New_York', 'priceHint': 2,
+                 'regularMarketPrice': price(symbol, now)},
+        'timestamp': stamps,
+        'indicators': {'quote': [{'open': opens, 'high': highs, 'low': lows, 'close': closes, 'volume': volumes}],
+                       'adjclose': [{'adjclose': closes}]},
+    }
+    if events:
+        result['events'] = events
+    return {'chart': {'result': [result], 'error': None}}
+
+
+def quote(symbol, now=None):
+    now = int(time.time()) if now is None else now
+    s = seed(symbol)
+    last = price(symbol, now)
+    prev = price(symbol, now - DAY)
+    return {
+        'symbol': symbol, 'shortName': f'{symbol} Corp', 'quoteType': 'EQUITY', 'currency': 'USD',
+        'marketState': 'REGULAR', 'regularMarketPrice': last, 'regularMarketPreviousClose': prev,
+        'regularMarketChange': round(last - prev, 4), 'regularMarketChangePercent': round((last - prev) / prev * 100, 4),
+        'regularMarketVolume': 1000000 + s % 500000, 'regularMarketTime': now,
+        'marketCap': (s % 3000 + 1) * 10 ** 9, 'trailingPE': round(5 + s % 60 + (s % 100) / 100, 2),
+        'forwardPE': round(4 + s % 50 + (s % 10) / 10, 2), 'dividendYield': round((s % 50) / 1000, 4),
+        'fiftyTwoWeekHigh': round(last * 1.3, 2), 'fiftyTwoWeekLow': round(last * 0.7, 2),
+        'beta': round(0.5 + (s % 150) / 100, 2), 'sector': ['Technology', 'Energy', 'Healthcare', 'Financial Services'][s % 4],
+    }
+
+
+def statement(symbol, kind, quarterly):
+    s = seed(symbol)
+    now = int(time.time())
+    step = 91 * DAY if quarterly else 365 * DAY
+    rows = []
+    for i in range(4):
+        scale = (s % 90 + 10) * 10 ** 8 * (1 - 0.05 * i) / (4 if quarterly else 1)
+        row = {'maxAge': 1, 'endDate': now - now % DAY - (i + 1) * step}
+        if kind == 'incomeStatementHistory':
+            row.update(totalRevenue=int(scale), grossProfit=int(scale * 0.4), operatingIncome=int(scale * 0.25),
+                       netIncome=int(scale * 0.18), costOfRevenue=int(scale * 0.6))
+        elif kind == 'balanceSheetStatements':
+            row.update(totalAssets=int(scale * 3), totalLiab=int(scale * 1.8), totalStockholderEquity=int(scale * 1.2),
+                       longTermDebt=int(scale * 0.7), shortLongTermDebt=int(scale * 0.1), cash=int(scale * 0.3))
+        else:
+            row.update(totalCashFromOperatingActivities=int(scale * 0.3), capitalExpenditures=-int(scale * 0.08),
+                       netIncome=int(scale * 0.18), dividendsPaid=-int(scale * 0.03))
+        rows.append(row)
+    return rows
+
+
+def summary_page(symbol, page):
+    if not known(symbol):
+        return '<html><body>not found</body></html>'
+    q = quote(symbol)
+    store = {'maxAge': 1}
+    if page == 'quote':
+        store = {
+            'price': {'regularMarketPrice': q['regularMarketPrice'], 'shortName': q['shortName'], 'currency': 'USD'},
+            'summaryDetail': {k: q[k] for k in ('marketCap', 'trailingPE', 'forwardPE', 'dividendYield', 'fiftyTwoWeekHigh',
+                                                'fiftyTwoWeekLow', 'beta', 'regularMarketVolume', 'regularMarketPreviousClose')},
+            'quoteType': {'symbol': symbol, 'shortName': q['shortName'], 'quoteType': 'EQUITY'},
+            'summaryProfile': {'sector': q['sector'], 'website': f'https://www.{symbol.lower()}.example'},
+            'esgScores': {'totalEsg': 20.5, 'environmentScore': 5.1, 'socialScore': 9.2, 'governanceScore': 6.2,
+                          'ratingYear': 2022, 'ratingMonth': 9, 'maxAge': 86400},
+            'calendarEvents': {'earnings': {'earningsDate': [int(time.time()) + 30 * DAY], 'earningsAverage': 1.2,
+                                            'earningsLow': 1.0, 'earningsHigh': 1.4}},
+            'upgradeDowngradeHistory': {'history': [
+                {'epochGradeDate': int(time.time()) - i * 7 * DAY, 'firm': f'Firm {i}', 'toGrade': 'Buy',
+                 'fromGrade': 'Hold', 'action': 'up'} for i in range(5)]},
+        }
+    elif page == 'financials':
+        for key, rows in (('incomeStatementHistory', 'incomeStatementHistory'),
+                          ('balanceSheetHistory', 'balanceSheetStatements'),
+                          ('cashflowStatementHistory', 'cashflowStatements')):
+            kind = rows if rows != 'cashflowStatements' else 'cashflow'
+            store[key] = {rows: statement(symbol, kind, False)}
+            store[key + 'Quarterly'] = {rows: statement(symbol, kind, True)}
+        seedv = seed(symbol) % 90 + 10
+        store['earnings'] = {'financialCurrency': 'USD', 'financialsChart': {
+            'yearly': [{'date': 2019 + i, 'revenue': seedv * 10 ** 9 * (1 + i / 10), 'earnings': seedv * 10 ** 8 * (1 + i / 10)} for i in range(4)],
+            'quarterly': [{'date': f'{i + 1}Q2022', 'revenue': seedv * 10 ** 8 * (1 + i / 10), 'earnings': seedv * 10 ** 7 * (1 + i / 10)} for i in range(4)],
+        }}
+    main = {'context': {'dispatcher': {'stores': {'QuoteSummaryStore': store}}}}
+    return f'<html><script>root.App.main = {json.dumps(main)};\n}}(this));</script></html>'
+
+
+def holders_page(symbol):
+    if not known(symbol):
+        return '<html><body>not found</body></html>'
+    major = ''.join(f'<tr><td>{v}</td><td>{k}</td></tr>' for k, v in (
+        ('% of Shares Held by All Insider', '0.07%'), ('% of Shares Held by Institutions', '60.1%'),
+        ('% of Float Held by Institutions', '60.2%'), ('Number of Institutions Holding Shares', '5,000')))
+    inst = ''.join(f'<tr><td>Fund {i}</td><td>{1000000 * (10 - i)}</td><td>Sep 29, 2022</td><td>{7 - i / 2}%</td><td>{10 ** 9 * (10 - i)}</td></tr>'
+                   for i in range(10))
+    return (f'<html><table>{major}</table><table><thead><tr><th>Holder</th><th>Shares</th><th>Date Reported</th>'
+            f'<th>% Out</th><th>Value</th></tr></thead><tbody>{inst}</tbody></table></html>')
+
+
+def news(symbol):
+    now = int(time.time())
+    # Articles are shared between symbols, like the real feed
+    return {'news': [{'uuid': f'news-{(seed(symbol) + i) % 40}', 'title': f'Headline {(seed(symbol) + i) % 40}',
+                      'publisher': 'Stand-in Wire', 'link': f'https://news.example/{(seed(symbol) + i) % 40}',
+                      'providerPublishTime': now - i * 3600, 'type': 'STORY', 'relatedTickers': [symbol]} for i in range(8)]}
+
+
+def screener(view, now):
+    symbols = [f'S{i:03d}' for i in range(100)]
+    rows = []
+    for sym in symbols:
+        q = quote(sym, now)
+        rows.append({'Symbol': sym, 'Name': q['shortName'], 'Price': q['regularMarketPrice'],
+                     'Change': q['regularMarketChange'], '% Change': q['regularMarketChangePercent'],
+                     'Volume': q['regularMarketVolume'], 'Market Cap': q['marketCap']})
+    rows.sort(key=lambda r: r['% Change'], reverse=view != 'losers')
+    return rows
+
+
+class StandIn(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency=0.0, error_rate=0.0, fixtures=None):
+        super().__init__(address, Handler)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.fixtures = Path(fixtures) if fixtures else None
+        self.hits = Counter()
+        self.random = random.Random(0)
+
+    @property
+    def url(self):
+        return f'http://{self.server_address[0]}:{self.server_address[1]}'
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out as separate writes; don't let Nagle hold the body back
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        parts = [p for p in url.path.split('/') if p]
+        server = self.server
+        server.hits[parts[0] if parts else ''] += 1
+        if server.latency:
+            time.sleep(server.latency)
+        if server.error_rate and server.random.random() < server.error_rate:
+            return self.send(503, 'text/plain', 'Will be back soon')
+        recorded = self.recorded(url.path)
+        if recorded is not None:
+            return self.send(200, *recorded)
+        if url.path.startswith('/v8/finance/chart/'):
+            return self.send_json(chart(parts[-1], query))
+        if url.path.startswith('/v7/finance/quote'):
+            symbols = [s for s in query.get('symbols', '').split(',') if s and known(s)]
+            return self.send_json({'quoteResponse': {'result': [quote(s) for s in symbols], 'error': None}})
+        if url.path.startswith('/v1/finance/search'):
+            return self.send_json(news(query.get('q', '')))
+        if url.path.startswith('/ws/fundamentals-timeseries'):
+            return self.send_json({'timeseries': {'result': [{}], 'error': None}})
+        if parts[:1] == ['quote'] and len(parts) >= 2:
+            page = parts[2] if len(parts) > 2 else 'quote'
+            if page == 'holders':
+                return self.send(200, 'text/html', holders_page(parts[1]))
+            return self.send(200, 'text/html', summary_page(parts[1], page))
+        if parts and parts[0] in VIEWS:
+            # The views are refreshed once a minute and answer conditional requests
+            now = int(time.time()) // 60 * 60
+            body = json.dumps(screener(parts[0], now))
+            headers = {'ETag': f'"{hashlib.md5(body.encode()).hexdigest()}"',
+                       'Last-Modified': formatdate(now, usegmt=True)}
+            if self.headers.get('If-None-Match') == headers['ETag']:
+                return self.send(304, 'application/json', '', headers)
+            return self.send(200, 'application/json', body, headers)
+        self.send(404, 'text/plain', 'not found')
+
+    def recorded(self, path):
+        fixtures = self.server.fixtures
+        if fixtures is None:
+            return None
+        for suffix, content_type in (('', 'application/json'), ('.json', 'application/json'), ('.html', 'text/html')):
+            candidate = fixtures / (path.strip('/') + suffix)
+            if candidate.is_file() and fixtures.resolve() in candidate.resolve().parents:
+                return content_type, candidate.read_text()
+        return None
+
+    def send_json(self, payload):
+        self.send(200, 'application/json', json.dumps(payload))
+
+    def send(self, status, content_type, body, headers=None):
+        body = body.encode()
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def serve(host='127.0.0.1', port=0, latency=0.0, error_rate=0.0, fixtures=None):
+    """Start a stand-in on a background thread and return the server."""
+    server = StandIn((host, port), latency, error_rate, fixtures)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8800)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every response')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of requests answered with 503')
+    parser.add_argument('--fixtures', help='directory of recorded responses served before the generated ones')
+    args = parser.parse_args()
+    server = StandIn((args.host, args.port), args.latency, args.error_rate, args.fixtures)
+    print(f'serving on {server.url}')
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
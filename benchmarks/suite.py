@@ -0,0 +1,192 @@
+"""Every command against the local stand-in: cold start, first output, latency, peak RSS, throughput.
+
+Each command runs in a fresh `stockcli` process with an empty cache, pointed at
+a stand-in server started by the suite. Per command it reports
+
+  cold start     `stockcli COMMAND --help`: interpreter start, imports, parsing
+  first output   spawn to the first byte on stdout
+  total          spawn to exit
+  peak RSS       of the command process
+  throughput     symbols per second, for the batch run over --batch symbols
+
+Timings are medians over --repeat runs. --save writes the results as a
+baseline; --compare fails (exit code 1) when a metric regressed by more than
+--threshold against a saved baseline, or has no baseline at all, so CI can gate
+on it. Baselines are only comparable on the same hardware; record one on the
+CI runner itself:
+
+    python -m benchmarks.suite --save benchmarks/baseline.json
+    python -m benchmarks.suite --compare benchmarks/baseline.json --threshold 0.25
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+
+from benchmarks import standin
+
+# Command -> arguments of a single-symbol run
+COMMANDS = {
+    'markets': ['gainers'],
+    'info': ['AAPL'],
+    'screen': ['AAPL', 'MSFT', '--where', 'marketCap > 1B'],
+    'chart': ['AAPL'],
+    'indicators': ['AAPL'],
+    'portfolio': ['AAPL=0.6', 'MSFT=0.4'],
+    'actions': ['AAPL'],
+    'splits': ['AAPL'],
+    'finance': ['AAPL'],
+    'holders': ['AAPL'],
+    'institutional-holders': ['AAPL'],
+    'balance-sheet': ['AAPL'],
+    'cashflow': ['AAPL'],
+    'earning': ['AAPL'],
+    'statements': ['AAPL'],
+    'sustainability': ['AAPL'],
+    'recommendations': ['AAPL'],
+    'calendar': ['AAPL'],
+    'news': ['AAPL'],
+    'watch': ['AAPL', 'MSFT', '--count', '3', '--interval', '0'],
+    'cache': ['stats'],
+}
+# Commands that also get a batch run over many symbols
+BATCH = ['info', 'actions', 'finance', 'balance-sheet', 'statements', 'indicators', 'portfolio', 'news']
+# Lower is better for every metric but throughput
+HIGHER_IS_BETTER = {'throughput'}
+# Differences below these are noise whatever the threshold (seconds, KiB, symbols/s)
+SLACK = {'cold_start': 0.15, 'first_output': 0.15, 'total': 0.15, 'batch_total': 0.3, 'peak_rss_kib': 8 * 1024, 'throughput': 1.0}
+
+ENTRY = 'import sys; from stockcli.main import app; sys.argv[0] = "stockcli"; app()'
+
+
+def measure(args, env):
+    """Run `stockcli *args` once: (first output, total) in seconds, peak RSS in KiB, exit code."""
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, '-c', ENTRY, *args], env=env,
+                            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    first = proc.stdout.read(1)
+    first_output = time.perf_counter() - start if first else None
+    proc.stdout.read()
+    proc.stdout.close()
+    # wait4 returns the resource usage of this child alone
+    _, status, usage = os.wait4(proc.pid, 0)
+    total = time.perf_counter() - start
+    proc.returncode = os.WEXITSTATUS(status) if os.WIFEXITED(status) else -os.WTERMSIG(status)
+    return first_output, total, usage.ru_maxrss, proc.returncode
+
+
+def environment(server, cache_dir):
+    env = dict(os.environ)
+    env.update({
+        'STOCKCLI_YAHOO_URL': server.url,
+        'STOCKCLI_MARKETS_URL': server.url,
+        'STOCKCLI_CACHE_DIR': cache_dir,
+        # The stand-in never throttles: time the code, not the rate limit
+        'STOCKCLI_RATE': '0',
+        'MPLBACKEND': 'Agg',
+        'COLUMNS': '160',
+    })
+    return env
+
+
+def bench(command, args, server, repeat, batch):
+    """Median metrics of `command` over `repeat` cold-cache runs."""
+    runs = []
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            env = environment(server, cache_dir)
+            start = time.perf_counter()
+            subprocess.run([sys.executable, '-c', ENTRY, command, '--help'], env=env,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            cold_start = time.perf_counter() - start
+        with tempfile.TemporaryDirectory() as cache_dir:
+            first_output, total, rss, code = measure([command, *args], environment(server, cache_dir))
+        run = {'cold_start': cold_start, 'first_output': first_output, 'total': total, 'peak_rss_kib': rss, 'exit_code': code}
+        if command in BATCH:
+            symbols = [f'S{i:03d}' for i in range(batch)]
+            with tempfile.TemporaryDirectory() as cache_dir:
+                _, batch_total, _, _ = measure([command, *symbols], environment(server, cache_dir))
+            run.update({'batch_total': batch_total, 'throughput': batch / batch_total})
+        runs.append(run)
+    result = {}
+    for metric in runs[0]:
+        values = [r[metric] for r in runs if r[metric] is not None]
+        result[metric] = max(values) if metric == 'exit_code' else statistics.median(values) if values else None
+    return result
+
+
+def compare(results, baseline, threshold):
+    """Regressions of `results` against `baseline`, as readable lines."""
+    regressions = []
+    for command, metrics in results.items():
+        if command not in baseline:
+            # Nothing to gate on is a failure too, or new commands would never be checked
+            regressions.append(f'{command}: no baseline, record one with --save')
+            continue
+        for metric, value in metrics.items():
+            if metric not in baseline[command]:
+                regressions.append(f'{command} {metric}: no baseline, record one with --save')
+                continue
+            before = baseline[command][metric]
+            if metric == 'exit_code' or value is None or before is None:
+                continue
+            slack = SLACK.get(metric, 0)
+            if metric in HIGHER_IS_BETTER:
+                worse = value < before * (1 - threshold) and before - value > slack
+            else:
+                worse = value > before * (1 + threshold) and value - before > slack
+            if worse:
+                regressions.append(f'{command} {metric}: {before:.3f} -> {value:.3f}')
+        if metrics.get('exit_code') and not baseline[command].get('exit_code'):
+            regressions.append(f'{command}: exit code {metrics["exit_code"]}')
+    return regressions
+
+
+def fmt(value, width, precision):
+    return f'{"-":>{width}}' if value is None else f'{value:>{width}.{precision}f}'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--commands', default=','.join(COMMANDS), help='comma-separated subset of commands')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--batch', type=int, default=20, help='symbols in the batch runs')
+    parser.add_argument('--latency', type=float, default=0.02, help='stand-in response time in seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of requests answered with 503')
+    parser.add_argument('--fixtures', help='directory of recorded responses for the stand-in')
+    parser.add_argument('--save', help='write the results to this baseline file')
+    parser.add_argument('--compare', help='baseline file to check the results against')
+    parser.add_argument('--threshold', type=float, default=0.25, help='allowed relative regression')
+    args = parser.parse_args()
+
+    warnings.simplefilter('ignore')
+    server = standin.serve(latency=args.latency, error_rate=args.error_rate, fixtures=args.fixtures)
+    results = {}
+    print(f"{'command':<24}{'cold (s)':>10}{'first (s)':>11}{'total (s)':>11}{'RSS (MiB)':>11}{'batch/s':>9}{'exit':>6}")
+    for command in args.commands.split(','):
+        r = results[command] = bench(command, COMMANDS[command], server, args.repeat, args.batch)
+        rss = r['peak_rss_kib'] / 1024
+        print(f"{command:<24}{r['cold_start']:>10.3f}{fmt(r['first_output'], 11, 3)}{r['total']:>11.3f}"
+              f"{rss:>11.1f}{fmt(r.get('throughput'), 9, 1)}{r['exit_code']:>6}")
+    server.shutdown()
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for line in regressions:
+            print(f'REGRESSION {line}')
+        if regressions:
+            sys.exit(1)
+        print(f'No regressions beyond {args.threshold:.0%}.')
+
+
+if __name__ == '__main__':
+    main()
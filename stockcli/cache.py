@@ -0,0 +1,253 @@
+import json
+import os
+import pickle
+import shutil
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import closing, contextmanager
+from pathlib import Path
+
+# Default time-to-live (seconds) of every dataset kept in the cache
+TTLS = {
+    'info': 60,
+    'history': 5 * 60,
+    'actions': 24 * 3600,
+    'splits': 24 * 3600,
+    'financials': 7 * 24 * 3600,
+    'balance_sheet': 7 * 24 * 3600,
+    'cashflow': 7 * 24 * 3600,
+    'earnings': 7 * 24 * 3600,
+    'sustainability': 7 * 24 * 3600,
+    'major_holders': 24 * 3600,
+    'institutional_holders': 24 * 3600,
+    'recommendations': 24 * 3600,
+    'calendar': 24 * 3600,
+    'news': 5 * 60,
+    # Screener views are always revalidated, this only bounds how long a 304 can reuse them
+    'markets': 24 * 3600,
+}
+DEFAULT_TTL = 3600
+# Size cap of the cache file, least recently used entries are evicted above it
+MAX_BYTES = int(os.environ.get('STOCKCLI_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+
+# Set by the global `--no-cache` / `--refresh` options
+enabled = True
+refresh = False
+
+MISS = object()
+
+# Values this process already read or wrote, so a long-running process (the
+# `serve` daemon) doesn't unpickle them again. Disk TTLs still apply.
+MEMORY_ENTRIES = 256
+_memory = OrderedDict()
+_memory_lock = threading.Lock()
+
+
+def cache_dir():
+    if os.environ.get('STOCKCLI_CACHE_DIR'):
+        return Path(os.environ['STOCKCLI_CACHE_DIR'])
+    base = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+    return Path(base) / 'stockcli'
+
+
+@contextmanager
+def connect():
+    path = cache_dir()
+    path.mkdir(parents=True, exist_ok=True)
+    db = sqlite3.connect(path / 'cache.sqlite', timeout=30, isolation_level=None)
+    db.execute('PRAGMA journal_mode=WAL')
+    db.execute('CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, dataset TEXT, created REAL, accessed REAL, size INTEGER, value BLOB)')
+    db.execute('CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER)')
+    # Known-good/known-bad symbols, see stockcli.symbols
+    db.execute('CREATE TABLE IF NOT EXISTS symbols (symbol TEXT PRIMARY KEY, valid INTEGER, checked REAL)')
+    # Token buckets of the hosts, shared by every process, see stockcli.scheduler
+    db.execute('CREATE TABLE IF NOT EXISTS buckets (host TEXT PRIMARY KEY, tokens REAL, updated REAL, rate REAL, paused REAL)')
+    # Articles `news --watchlist` has emitted, see stockcli.feed
+    db.execute('CREATE TABLE IF NOT EXISTS news_seen (id TEXT PRIMARY KEY, published REAL, seen REAL)')
+    with closing(db):
+        yield db
+
+
+def make_key(symbol, dataset, **params):
+    # e.g. "AAPL|history|interval=1d" or "MSFT|balance_sheet|quarterly=True"
+    extra = '|'.join(f'{k}={v}' for k, v in sorted(params.items()) if v is not None)
+    return '|'.join(filter(None, [symbol.upper(), dataset, extra]))
+
+
+def count(db, name):
+    db.execute('INSERT INTO counters VALUES (?, 1) ON CONFLICT(name) DO UPDATE SET value = value + 1', (name,))
+
+
+def hold(key, created, value):
+    with _memory_lock:
+        _memory[key] = (created, value)
+        _memory.move_to_end(key)
+        while len(_memory) > MEMORY_ENTRIES:
+            _memory.popitem(last=False)
+
+
+def get(key, dataset, ttl=None):
+    """Return the cached value of `key`, or `MISS` when absent or older than `ttl`.
+
+    Values are shared with the in-memory copy, callers must not modify them.
+    """
+    ttl = TTLS.get(dataset, DEFAULT_TTL) if ttl is None else ttl
+    with _memory_lock:
+        held = _memory.get(key)
+    with connect() as db:
+        # The disk entry must still be there: it may have been evicted or cleared since
+        if held is not None and time.time() - held[0] <= ttl and \
+                db.execute('UPDATE entries SET accessed = ? WHERE key = ?', (time.time(), key)).rowcount:
+            count(db, 'hits')
+            return held[1]
+        row = db.execute('SELECT created, value FROM entries WHERE key = ?', (key,)).fetchone()
+        if row is None or time.time() - row[0] > ttl:
+            count(db, 'misses')
+            return MISS
+        db.execute('UPDATE entries SET accessed = ? WHERE key = ?', (time.time(), key))
+        count(db, 'hits')
+    value = pickle.loads(row[1])
+    hold(key, row[0], value)
+    return value
+
+
+def put(key, dataset, value):
+    blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    now = time.time()
+    hold(key, now, value)
+    with connect() as db:
+        db.execute('INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)', (key, dataset, now, now, len(blob), blob))
+        evict(db, MAX_BYTES)
+
+
+def evict(db, max_bytes):
+    # Drop least recently used entries until the cache fits in `max_bytes`
+    total = db.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+    removed = 0
+    if total <= max_bytes:
+        return removed
+    for key, size in db.execute('SELECT key, size FROM entries ORDER BY accessed').fetchall():
+        db.execute('DELETE FROM entries WHERE key = ?', (key,))
+        total -= size
+        removed += 1
+        if total <= max_bytes:
+            break
+    return removed
+
+
+def cached(symbol, dataset, loader, ttl=None, **params):
+    """Return `loader()` through the cache, honouring `--no-cache` and `--refresh`.
+
+    Empty results (unknown symbols, missing statements) are never stored.
+    """
+    if not enabled:
+        return loader()
+    key = make_key(symbol, dataset, **params)
+    if not refresh:
+        value = get(key, dataset, ttl)
+        if value is not MISS:
+            return value
+    value = loader()
+    if not is_empty(value):
+        put(key, dataset, value)
+    return value
+
+
+def is_empty(value):
+    if value is None:
+        return True
+    empty = getattr(value, 'empty', None)
+    if isinstance(empty, bool):
+        return empty
+    return len(value) == 0 if hasattr(value, '__len__') else False
+
+
+def save_arrays(folder, arrays, meta):
+    """Write `{name: ndarray}` and the `meta` dict to `folder` as one version.
+
+    The arrays go to a new subdirectory named in meta.json, and meta.json is
+    swapped in last with a single os.replace: a reader loads the arrays of one
+    save or of the next, never a mix. The versions it replaced are removed.
+    """
+    import numpy as np
+    folder.mkdir(parents=True, exist_ok=True)
+    version = f'v{time.time_ns()}-{os.getpid()}-{threading.get_ident()}'
+    try:
+        (folder / version).mkdir()
+        for name, values in arrays.items():
+            np.save(folder / version / f'{name}.npy', np.ascontiguousarray(values))
+        tmp = folder / f'meta.{version}.json'
+        tmp.write_text(json.dumps({**meta, 'version': version}))
+        os.replace(tmp, folder / 'meta.json')
+    except FileNotFoundError:
+        # Another process saved at the same time and removed this version; its save stands
+        return
+    # Readers still holding an old version's memory maps keep reading them
+    for entry in folder.iterdir():
+        if entry.is_dir() and entry.name != version:
+            shutil.rmtree(entry, ignore_errors=True)
+        elif entry.suffix == '.npy':
+            # Columns of the layout before versions
+            entry.unlink(missing_ok=True)
+
+
+def load_arrays(folder, names):
+    """The memory-mapped arrays `names` of the current version in `folder` and its meta, or `(None, {})`."""
+    import numpy as np
+    try:
+        meta = json.loads((folder / 'meta.json').read_text())
+        # A version removed by a newer save since meta.json was read is a miss, like no version at all
+        return {name: np.load(folder / meta['version'] / f'{name}.npy', mmap_mode='r') for name in names(meta)}, meta
+    except (OSError, ValueError, KeyError):
+        return None, {}
+
+
+def stats():
+    with connect() as db:
+        entries, size = db.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries').fetchone()
+        counters = dict(db.execute('SELECT name, value FROM counters').fetchall())
+        datasets = db.execute('SELECT dataset, COUNT(*), SUM(size) FROM entries GROUP BY dataset ORDER BY dataset').fetchall()
+    hits, misses = counters.get('hits', 0), counters.get('misses', 0)
+    db_file = cache_dir() / 'cache.sqlite'
+    return {
+        'path': str(db_file),
+        'entries': entries,
+        'bytes': size,
+        # Includes the OHLCV history store kept next to the database
+        'bytes_on_disk': sum(f.stat().st_size for f in cache_dir().rglob('*') if f.is_file()),
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': hits / (hits + misses) if hits + misses else 0.0,
+        'datasets': {name: {'entries': n, 'bytes': b} for name, n, b in datasets},
+        # Queued, coalesced, throttled and retried requests, see stockcli.scheduler
+        'requests': {name[len('requests_'):]: value for name, value in sorted(counters.items()) if name.startswith('requests_')},
+    }
+
+
+def clear():
+    with _memory_lock:
+        _memory.clear()
+    shutil.rmtree(cache_dir() / 'history', ignore_errors=True)
+    shutil.rmtree(cache_dir() / 'snapshot', ignore_errors=True)
+    with connect() as db:
+        removed = db.execute('DELETE FROM entries').rowcount
+        db.execute('DELETE FROM counters')
+        db.execute('DELETE FROM symbols')
+        db.execute('VACUUM')
+    return removed
+
+
+def prune(max_bytes=None):
+    """Remove expired entries, then evict LRU entries above `max_bytes`."""
+    now = time.time()
+    removed = 0
+    with connect() as db:
+        for key, dataset, created in db.execute('SELECT key, dataset, created FROM entries').fetchall():
+            if now - created > TTLS.get(dataset, DEFAULT_TTL):
+                db.execute('DELETE FROM entries WHERE key = ?', (key,))
+                removed += 1
+        removed += evict(db, MAX_BYTES if max_bytes is None else max_bytes)
+        db.execute('VACUUM')
+    return removed
@@ -0,0 +1,124 @@
+import os
+
+FORMATS = ['png', 'svg']
+# Size of the rendered images: 1200x700 px
+FIGSIZE = (12, 7)
+DPI = 100
+# Candles narrower than ~2px are drawn on top of each other: the ~1000px wide
+# plot area of a FIGSIZE figure fits about this many
+MAX_BARS = 500
+OHLCV = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+def downsample(hist, bars=MAX_BARS):
+    """`hist` with consecutive bars merged so that at most `bars` remain.
+
+    Each merged candle keeps the first Open, the highest High, the lowest Low
+    and the last Close of its bars, the summed Volume and the time of its first
+    bar, so wicks and gaps survive (unlike LTTB or keeping every n-th bar).
+    Other columns keep their value at the last bar of each candle. `bars` of 0
+    or None keeps every bar.
+    """
+    n = len(hist)
+    if not bars or n <= bars:
+        return hist
+    import numpy as np
+    import pandas as pd
+    size = -(-n // bars)
+    starts = np.arange(0, n, size)
+    ends = np.minimum(starts + size, n) - 1
+    merged = pd.DataFrame({
+        'Open': hist['Open'].to_numpy()[starts],
+        # fmax/fmin skip the NaNs of bars without trades
+        'High': np.fmax.reduceat(hist['High'].to_numpy(), starts),
+        'Low': np.fmin.reduceat(hist['Low'].to_numpy(), starts),
+        'Close': hist['Close'].to_numpy()[ends],
+        'Volume': np.add.reduceat(np.nan_to_num(hist['Volume'].to_numpy(dtype=float)), starts),
+    }, index=hist.index[starts])
+    # Other columns (indicators) keep their value at the close of the candle
+    for column in hist.columns.difference(OHLCV, sort=False):
+        merged[column] = hist[column].to_numpy()[ends]
+    return merged
+
+
+def setup():
+    # Runs first in every render process: no display, and the imports out of
+    # the time of the first chart
+    import matplotlib
+    matplotlib.use('Agg')
+    import mplfinance  # noqa: F401
+
+
+def plot(hist, title, bars=MAX_BARS, overlays=(), sessions=False):
+    """The frame and `mpf.plot` arguments of the candle chart of `hist`.
+
+    `overlays` are indicator specs (`sma:50`, see `stockcli.indicators.parse`),
+    computed over every bar before downsampling. They are drawn over the
+    candles, or in panels of their own below the volume (RSI, MACD). With
+    `sessions` (intraday bars) VWAP starts again every day.
+    """
+    import mplfinance as mpf
+    from stockcli import indicators
+    specs = [indicators.parse(spec) for spec in overlays]
+    if specs:
+        hist = indicators.compute({title: hist}, specs, sessions)[title]
+    hist = downsample(hist, bars)
+    addplots, panel = [], 1
+    for indicator in specs:
+        columns = [c for c in indicator.columns if hist[c].notna().any()]
+        if not columns:
+            continue
+        if not indicator.overlay:
+            panel += 1
+        for column in columns:
+            histogram = isinstance(indicator, indicators.MACD) and column == indicator.columns[-1]
+            addplots.append(mpf.make_addplot(hist[column], panel=0 if indicator.overlay else panel,
+                                             type='bar' if histogram else 'line', ylabel='' if indicator.overlay else indicator.name.upper()))
+    kwargs = dict(type='candle', style='yahoo', volume=True, title=title)
+    if addplots:
+        kwargs['addplot'] = addplots
+    return hist[OHLCV], kwargs
+
+
+def render(hist, path, title, bars=MAX_BARS, overlays=(), sessions=False):
+    """Draw the chart of `hist` (see `plot`) into the image file `path`."""
+    import mplfinance as mpf
+    frame, kwargs = plot(hist, title, bars, overlays, sessions)
+    mpf.plot(frame, **kwargs, figsize=FIGSIZE, savefig=dict(fname=str(path), dpi=DPI), closefig=True,
+             # Every bar was asked for (--max-bars 0)
+             warn_too_much_data=len(frame) + 1)
+    return path
+
+
+def save(histories, out, interval, image_format='png', workers=None, bars=MAX_BARS, overlays=()):
+    """Render `(symbol, hist)` pairs to `out/SYMBOL_INTERVAL.FORMAT` on a process pool.
+
+    matplotlib holds the GIL and is not thread-safe, so charts are drawn by
+    `workers` processes (one per core by default). Each chart is submitted as
+    soon as its history arrives from `histories`. Yields `(symbol, path, error)`
+    in completion order.
+    """
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    import multiprocessing
+    workers = workers or os.cpu_count() or 1
+    sessions = interval != '1d'
+
+    def jobs():
+        for symbol, hist in histories:
+            path = os.path.join(out, f"{symbol.replace(os.sep, '_')}_{interval}.{image_format}")
+            yield symbol, hist, path, f'{symbol}@{interval}'
+
+    if workers == 1:
+        setup()
+        for symbol, hist, path, title in jobs():
+            try:
+                yield symbol, render(hist, path, title, bars, overlays, sessions), None
+            except Exception as e:
+                yield symbol, None, e
+        return
+    # Forked children would inherit the locks of the fetching threads
+    with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('spawn'), initializer=setup) as pool:
+        futures = {pool.submit(render, hist, path, title, bars, overlays, sessions): symbol for symbol, hist, path, title in jobs()}
+        for future in as_completed(futures):
+            error = future.exception()
+            yield futures[future], None if error else future.result(), error
@@ -0,0 +1,103 @@
+import asyncio
+import os
+from urllib.parse import urlencode, urlsplit
+from stockcli import cache, scheduler, trace
+
+# Base URL of the screener views, e.g. a local stand-in server:
+#   STOCKCLI_MARKETS_URL=http://127.0.0.1:8800 stockcli markets --all
+MARKETS_URL_ENV = 'STOCKCLI_MARKETS_URL'
+MARKETS_URL = 'https://yfinance-stocks.deta.dev'
+# Seconds allowed to open a connection, and to wait for each read
+CONNECT_TIMEOUT = 5.0
+READ_TIMEOUT = 15.0
+MAX_CONNECTIONS = 16
+# Symbols per quote request, and the quote fields `markets --enrich` shows
+QUOTE_BATCH = 50
+QUOTE_FIELDS = ['shortName', 'regularMarketPrice', 'regularMarketChangePercent', 'regularMarketVolume', 'marketCap',
+                'trailingPE', 'forwardPE', 'dividendYield', 'fiftyTwoWeekLow', 'fiftyTwoWeekHigh']
+
+
+def markets_url(view):
+    return f"{os.environ.get(MARKETS_URL_ENV, MARKETS_URL).rstrip('/')}/{view}"
+
+
+def client():
+    """A pooled `httpx.AsyncClient` with connect/read timeouts."""
+    import httpx
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT),
+        limits=httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_CONNECTIONS),
+    )
+
+
+async def request(session, url, headers=None):
+    """GET `url` through the scheduler: rate limited, retried, shared by identical GETs."""
+    import httpx
+
+    async def send():
+        # Requests run concurrently on one thread, each gets its own track
+        with trace.span(f'GET {urlsplit(url).path}', 'http', track=url, url=url):
+            return await session.get(url, headers=headers)
+    key = (url, tuple(sorted((headers or {}).items())))
+    return await scheduler.call_async(urlsplit(url).netloc, send, httpx.TransportError, key)
+
+
+async def get_json(session, url, dataset):
+    """The JSON body of `url`, revalidated against the copy kept in the cache.
+
+    A cached copy is sent back with If-None-Match/If-Modified-Since, so while it
+    is within the TTL of `dataset` an unchanged resource only costs a 304.
+    """
+    key = f'url|{url}'
+    stored = cache.get(key, dataset) if cache.enabled and not cache.refresh else cache.MISS
+    headers = {}
+    if stored is not cache.MISS:
+        if stored['etag']:
+            headers['If-None-Match'] = stored['etag']
+        if stored['last_modified']:
+            headers['If-Modified-Since'] = stored['last_modified']
+    response = await request(session, url, headers)
+    if response.status_code == 304 and stored is not cache.MISS:
+        return stored['body']
+    response.raise_for_status()
+    body = response.json()
+    etag, last_modified = response.headers.get('ETag'), response.headers.get('Last-Modified')
+    if cache.enabled and (etag or last_modified):
+        cache.put(key, dataset, {'etag': etag, 'last_modified': last_modified, 'body': body})
+    return body
+
+
+def get_all(urls, dataset):
+    """The JSON bodies of `urls`, fetched concurrently over one pooled client, in order."""
+    async def main():
+        async with client() as session:
+            return await asyncio.gather(*(get_json(session, url, dataset) for url in urls))
+    return asyncio.run(main())
+
+
+def symbol_of(row):
+    # Screener rows name it `Symbol`
+    return row.get('Symbol') or row.get('symbol')
+
+
+async def get_quotes(session, symbols):
+    """`{symbol: quote}` of `symbols`, QUOTE_BATCH per request, the requests sent concurrently."""
+    from stockcli import net, watch
+    url = net.rewrite(watch.QUOTE_URL)
+
+    async def batch(chunk):
+        response = await request(session, f"{url}?{urlencode({'symbols': ','.join(chunk)})}")
+        response.raise_for_status()
+        return response.json()['quoteResponse']['result']
+    chunks = [symbols[i:i + QUOTE_BATCH] for i in range(0, len(symbols), QUOTE_BATCH)]
+    return {quote['symbol']: quote for result in await asyncio.gather(*map(batch, chunks)) for quote in result}
+
+
+def get_enriched(views):
+    """The rows of the screener `views` and the quotes of every symbol in them, in one pass over one pooled client."""
+    async def main():
+        async with client() as session:
+            bodies = await asyncio.gather(*(get_json(session, markets_url(view), 'markets') for view in views))
+            symbols = list(dict.fromkeys(filter(None, (symbol_of(row) for rows in bodies for row in rows))))
+            return bodies, await get_quotes(session, symbols)
+    return asyncio.run(main())
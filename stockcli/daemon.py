@@ -0,0 +1,216 @@
+"""The `stockcli serve` daemon and the thin client in front of every command.
+
+The daemon keeps yfinance/pandas imported, the pooled HTTP session open and
+cached results in memory, and runs commands sent over a Unix socket. The
+`stockcli` entry point forwards its arguments to it when it is running, and
+runs the command itself when it is not.
+
+Only the standard library is imported at module level: the client must start
+faster than the commands it forwards.
+"""
+import io
+import json
+import os
+import socket
+import struct
+import sys
+import threading
+
+# Commands and options that have to run in the calling process: they draw on
+# the caller's screen, run until interrupted, or profile the process itself
+LOCAL = {'serve', 'watch', 'chart', 'shell', '--follow', '--profile', '--trace', '--cprofile'}
+# The caller's terminal settings, applied while its command runs
+TERMINAL_ENV = ['COLUMNS', 'LINES', 'TERM', 'COLORTERM', 'NO_COLOR', 'FORCE_COLOR']
+SOCKET_ENV = 'STOCKCLI_SOCKET'
+NO_DAEMON_ENV = 'STOCKCLI_NO_DAEMON'
+# Frames sent back to the client: stdout bytes, stderr bytes, exit code
+STDOUT, STDERR, EXIT = b'o', b'e', b'x'
+HEADER = struct.Struct('!cI')
+
+
+def socket_path():
+    if os.environ.get(SOCKET_ENV):
+        return os.environ[SOCKET_ENV]
+    from stockcli import cache
+    return str(cache.cache_dir() / 'stockcli.sock')
+
+
+def connect(path=None):
+    """A connection to the running daemon, or None."""
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.connect(path or socket_path())
+    except OSError:
+        client.close()
+        return None
+    return client
+
+
+def send_frame(sock, kind, payload):
+    sock.sendall(HEADER.pack(kind, len(payload)) + payload)
+
+
+def read_exactly(sock, size):
+    data = b''
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError('stockcli daemon closed the connection')
+        data += chunk
+    return data
+
+
+def forward(argv):
+    """Run `argv` on the daemon, relaying its output; the exit code, or None to run locally."""
+    # `--trace=out.json` is `--trace` too
+    if os.environ.get(NO_DAEMON_ENV) or LOCAL & {arg.split('=', 1)[0] for arg in argv}:
+        return None
+    sock = connect()
+    if sock is None:
+        return None
+    with sock:
+        request = {
+            'argv': argv,
+            'cwd': os.getcwd(),
+            'env': {name: os.environ[name] for name in TERMINAL_ENV if name in os.environ},
+            'stdout_tty': sys.stdout.isatty(),
+            'stderr_tty': sys.stderr.isatty(),
+        }
+        if request['stdout_tty'] and 'COLUMNS' not in request['env']:
+            request['env']['COLUMNS'] = str(os.get_terminal_size(sys.stdout.fileno()).columns)
+        sock.sendall(json.dumps(request).encode() + b'\n')
+        while True:
+            kind, size = HEADER.unpack(read_exactly(sock, HEADER.size))
+            payload = read_exactly(sock, size)
+            if kind == EXIT:
+                return int(payload)
+            stream = sys.stdout if kind == STDOUT else sys.stderr
+            stream.buffer.write(payload)
+            stream.buffer.flush()
+
+
+def stop():
+    """Ask the running daemon to exit; False when none is running."""
+    sock = connect()
+    if sock is None:
+        return False
+    with sock:
+        sock.sendall(json.dumps({'stop': True}).encode() + b'\n')
+        read_exactly(sock, HEADER.size + 1)
+    return True
+
+
+class Pipe(io.RawIOBase):
+    """An output stream of a forwarded command, sent to the client as frames."""
+
+    def __init__(self, sock, kind, tty):
+        self.sock, self.kind, self.tty = sock, kind, tty
+
+    def writable(self):
+        return True
+
+    def isatty(self):
+        return self.tty
+
+    def write(self, data):
+        send_frame(self.sock, self.kind, bytes(data))
+        return len(data)
+
+
+def text_stream(sock, kind, tty):
+    return io.TextIOWrapper(io.BufferedWriter(Pipe(sock, kind, tty)), encoding='utf-8', line_buffering=True)
+
+
+def invoke(argv):
+    """Run the command line `argv` in this process; its exit code."""
+    import traceback
+    from stockcli.main import app
+    try:
+        app(args=argv, prog_name='stockcli')
+        return 0
+    except SystemExit as e:
+        return e.code if isinstance(e.code, int) else int(e.code is not None)
+    except Exception:
+        traceback.print_exc()
+        return 1
+
+
+def run(request, sock):
+    """Run one forwarded command as if in the caller's terminal and directory; its exit code."""
+    import rich
+    from stockcli import trace
+    saved = sys.stdout, sys.stderr, os.getcwd(), dict(os.environ)
+    sys.stdout = text_stream(sock, STDOUT, request['stdout_tty'])
+    sys.stderr = text_stream(sock, STDERR, request['stderr_tty'])
+    try:
+        os.chdir(request['cwd'])
+        for name in TERMINAL_ENV:
+            os.environ.pop(name, None)
+        os.environ.update(request['env'])
+        # A fresh global console, sized and coloured for the caller's terminal
+        rich.reconfigure()
+        code = invoke(request['argv'])
+        sys.stdout.flush()
+        sys.stderr.flush()
+    finally:
+        # Spans of one command are not the next one's
+        trace.reset()
+        sys.stdout, sys.stderr = saved[:2]
+        os.chdir(saved[2])
+        os.environ.clear()
+        os.environ.update(saved[3])
+    return code
+
+
+def preload():
+    # What the commands would otherwise import on every run
+    import httpx, pandas, prettytable, yfinance  # noqa: F401
+    import rich.console, rich.table, rich.panel, rich.columns  # noqa: F401
+    from stockcli import main, net, render, statements  # noqa: F401
+    net.session()
+
+
+def serve(ready=None):
+    """Listen on the socket and run the commands sent to it, one at a time, until stopped."""
+    import socketserver
+    path = socket_path()
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            line = self.rfile.readline()
+            if not line:
+                # A connection only checking that the daemon is up
+                return
+            request = json.loads(line)
+            if request.get('stop'):
+                send_frame(self.connection, EXIT, b'0')
+                threading.Thread(target=self.server.shutdown).start()
+                return
+            try:
+                code = run(request, self.connection)
+                send_frame(self.connection, EXIT, str(code).encode())
+            except OSError:
+                # The client went away (Ctrl-C, closed pipe)
+                pass
+
+    preload()
+    if os.path.exists(path):
+        os.unlink(path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with socketserver.UnixStreamServer(path, Handler) as server:
+        os.chmod(path, 0o600)
+        if ready is not None:
+            ready(path)
+        try:
+            server.serve_forever()
+        finally:
+            os.unlink(path)
+
+
+def main():
+    """The `stockcli` entry point."""
+    code = forward(sys.argv[1:])
+    if code is not None:
+        sys.exit(code)
+    from stockcli.main import app
+    app(prog_name='stockcli')
@@ -0,0 +1,80 @@
+from stockcli import cache, net, trace
+
+# Dataset name -> how to read it from a `yf.Ticker`. Datasets that take
+# `quarterly` pick the quarterly attribute when it is set.
+DATASETS = {
+    'info': lambda t: t.info,
+    'history': lambda t, interval='1d': t.history(interval=interval, debug=False),
+    'actions': lambda t: corporate_actions(t, 'actions'),
+    'splits': lambda t: corporate_actions(t, 'splits'),
+    'financials': lambda t, quarterly=False: t.quarterly_financials if quarterly else t.financials,
+    'balance_sheet': lambda t, quarterly=False: t.quarterly_balance_sheet if quarterly else t.balance_sheet,
+    'cashflow': lambda t, quarterly=False: t.quarterly_cashflow if quarterly else t.cashflow,
+    'earnings': lambda t, quarterly=False: t.quarterly_earnings if quarterly else t.earnings,
+    'sustainability': lambda t: t.sustainability,
+    'major_holders': lambda t: t.major_holders,
+    'institutional_holders': lambda t: t.institutional_holders,
+    'recommendations': lambda t: t.recommendations,
+    'calendar': lambda t: t.calendar,
+    'news': lambda t: t.news,
+}
+
+
+def corporate_actions(t, attribute):
+    """Dividends/splits of `t`, taken from its full history (empty for unknown symbols).
+
+    The history is read with `debug=False` first: left to itself yfinance would
+    print lookup errors to stdout, and return a list instead of a frame.
+    """
+    import pandas as pd
+    if t.history(period='max', debug=False).empty:
+        return pd.DataFrame()
+    result = getattr(t, attribute)
+    return result if len(result) else pd.DataFrame()
+
+
+# The running `stockcli shell` session, which keeps `yf.Ticker` objects and
+# fetched frames between its commands (see stockcli.shell)
+session = None
+
+
+def ticker(symbol):
+    if session is not None:
+        return session.ticker(symbol)
+    import yfinance as yf
+    return yf.Ticker(symbol.upper(), session=net.session())
+
+
+def kept(key, load, ttl):
+    """`load()`, or the copy the shell session keeps of `key` while younger than `ttl` seconds."""
+    return load() if session is None else session.frame(key, load, ttl)
+
+
+def get(symbol, dataset, **params):
+    """Fetch `dataset` of `symbol`, served from the on-disk cache when fresh.
+
+    `params` (e.g. `interval`, `quarterly`) are passed to the dataset reader and
+    are part of the cache key.
+    """
+    read = DATASETS[dataset]
+    with trace.span(f'fetch {dataset}', 'fetch', symbol=symbol):
+        return kept(cache.make_key(symbol, dataset, **params), lambda: cache.cached(symbol, dataset, lambda: read(ticker(symbol), **params), **params), cache.TTLS.get(dataset, cache.DEFAULT_TTL))
+
+
+def get_many(symbol, datasets, **params):
+    """Fetch several datasets of `symbol` through one shared `yf.Ticker`.
+
+    yfinance scrapes all statements of a ticker in a single pass, so datasets
+    missing from the cache cost one round of requests instead of one each.
+    """
+    shared = []
+    def shared_ticker():
+        if not shared:
+            shared.append(ticker(symbol))
+        return shared[0]
+    frames = {}
+    for name in datasets:
+        with trace.span(f'fetch {name}', 'fetch', symbol=symbol):
+            load = lambda name=name: cache.cached(symbol, name, lambda: DATASETS[name](shared_ticker(), **params), **params)
+            frames[name] = kept(cache.make_key(symbol, name, **params), load, cache.TTLS.get(name, cache.DEFAULT_TTL))
+    return frames
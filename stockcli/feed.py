@@ -0,0 +1,91 @@
+"""The news feed of a watchlist: every article once, across markets and runs.
+
+Feeds are fetched concurrently, one search request per market (there is no
+history probe, and nothing is cached), and an article tagged to several
+markets is merged into one with all of them. The uuids (or links) of the
+articles already emitted are kept in the cache database, so only new ones
+come out, in this run and the next. Articles older than MAX_AGE are neither
+shown nor kept, which bounds the index.
+"""
+import os
+import threading
+import time
+from stockcli import cache, net, trace
+
+SEARCH_URL = 'https://query2.finance.yahoo.com/v1/finance/search'
+# Articles asked for per market
+NEWS_COUNT = 10
+TIMEOUT = 10
+MAX_AGE = float(os.environ.get('STOCKCLI_NEWS_DAYS', 7)) * 86400
+FIELDS = ['uuid', 'title', 'publisher', 'link', 'providerPublishTime', 'type', 'symbols']
+
+# The index when the cache is off (`--no-cache`): this run only
+_seen = {}
+_lock = threading.Lock()
+
+
+def fetch(symbol):
+    """The articles of the feed of `symbol`, in one request."""
+    response = net.session().get(SEARCH_URL, params={'q': symbol, 'newsCount': NEWS_COUNT, 'quotesCount': 0}, timeout=TIMEOUT)
+    response.raise_for_status()
+    return response.json().get('news') or []
+
+
+def key(article):
+    return article.get('uuid') or article.get('link')
+
+
+def merge(feeds, now=None):
+    """The articles of `{symbol: articles}` once each, oldest first, with the `symbols` whose feed had them."""
+    now = time.time() if now is None else now
+    articles = {}
+    for symbol, items in feeds.items():
+        for item in items:
+            if key(item) is None or item.get('providerPublishTime', now) < now - MAX_AGE:
+                continue
+            article = articles.setdefault(key(item), {**item, 'symbols': []})
+            article['symbols'].append(symbol)
+    return sorted(articles.values(), key=lambda a: a.get('providerPublishTime', now))
+
+
+def unseen(articles, now=None):
+    """The `articles` not emitted before, which are remembered from now on."""
+    now = time.time() if now is None else now
+    with trace.span('news index', 'transform', articles=len(articles)):
+        if not cache.enabled:
+            with _lock:
+                for name in [name for name, published in _seen.items() if published < now - MAX_AGE]:
+                    del _seen[name]
+                new = [a for a in articles if key(a) not in _seen]
+                _seen.update((key(a), a.get('providerPublishTime', now)) for a in new)
+            return new
+        with cache.connect() as db:
+            db.execute('BEGIN IMMEDIATE')
+            db.execute('DELETE FROM news_seen WHERE published < ?', (now - MAX_AGE,))
+            new = [a for a in articles if db.execute('INSERT OR IGNORE INTO news_seen VALUES (?, ?, ?)',
+                                                       (key(a), a.get('providerPublishTime', now), now)).rowcount]
+            db.execute('COMMIT')
+        return new
+
+
+def polls(symbols, interval=60.0, count=None, concurrency=8, sleep=time.sleep):
+    """Fetch the feeds of `symbols` every `interval` seconds.
+
+    Yields `(articles, errors)` per poll: the new articles, oldest first, and
+    `{symbol: exception}` of the feeds that failed. Stops after `count` polls,
+    or runs until interrupted when `count` is None.
+    """
+    from stockcli.runner import run_many
+    done = 0
+    while count is None or done < count:
+        feeds, errors = {}, {}
+        for symbol, items, error in run_many(fetch, symbols, concurrency, description="Fetching news..."):
+            if error is not None:
+                errors[symbol] = error
+            else:
+                feeds[symbol] = items
+        # In the watchlist's order, so an article's first market is the first listed
+        yield unseen(merge({s: feeds[s] for s in symbols if s in feeds})), errors
+        done += 1
+        if count is None or done < count:
+            sleep(interval)
@@ -0,0 +1,313 @@
+"""Technical indicators over OHLCV bars, computed with NumPy.
+
+Every indicator keeps the state it needs to carry on: `update` takes only the
+bars that are new since the last call, costs O(new bars), and continues the
+series exactly where a single call over all the bars would have. Inputs are
+1-D arrays of one symbol's bars, or 2-D `(symbols, bars)` arrays to compute
+hundreds of symbols in one call; outputs have the shape of the inputs.
+
+Missing bars (NaN) are skipped, so a symbol padded with NaNs in front of a
+shorter history (see `stack`) gets the values it would get on its own. The
+conventions are the usual pandas ones:
+
+  EMA        seeded with the first value, `ewm(span=n, adjust=False)`
+  RSI        Wilder's smoothing of gains and losses, `ewm(alpha=1/n, adjust=False)`
+  Bollinger  bands `k` population standard deviations around the SMA
+  VWAP       anchored at the first bar, or at the start of every session
+"""
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+# The largest factor an EMA block may scale by, well inside float64's range
+MAX_SCALE = 250 * np.log(10)
+
+
+def shifted(x, first):
+    """`x` moved one bar later along the last axis, `first` filling the gap."""
+    return np.concatenate([np.broadcast_to(first, x.shape[:-1])[..., None], x[..., :-1]], axis=-1)
+
+
+def ffill(x, last):
+    """`x` with every NaN replaced by the value before it (`last` before the first bar)."""
+    index = np.maximum.accumulate(np.where(np.isnan(x), -1, np.arange(x.shape[-1])), axis=-1)
+    filled = np.take_along_axis(x, np.maximum(index, 0), axis=-1)
+    return np.where(index >= 0, filled, np.asarray(last, dtype=float)[..., None])
+
+
+def ema(x, alpha, last):
+    """EMA of `x` along the last axis, continuing from `last` (NaN: not started).
+
+    Computed in blocks with the closed form y_t = b^t * (y_0 + sum a * x_k / b^k)
+    (b = 1 - alpha), each block short enough for b^-t to stay finite. NaNs
+    carry the previous value forward without decaying it.
+    Returns the EMA and the value to continue from.
+    """
+    if alpha >= 1:
+        # n=1: the series itself
+        out = ffill(x, last)
+        return out, out[..., -1]
+    out = np.full(x.shape, np.nan)
+    last = np.array(last, dtype=float)
+    beta = 1 - alpha
+    block = max(1, int(MAX_SCALE / -np.log(beta)))
+    for begin in range(0, x.shape[-1], block):
+        chunk = x[..., begin:begin + block]
+        valid = ~np.isnan(chunk)
+        steps = np.cumsum(valid, axis=-1)
+        # A series not started yet starts at its first value
+        first = np.take_along_axis(chunk, np.argmax(valid, axis=-1)[..., None], axis=-1)[..., 0]
+        started = ~np.isnan(last)
+        last = np.where(started, last, first)
+        scale = beta ** -steps.astype(float)
+        total = np.cumsum(np.where(valid, alpha * np.nan_to_num(chunk) * scale, 0.0), axis=-1)
+        values = (last[..., None] + total) / scale
+        out[..., begin:begin + block] = np.where(started[..., None] | (steps > 0), values, np.nan)
+        last = out[..., begin + chunk.shape[-1] - 1]
+    return out, last
+
+
+def rolling(x, n, tail):
+    """Mean and population variance of the last `n` bars, continuing after `tail`.
+
+    Sums come from cumulative sums of the bars minus a per-series reference,
+    so long series keep their precision. Windows with a NaN are NaN.
+    Returns the mean, the variance and the `n - 1` bars to continue after.
+    """
+    joined = np.concatenate([tail, x], axis=-1)
+    valid = ~np.isnan(joined)
+    reference = np.take_along_axis(joined, np.argmax(valid, axis=-1)[..., None], axis=-1)
+    deviation = np.where(valid, joined - np.nan_to_num(reference), 0.0)
+    zero = np.zeros(joined.shape[:-1] + (1,))
+    sums = np.concatenate([zero, np.cumsum(deviation, axis=-1)], axis=-1)
+    squares = np.concatenate([zero, np.cumsum(deviation ** 2, axis=-1)], axis=-1)
+    counts = np.concatenate([zero, np.cumsum(valid, axis=-1)], axis=-1)
+    full = (counts[..., n:] - counts[..., :-n]) == n
+    mean = (sums[..., n:] - sums[..., :-n]) / n
+    variance = np.maximum((squares[..., n:] - squares[..., :-n]) / n - mean ** 2, 0.0)
+    # Padded to the length of `joined`, then cut down to the new bars
+    pad = np.full(joined.shape[:-1] + (joined.shape[-1] - mean.shape[-1],), np.nan)
+    mean = np.concatenate([pad, np.where(full, mean + reference, np.nan)], axis=-1)[..., tail.shape[-1]:]
+    variance = np.concatenate([pad, np.where(full, variance, np.nan)], axis=-1)[..., tail.shape[-1]:]
+    return mean, variance, joined[..., max(0, joined.shape[-1] - (n - 1)):]
+
+
+class Indicator(ABC):
+    """An indicator with its state; subclasses set `columns` and implement `update`."""
+
+    name = ''
+    # Drawn over the candles (price scale) rather than in a panel of its own
+    overlay = True
+
+    def __init__(self, *params):
+        self.params = params
+        self.columns = []
+
+    @abstractmethod
+    def update(self, bars):
+        """`{column: values}` for the new `bars` (a dict of `Open`/`High`/`Low`/`Close`/`Volume` arrays)."""
+
+
+class SMA(Indicator):
+    name = 'sma'
+
+    def __init__(self, n=20):
+        super().__init__(n)
+        self.n = int(n)
+        self.columns = [f'SMA_{self.n}']
+        self.tail = None
+
+    def update(self, bars):
+        close = bars['Close']
+        tail = np.empty(close.shape[:-1] + (0,)) if self.tail is None else self.tail
+        mean, _, self.tail = rolling(close, self.n, tail)
+        return {self.columns[0]: mean}
+
+
+class EMA(Indicator):
+    name = 'ema'
+
+    def __init__(self, n=20):
+        super().__init__(n)
+        self.n = int(n)
+        self.columns = [f'EMA_{self.n}']
+        self.last = np.nan
+
+    def update(self, bars):
+        values, self.last = ema(bars['Close'], 2 / (self.n + 1), self.last)
+        return {self.columns[0]: values}
+
+
+class RSI(Indicator):
+    name = 'rsi'
+    overlay = False
+
+    def __init__(self, n=14):
+        super().__init__(n)
+        self.n = int(n)
+        self.columns = [f'RSI_{self.n}']
+        self.previous = np.nan
+        self.gain = self.loss = np.nan
+
+    def update(self, bars):
+        close = bars['Close']
+        change = close - shifted(close, self.previous)
+        # The last close seen, for the change of the next bar
+        self.previous = ffill(close, self.previous)[..., -1]
+        # np.maximum keeps the NaNs of missing bars
+        gain, self.gain = ema(np.maximum(change, 0), 1 / self.n, self.gain)
+        loss, self.loss = ema(np.maximum(-change, 0), 1 / self.n, self.loss)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return {self.columns[0]: 100 * gain / (gain + loss)}
+
+
+class MACD(Indicator):
+    name = 'macd'
+    overlay = False
+
+    def __init__(self, fast=12, slow=26, signal=9):
+        super().__init__(fast, slow, signal)
+        self.fast, self.slow, self.signal = int(fast), int(slow), int(signal)
+        suffix = f'{self.fast}_{self.slow}_{self.signal}'
+        self.columns = [f'MACD_{suffix}', f'MACDs_{suffix}', f'MACDh_{suffix}']
+        self.last = [np.nan, np.nan, np.nan]
+
+    def update(self, bars):
+        fast, self.last[0] = ema(bars['Close'], 2 / (self.fast + 1), self.last[0])
+        slow, self.last[1] = ema(bars['Close'], 2 / (self.slow + 1), self.last[1])
+        line = fast - slow
+        signal, self.last[2] = ema(line, 2 / (self.signal + 1), self.last[2])
+        return dict(zip(self.columns, (line, signal, line - signal)))
+
+
+class Bollinger(Indicator):
+    name = 'bbands'
+
+    def __init__(self, n=20, k=2):
+        super().__init__(n, k)
+        self.n, self.k = int(n), float(k)
+        suffix = f'{self.n}_{k}'
+        self.columns = [f'BBL_{suffix}', f'BBM_{suffix}', f'BBU_{suffix}']
+        self.tail = None
+
+    def update(self, bars):
+        close = bars['Close']
+        tail = np.empty(close.shape[:-1] + (0,)) if self.tail is None else self.tail
+        mean, variance, self.tail = rolling(close, self.n, tail)
+        width = self.k * np.sqrt(variance)
+        return dict(zip(self.columns, (mean - width, mean, mean + width)))
+
+
+class VWAP(Indicator):
+    name = 'vwap'
+
+    def __init__(self):
+        super().__init__()
+        self.columns = ['VWAP']
+        self.price_volume = self.volume = 0.0
+        self.session = None
+
+    def update(self, bars):
+        """`bars['Session']`, when given, starts a new VWAP whenever it changes (e.g. the day of intraday bars)."""
+        typical = (bars['High'] + bars['Low'] + bars['Close']) / 3
+        volume = np.nan_to_num(np.where(np.isnan(typical), 0.0, bars['Volume']))
+        zero = np.zeros(volume.shape[:-1] + (1,))
+        # Running totals of this call, after the ones carried over: totals[..., i] is before bar i
+        price_volume = np.concatenate([zero, np.cumsum(np.nan_to_num(typical) * volume, axis=-1)], axis=-1) + np.asarray(self.price_volume)[..., None]
+        volumes = np.concatenate([zero, np.cumsum(volume, axis=-1)], axis=-1) + np.asarray(self.volume)[..., None]
+        session = bars.get('Session')
+        if session is None:
+            start = np.zeros(volume.shape, dtype=int)
+            base_pv = base_v = np.zeros(volume.shape)
+        else:
+            session = np.broadcast_to(session, volume.shape)
+            previous = session[..., 0] if self.session is None else self.session
+            changed = session != shifted(session, previous)
+            start = np.maximum.accumulate(np.where(changed, np.arange(volume.shape[-1]), -1), axis=-1)
+            restarted = start >= 0
+            start = np.maximum(start, 0)
+            base_pv = np.where(restarted, np.take_along_axis(price_volume, start, axis=-1), 0.0)
+            base_v = np.where(restarted, np.take_along_axis(volumes, start, axis=-1), 0.0)
+            self.session = session[..., -1]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            vwap = (price_volume[..., 1:] - base_pv) / (volumes[..., 1:] - base_v)
+        self.price_volume = price_volume[..., -1] - base_pv[..., -1]
+        self.volume = volumes[..., -1] - base_v[..., -1]
+        return {'VWAP': np.where(np.isfinite(vwap), vwap, np.nan)}
+
+
+INDICATORS = {cls.name: cls for cls in (SMA, EMA, RSI, MACD, Bollinger, VWAP)}
+DEFAULT = ['sma:20', 'ema:20', 'rsi:14', 'macd:12,26,9', 'bbands:20,2', 'vwap']
+
+
+def parse(spec):
+    """The indicator of `name[:param,...]`, e.g. `sma:50` or `macd:12,26,9`; None when it is not one."""
+    name, _, params = spec.lower().partition(':')
+    if name not in INDICATORS:
+        return None
+    try:
+        values = [float(p) if '.' in p else int(p) for p in params.split(',')] if params else []
+        indicator = INDICATORS[name](*values)
+    except (TypeError, ValueError):
+        return None
+    # Periods are whole numbers of bars, at least one
+    if any(getattr(indicator, p, 1) < 1 for p in ('n', 'fast', 'slow', 'signal')):
+        return None
+    return indicator
+
+
+class Engine:
+    """Several indicators updated together, over the same bars."""
+
+    def __init__(self, indicators):
+        self.indicators = list(indicators)
+
+    @property
+    def columns(self):
+        return [column for indicator in self.indicators for column in indicator.columns]
+
+    def update(self, bars):
+        """`{column: values}` of every indicator for the new `bars` (see `Indicator.update`)."""
+        bars = {name: values if name == 'Session' else np.asarray(values, dtype=float) for name, values in bars.items()}
+        values = {}
+        if not bars['Close'].shape[-1]:
+            return {column: bars['Close'] for column in self.columns}
+        for indicator in self.indicators:
+            values.update(indicator.update(bars))
+        return values
+
+
+def arrays(hist, sessions=False):
+    """The OHLCV columns of `hist` as arrays; `sessions` adds the trading day of each bar."""
+    bars = {name: hist[name].to_numpy(dtype=float) for name in ('Open', 'High', 'Low', 'Close', 'Volume')}
+    if sessions:
+        bars['Session'] = hist.index.normalize().asi8
+    return bars
+
+
+def stack(histories, sessions=False):
+    """`(symbols, bars)` arrays of several histories, each right-aligned and NaN-padded in front."""
+    length = max(len(hist) for hist in histories)
+    stacked = {}
+    for i, hist in enumerate(histories):
+        for name, values in arrays(hist, sessions).items():
+            if name not in stacked:
+                stacked[name] = np.zeros((len(histories), length), dtype=values.dtype) if name == 'Session' else np.full((len(histories), length), np.nan)
+            stacked[name][i, length - len(values):] = values
+    return stacked
+
+
+def compute(histories, indicators, sessions=False):
+    """`{symbol: hist with the indicator columns}` for `{symbol: hist}`, in one call over all of them."""
+    import pandas as pd
+    if not histories:
+        return {}
+    symbols = list(histories)
+    engine = Engine(indicators)
+    values = engine.update(stack([histories[s] for s in symbols], sessions))
+    frames = {}
+    for i, symbol in enumerate(symbols):
+        hist = histories[symbol]
+        columns = {name: column[i, column.shape[-1] - len(hist):] for name, column in values.items()}
+        frames[symbol] = hist.join(pd.DataFrame(columns, index=hist.index))
+    return frames
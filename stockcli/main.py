@@ -1,556 +1,545 @@
 import typer
-import random
-import httpx
-import time
 import rich
-from rich.progress import Progress,SpinnerColumn, TextColumn
-from rich.console import Console
-from rich.table import Table
-from rich.columns import Columns
-from rich.panel import Panel
-import threading
-import yfinance as yf
-import mplfinance as mpf
-import json
 from datetime import datetime
-import pandas as pd
-from prettytable.colortable import ColorTable,Themes
-from prettytable import ALL
+from pathlib import Path
+from typing import List
+from stockcli import cache, charts, data, output, render, scheduler, store, symbols, trace
+from stockcli.runner import collect, give_up, read_symbols, report, require_markets, run, run_batch, run_many, say, unrecognized
+# Heavy dependencies (yfinance, mplfinance, pandas, httpx, prettytable) are imported
+# inside the command that needs them, so `--help` and light commands start fast.
 ###################################
 
 app = typer.Typer(rich_markup_mode="rich",help="[italic]It's an open-source tool that uses [green]Yahoo's[/green] publicly available APIs,and is intended for [red]research[/red] and [red]educational[/red] purposes.[/italic]")
 
+cache_app = typer.Typer(rich_markup_mode="rich",help="[bold yellow]Inspect and maintain the local response cache.[/bold yellow]")
+app.add_typer(cache_app, name="cache")
+
+@app.callback()
+def options(ctx:typer.Context,no_cache:bool = typer.Option(False,"--no-cache",help="Don't read or write the local response cache."),refresh:bool = typer.Option(False,"--refresh",help="Ignore cached responses and fetch fresh data."),format:str = typer.Option("table","--format",help="table, or records as json, ndjson, csv, parquet or arrow (parquet/arrow need pyarrow)"),output_file:Path = typer.Option(None,"--output",help="write records to this file instead of stdout"),profile:bool = typer.Option(False,"--profile",help="Print the time spent per phase (imports, requests, fetches, rendering)."),trace_file:Path = typer.Option(None,"--trace",help="Write a Chrome/Perfetto trace of the run to this file."),cprofile_file:Path = typer.Option(None,"--cprofile",help="Write cProfile stats of the main thread to this file (see `python -m pstats`).")):
+    if profile or trace_file:
+        trace.start(ctx.invoked_subcommand)
+        ctx.call_on_close(lambda: trace.finish(profile, trace_file))
+    # Callbacks run last-in first-out: the request counters print above the phase summary
+    ctx.call_on_close(scheduler.save)
+    if profile:
+        ctx.call_on_close(scheduler.print_counters)
+    if cprofile_file:
+        import cProfile
+        profiler = cProfile.Profile()
+        ctx.call_on_close(lambda: (profiler.disable(), profiler.dump_stats(cprofile_file)))
+        profiler.enable()
+    if format not in output.FORMATS:
+        unrecognized('format', format)
+    cache.enabled = not no_cache
+    cache.refresh = refresh
+    output.format = format
+    output.path = output_file
+    output.check()
+    ctx.call_on_close(output.close)
+
 views = ['trending-tickers','most-active','gainers','losers']
 
 @app.command(help="[bold yellow]Show the markets.[/bold yellow]")
-def markets(view:str = typer.Argument(...,help="[italic blue]'trending-tickers','most-active','gainers','losers'[/italic blue]")):
-    if view not in views:
-        rich.print(f"[red]Error: unrecognized arguments [bold]'{view}'[/bold]. The view should be [blue]'trending-tickers', 'most-active','gainers','losers'[/blue].[/red]")
-        typer.Exit()
+def markets(view:str = typer.Argument(None,help="[italic blue]'trending-tickers','most-active','gainers','losers'[/italic blue]",show_default=False),all_views:bool = typer.Option(False,"--all",help="show every view, fetched at the same time"),enrich:bool = typer.Option(False,"--enrich",help="one table of every listed market with its quote and key fields, fetched in one batch"),sort:str = typer.Option(None,"--sort",help="with --enrich, fields to sort by, -field for descending, e.g. -marketCap,trailingPE"),field:List[str] = typer.Option(None,"--field",help="with --enrich, show another quote field too")):
+    if all_views:
+        selected = views
+    elif view in views:
+        selected = [view]
     else:
-        def main():
-            url = f'https://yfinance-stocks.deta.dev/{view}'
-            data = httpx.get(url).json()
-            for dt in data:
+        say(f"[red]Error: unrecognized arguments [bold]'{view}'[/bold]. The view should be [blue]'trending-tickers', 'most-active','gainers','losers'[/blue].[/red]")
+        raise typer.Exit(code=1)
+    if enrich:
+        return enriched_markets(selected, sort, field)
+    def fetch():
+        from stockcli import client
+        return client.get_all([client.markets_url(v) for v in selected], 'markets')
+    results = run(fetch)
+    with trace.span('render markets', 'render'):
+        for name, rows in zip(selected, results):
+            if output.active():
+                output.write(output.frame(rows, view=name))
+                continue
+            if len(selected) > 1:
+                rich.print(f"[bold green3]{name}[/bold green3]")
+            for dt in rows:
                 for k,v in dt.items():
                     x = ' ' * (10 - len(k) + 2)
                     rich.print(f'[bold blue]{k}[/bold blue]{x}[yellow]{v}[/yellow]')
-        def spinner():
-            with Progress(
-                SpinnerColumn(),
-                TextColumn("[progress.description]{task.description}"),
-                transient=True,
-            ) as progress:
-                progress.add_task(description="Processing...", total=None)
-                time.sleep(2)
-        t1 = threading.Thread(target=main, args=())
-        t2 = threading.Thread(target=spinner, args=())
-        t1.start()
-        t2.start()
-        t1.join()
-    
+
+def enriched_markets(selected, sort, extra):
+    # Every market of the views joined with its quote, rendered as one table
+    import pandas as pd
+    from stockcli import client
+    from stockcli.screen import sort_keys
+    results, quotes = run(lambda: client.get_enriched(selected))
+    fields = list(dict.fromkeys(client.QUOTE_FIELDS + (extra or [])))
+    with trace.span('join quotes', 'transform', markets=len(quotes)):
+        rows = [{'view': name, 'rank': rank, 'symbol': symbol, **{f: quotes.get(symbol, {}).get(f) for f in fields}}
+                for name, body in zip(selected, results) for rank, symbol in enumerate(map(client.symbol_of, body), 1) if symbol]
+        table = pd.DataFrame(rows, columns=['view', 'rank', 'symbol', *fields])
+        if len(selected) == 1:
+            table = table.drop(columns='view')
+        if sort:
+            columns, ascending = sort_keys(sort)
+            unknown = [c for c in columns if c not in table]
+            if unknown:
+                say(f"[red]Error: can't sort on [bold]{', '.join(unknown)}[/bold], the fields are {', '.join(table.columns)}.[/red]")
+                raise typer.Exit(code=1)
+            table = table.sort_values(columns, ascending=ascending, na_position='last', kind='stable')
+    if output.active():
+        return output.write(output.frame(table))
+    render.print_table(table, 'rich')
+
+# Shared by every command that accepts several markets
+MARKETS = typer.Argument(None,help="[italic blue]Enter required market(s)[/italic blue]",show_default=False)
+FROM_FILE = typer.Option(None,"--from-file",help="read markets from a watchlist file, one per line")
+CONCURRENCY = typer.Option(8,help="number of markets fetched at the same time")
+# Shared by every tabular command
+LIMIT = typer.Option(None,help="show at most this many rows per table")
+PAGE = typer.Option(1,help="page of rows to show with --limit")
+
+@app.command(help="[bold yellow]Keep a live quote board on screen.[/bold yellow]")
+def watch(market:List[str] = MARKETS,from_file:Path = FROM_FILE,interval:float = typer.Option(5.0,help="seconds between updates"),count:int = typer.Option(None,help="stop after this many updates")):
+    from stockcli.watch import records, watch as live_board
+    markets = read_symbols(market, from_file)
+    require_markets(markets)
+    try:
+        (records if output.active() else live_board)(markets, interval, count)
+    except KeyboardInterrupt:
+        pass
+
 @app.command(help="[bold yellow]Get stock information.[/bold yellow]")
-def info(market:str = typer.Argument(...,help="[italic blue]Enter required market[/italic blue]")):
-    def main():
-        ticker = yf.Ticker(market.upper())
-        info = ticker.info
-        exist = True if info['regularMarketPrice'] != None else False
-        if exist:
-            console = Console()
-            table = Table("Name", "Value")
-            for k,v in info.items():
-                table.add_row(k,str(v),end_section=True)
-            console.print(table)
-        else:
-            rich.print(f"[yellow][bold]Sorry[/bold] ,unrecognized market:[bold]'{market}'[/bold][/yellow]")
-    def spinner():
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            transient=True,
-        ) as progress:
-            progress.add_task(description="Processing...", total=None)
-            time.sleep(5)
-    t1 = threading.Thread(target=main, args=())
-    t2 = threading.Thread(target=spinner, args=())
-    t1.start()
-    t2.start()
-    t1.join()
+def info(market:List[str] = MARKETS,from_file:Path = FROM_FILE,concurrency:int = CONCURRENCY):
+    def fetch(symbol):
+        if symbols.lookup(symbol) is False:
+            return None
+        info = data.get(symbol, 'info')
+        exist = True if info.get('regularMarketPrice') != None else False
+        symbols.remember(symbol, exist)
+        return info if exist else None
+    def show(symbol, info):
+        if output.active():
+            return output.write(output.frame(info, symbol=symbol))
+        from rich.console import Console
+        from rich.table import Table
+        console = Console()
+        table = Table("Name", "Value")
+        for k,v in info.items():
+            table.add_row(k,str(v),end_section=True)
+        console.print(table)
+    run_batch(fetch, show, read_symbols(market, from_file), concurrency)
+
+@app.command(help="[bold yellow]Screen markets on their info fields, e.g. [italic]trailingPE < 15 and marketCap > 10B[/italic].[/bold yellow]")
+def screen(market:List[str] = MARKETS,from_file:Path = FROM_FILE,where:str = typer.Option(None,"--where",help="filter over the fields, e.g. \"trailingPE < 15 and marketCap > 10B and sector == 'Technology'\""),sort:str = typer.Option(None,"--sort",help="fields to sort by, -field for descending, e.g. -marketCap,trailingPE"),top:int = typer.Option(None,"--top",help="keep only the first this many matches"),field:List[str] = typer.Option(None,"--field",help="keep another info field in the snapshot (and show it)"),concurrency:int = CONCURRENCY,limit:int = LIMIT,page:int = PAGE):
+    from stockcli import screen as snapshots
+    universe = read_symbols(market, from_file)
+    extra = list(dict.fromkeys(field or []))
+    for name in extra:
+        if not name.isidentifier():
+            unrecognized('field', name)
+    snapshot = snapshots.load() if cache.enabled else None
+    known = [] if snapshot is None else list(snapshot.columns.drop('fetched'))
+    fields = list(dict.fromkeys(snapshots.FIELDS + known + extra))
+    def fetch(symbol):
+        if symbols.lookup(symbol) is False:
+            return {}
+        info = data.get(symbol, 'info')
+        exist = info.get('regularMarketPrice') is not None
+        symbols.remember(symbol, exist)
+        return info if exist else {}
+    # Only the symbols without a fresh row are fetched
+    stale = snapshots.stale(snapshot, universe, fields)
+    failed, unknown, rows = 0, 0, {}
+    for symbol, info, error in run_many(fetch, stale, concurrency, description="Updating snapshot..."):
+        if not report(symbol, info, error):
+            failed += 1
+            continue
+        unknown += not info
+        rows[symbol] = snapshots.row(info, fields)
+    if rows:
+        snapshot = snapshots.merge(snapshot, rows, fields)
+        if cache.enabled:
+            snapshots.save(snapshot)
+    if unknown:
+        say(f"[yellow]{unknown} unrecognized markets, they never match.[/yellow]")
+    if snapshot is None:
+        say("[red]Error: no snapshot yet. Pass the markets to screen or [bold]--from-file[/bold].[/red]")
+        raise typer.Exit(code=1)
+    candidates = snapshot[snapshot.index.isin(universe)] if universe else snapshot
+    try:
+        matches = snapshots.evaluate(candidates, where, sort, top)
+    except Exception as e:
+        say(f"[red]Error: can't screen on [bold]{where or sort}[/bold]: {type(e).__name__}: {e}[/red]")
+        raise typer.Exit(code=1)
+    if output.active():
+        output.write(output.frame(matches.drop(columns='fetched')))
+    else:
+        shown = list(dict.fromkeys(snapshots.COLUMNS + snapshots.referenced(matches, where, sort) + extra))
+        render.print_table(matches[shown].reset_index(), 'rich', limit, page)
+        rich.print(f"[italic]{len(matches)} of {len(candidates)} markets match.[/italic]")
+    give_up(failed, len(stale))
+
+INTERVALS = ['5m','15m','30m','1h','1d']
+INTERVAL = typer.Option(default="1d",help="[italic blue]Enter required timeframe(5m,15m,30m,1h,1d)[/italic blue]")
+PERIOD = typer.Option(default="1mo",help="[italic blue]How far back to chart (1d,5d,1mo,3mo,6mo,1y,2y,5y,10y,ytd,max)[/italic blue]")
+START = typer.Option(None,formats=["%Y-%m-%d"],help="[italic blue]First day to chart, overrides --period[/italic blue]")
+
+def history(interval, period, start):
+    # Fetch the price history of a market from the local store, after checking the window
+    if interval not in INTERVALS:
+        unrecognized('interval', interval)
+    if period not in store.PERIODS:
+        unrecognized('period', period)
+    def fetch(symbol):
+        if symbols.lookup(symbol) is False:
+            return None
+        # Only the bars newer than the local store are downloaded
+        key = cache.make_key(symbol, 'bars', interval=interval, period=period, start=start)
+        hist = data.kept(key, lambda: store.update(symbol, interval, period, start), store.FRESH)
+        symbols.remember(symbol, not hist.empty)
+        return None if hist.empty else hist
+    return fetch
+
+def parse_indicators(specs):
+    from stockcli import indicators
+    parsed = [indicators.parse(spec) for spec in specs]
+    for spec, indicator in zip(specs, parsed):
+        if indicator is None:
+            unrecognized('indicator', spec)
+    return parsed
 
 @app.command(help="[bold yellow]Get historical market data.[/bold yellow]")
-def chart(market:str = typer.Argument(...,help="[italic blue]Enter required market[/italic blue]"),interval:str = typer.Option(default="1d",help="[italic blue]Enter required timeframe(5m,15m,30m,1h,1d)[/italic blue]")):
-    def main():
-        intervals = ['5m','15m','30m','1h','1d']
-        valid_interval = True if interval in intervals else False
-        if not valid_interval:
-            rich.print(f"[yellow][bold]Sorry[/bold] ,unrecognized interval:[bold]'{interval}'[/bold][/yellow]")
-            typer.Exit()
-        else:
-            ticker = yf.Ticker(market.upper())
-            hist = ticker.history(interval=interval)
-            if hist.empty:
-                rich.print(f"[yellow][bold]Sorry[/bold] ,unrecognized market:[bold]'{market}'[/bold][/yellow]")
-                typer.Exit()
+def chart(market:List[str] = MARKETS,from_file:Path = FROM_FILE,interval:str = INTERVAL,period:str = PERIOD,start:datetime = START,overlay:List[str] = typer.Option(None,"--overlay",help="draw an indicator too, e.g. sma:50, bbands:20,2 or rsi:14 (see the indicators command)"),out:Path = typer.Option(None,"--out",help="save one image per market into this directory instead of opening a window"),image_format:str = typer.Option("png","--image-format",help="png or svg, with --out"),workers:int = typer.Option(None,help="processes drawing the --out images (default: one per core)"),max_bars:int = typer.Option(charts.MAX_BARS,help="merge bars into at most this many candles, 0 keeps every bar"),concurrency:int = CONCURRENCY):
+    fetch = history(interval, period, start)
+    if image_format not in charts.FORMATS:
+        unrecognized('image format', image_format)
+    overlay = overlay or []
+    parse_indicators(overlay)
+    markets = read_symbols(market, from_file)
+    if output.active():
+        return run_batch(fetch, lambda symbol, hist: output.write(output.frame(hist, symbol=symbol)), markets, concurrency)
+    if out is not None:
+        return save_charts(fetch, markets, out, interval, image_format, workers, max_bars, overlay, concurrency)
+    if len(markets) != 1:
+        say("[red]Error: pass one market to open its chart, or save several with [bold]--out[/bold].[/red]")
+        raise typer.Exit(code=1)
+    hist = run(fetch, markets[0])
+    if hist is None:
+        unrecognized('market', markets[0])
+    import mplfinance as mpf
+    with trace.span('render chart', 'render'):
+        frame, kwargs = charts.plot(hist, f"{markets[0]}@{interval}", max_bars, overlay, sessions=interval != '1d')
+        mpf.plot(frame, **kwargs)
+
+def save_charts(fetch, markets, out, interval, image_format, workers, max_bars, overlay, concurrency):
+    require_markets(markets)
+    out.mkdir(parents=True, exist_ok=True)
+    failed = 0
+    def histories():
+        nonlocal failed
+        for symbol, hist, error in run_many(fetch, markets, concurrency, description="Downloading..."):
+            if report(symbol, hist, error):
+                yield symbol, hist
             else:
-                del hist['Dividends']
-                del hist['Stock Splits']
-                mpf.plot(hist,type="candle",style="yahoo",volume=True,title=f"{market}@{interval}")
-    def spinner():
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            transient=True,
-        ) as progress:
-            progress.add_task(description="Processing...", total=None)
-            time.sleep(2)
-    t1 = threading.Thread(target=main, args=())
-    t2 = threading.Thread(target=spinner, args=())
-    t1.start()
-    t2.start()
-    t1.join()
+                failed += 1
+    with trace.span('render charts', 'render'):
+        for symbol, path, error in charts.save(histories(), out, interval, image_format, workers, max_bars, overlay):
+            if report(symbol, path, error):
+                rich.print(f"[green]Saved [bold]{path}[/bold][/green]")
+            else:
+                failed += 1
+    give_up(failed, len(markets))
+
+@app.command(help="[bold yellow]Show technical indicators (SMA, EMA, RSI, MACD, Bollinger bands, VWAP).[/bold yellow]")
+def indicators(market:List[str] = MARKETS,from_file:Path = FROM_FILE,indicator:List[str] = typer.Option(None,"--indicator","-i",help="name[:params]: sma:20, ema:20, rsi:14, macd:12,26,9, bbands:20,2 or vwap (default: all of these)"),interval:str = INTERVAL,period:str = PERIOD,start:datetime = START,rows:int = typer.Option(10,help="latest bars shown per market, 0 for all"),concurrency:int = CONCURRENCY):
+    from stockcli.indicators import DEFAULT, compute
+    fetch = history(interval, period, start)
+    specs = parse_indicators(indicator or DEFAULT)
+    histories, failed = collect(fetch, read_symbols(market, from_file), concurrency)
+    # Every market in one call, as (markets, bars) arrays
+    with trace.span('compute indicators', 'transform'):
+        frames = compute(histories, specs, sessions=interval != '1d')
+    for symbol, frame in frames.items():
+        if output.active():
+            output.write(output.frame(frame, symbol=symbol))
+            continue
+        if len(frames) > 1:
+            rich.print(f"[bold green3]{symbol}[/bold green3]")
+        shown = frame[['Close', *(c for i in specs for c in i.columns)]]
+        render.print_table((shown.tail(rows) if rows else shown).reset_index(), 'rich')
+    if failed:
+        if len(frames) or failed > 1:
+            say(f"[yellow]{failed} of {failed + len(frames)} markets failed.[/yellow]")
+        raise typer.Exit(code=1)
+
+@app.command(help="[bold yellow]Analyze a portfolio: returns, volatility, drawdowns, beta, correlations and rolling metrics.[/bold yellow]")
+def portfolio(market:List[str] = typer.Argument(None,help="[italic blue]Enter required market(s), optionally weighted: AAPL=0.6 MSFT=0.4[/italic blue]",show_default=False),from_file:Path = FROM_FILE,period:str = typer.Option("1y",help="[italic blue]How far back to look (1mo,3mo,6mo,1y,2y,5y,10y,ytd,max)[/italic blue]"),start:datetime = typer.Option(None,formats=["%Y-%m-%d"],help="[italic blue]First day to look at, overrides --period[/italic blue]"),benchmark:str = typer.Option("^GSPC",help="index to measure beta against, '' for none"),window:int = typer.Option(63,help="days of the rolling metrics"),matrix:str = typer.Option(None,"--matrix",help="also show the correlation (corr) or covariance (cov) matrix"),rolling:int = typer.Option(0,"--rolling",help="also show the rolling metrics of the portfolio over this many latest days"),concurrency:int = CONCURRENCY):
+    from stockcli import portfolio as portfolios
+    if matrix is not None and matrix not in portfolios.MATRICES:
+        unrecognized('matrix', matrix)
+    if output.active() and matrix and rolling:
+        say("[red]Error: records hold one table, pass [bold]--matrix[/bold] or [bold]--rolling[/bold].[/red]")
+        raise typer.Exit(code=1)
+    try:
+        markets, weights = portfolios.weights(read_symbols(market, from_file))
+    except ValueError as e:
+        say(f"[red]Error: {e}.[/red]")
+        raise typer.Exit(code=1)
+    fetch = history('1d', period, start)
+    def closes(symbol):
+        hist = fetch(symbol)
+        # Days in the market's own time zone, the closes and the dividends. Not
+        # Adj Close: the stored bars keep the adjustment of their own download
+        return None if hist is None else (hist.index.tz_localize(None).values, hist['Close'].to_numpy(), hist['Dividends'].to_numpy())
+    benchmark = benchmark.upper()
+    # The benchmark comes in the same batch as the markets
+    asked = markets + [benchmark] if benchmark and benchmark not in markets else markets
+    series, failed = collect(closes, asked, concurrency)
+    found = [m for m in markets if m in series]
+    if not found:
+        raise typer.Exit(code=1)
+    weights = weights[[markets.index(m) for m in found]]
+    # Without the failed markets, what is left may carry no weight, or only short positions
+    if not weights.sum() > 0:
+        say("[red]Error: the weights of the markets left don't add up to more than 0.[/red]")
+        give_up(failed, len(asked))
+    weights = weights / weights.sum()
+    rows = found + ([benchmark] if benchmark in series and benchmark not in found else [])
+    days, prices = portfolios.matrix([series[m][:2] for m in rows])
+    _, dividends = portfolios.matrix([series[m][::2] for m in rows])
+    returns = portfolios.returns(prices, dividends)
+    index = returns[rows.index(benchmark)] if benchmark in series else None
+    metrics = portfolios.metrics(found, weights, returns[:len(found)], index, window)
+    tables = [('Metrics', metrics.reset_index())]
+    if matrix:
+        values = portfolios.covariance(returns[:len(found)])
+        if matrix == 'corr':
+            values = portfolios.correlation(values)
+        import pandas as pd
+        tables.append(('Correlation' if matrix == 'corr' else 'Covariance', pd.DataFrame(values, index=pd.Index(found, name='market'), columns=found).reset_index()))
+    if rolling:
+        combined = portfolios.combine(returns[:len(found)], weights)
+        tables.append(('Rolling', portfolios.rolling(days[1:], combined, index, window).tail(rolling).reset_index()))
+    if output.active():
+        output.write(output.frame(tables[-1][1]))
+    else:
+        for title, table in tables:
+            if len(tables) > 1:
+                rich.print(f"[bold green3]{title}[/bold green3]")
+            render.print_table(table, 'rich')
+    if failed:
+        raise typer.Exit(code=1)
 
 @app.command(help="[bold yellow]Show actions (dividends, splits).[/bold yellow]")
-def actions(market:str = typer.Argument(...,help="[italic blue]Enter required market[/italic blue]")):
-    def main():
-        ticker = yf.Ticker(market.upper())
-        df = ticker.actions.reset_index()
-        if df.empty:
-            rich.print(f"[yellow][bold]Sorry[/bold] ,unrecognized market:[bold]'{market}'[/bold][/yellow]")
-            typer.Exit()
-        else:
-            console = Console()
-            table = Table("Date", "Dividends","Stock Splits")
-            for index, row in df.iterrows():
-                table.add_row(str(row['Date']),str(row['Dividends']),str(row['Stock Splits']),end_section=True)
-            console.print(table)
-    def spinner():
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            transient=True,
-        ) as progress:
-            progress.add_task(description="Processing...", total=None)
-            time.sleep(0.5)
-    t1 = threading.Thread(target=main, args=())
-    t2 = threading.Thread(target=spinner, args=())
-    t1.start()
-    t2.start()
-    t1.join()
+def actions(market:List[str] = MARKETS,from_file:Path = FROM_FILE,concurrency:int = CONCURRENCY,limit:int = LIMIT,page:int = PAGE):
+    def fetch(symbol):
+        df = data.get(symbol, 'actions').reset_index()
+        return None if df.empty else df
+    run_batch(fetch, table_renderer('rich', limit, page), read_symbols(market, from_file), concurrency)
 
 @app.command(help="[bold yellow]Show splits.[/bold yellow]")
-def splits(market:str = typer.Argument(...,help="[italic blue]Enter required market[/italic blue]")):
-    def main():
-        ticker = yf.Ticker(market.upper())
-        df = ticker.splits.reset_index()
-        if df.empty:
-            rich.print(f"[yellow][bold]Sorry[/bold] ,unrecognized market:[bold]'{market}'[/bold][/yellow]")
-            typer.Exit()
-        else:
-            console = Console()
-            table = Table("Date","Stock Splits")
-            for index, row in df.iterrows():
-                table.add_row(str(row['Date']),str(row['Stock Splits']),end_section=True)
-            console.print(table)
-    def spinner():
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            transient=True,
-        ) as progress:
-            progress.add_task(description="Processing...", total=None)
-            time.sleep(0.5)
-    t1 = threading.Thread(target=main, args=())
-    t2 = threading.Thread(target=spinner, args=())
-    t1.start()
-    t2.start()
-    t1.join()
+def splits(market:List[str] = MARKETS,from_file:Path = FROM_FILE,concurrency:int = CONCURRENCY,limit:int = LIMIT,page:int = PAGE):
+    def fetch(symbol):
+        df = data.get(symbol, 'splits').reset_index()
+        return None if df.empty else df
+    run_batch(fetch, table_renderer('rich', limit, page), read_symbols(market, from_file), concurrency)
 
 @app.command(help="[bold yellow]Show financials.[/bold yellow]")
-def finance(market:str = typer.Argument(...,help="[italic blue]Enter required market[/italic blue]"),quater:bool = typer.Option(default=False,help="get quarterly financials")):
-    def main():
-        ticker = yf.Ticker(market.upper())
-        df = ticker.history()
-        if df.empty:
-            rich.print(f"[yellow][bold]Sorry[/bold] ,unrecognized market:[bold]'{market}'[/bold][/yellow]")
-            typer.Exit()
-        else:
-            # Create a dataframe (we can't use this `df` DataFrame because of column names are change)
-            df = ticker.financials.reset_index() if quater else ticker.quarterly_financials.reset_index()
-            # DataFrame -> Json -> Dict
-            data = json.loads(df.to_json())
-            # Create `headers` List & `finance` Dict
-            headers, finance = ['Attribute'], {}
-            # Update `headers` List or Loop `data` keys
-            for key in data.keys():
-                if key.endswith('000'):
-                    key = int(key)
-                    key /= 1000
-                    headers.append(datetime.utcfromtimestamp(int(key)).strftime('%Y-%m-%d'))
-            # _____Optinal______
-            # Declare and Initialize variable `i`
-            i = 0
-            # Loop `data` values 
-            for value in data.values():
-                dt = []
-                for val in value.values():
-                    dt.append(str(val))
-                finance.update({headers[i]:dt})
-                i+=1
-            # Override `df` variable 
-            df = pd.DataFrame(finance)
-            # _____Optinal_______
-            # Create `console` instance 
-            console = Console()
-            # Create a table instance 
-            table = Table(headers[0],headers[1],headers[2],headers[3],headers[4])
-            # Loop `df` DateFrame
-            for index, row in df.iterrows():
-                table.add_row(str(row[headers[0]]),str(row[headers[1]]),str(row[headers[2]]),str(row[headers[3]]),str(row[headers[4]]),end_section=True)
-            # rich.print Rich's table
-            console.print(table)
-    def spinner():
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            transient=True,
-        ) as progress:
-            progress.add_task(description="Processing...", total=None)
-            time.sleep(5)
-    t1 = threading.Thread(target=main, args=())
-    t2 = threading.Thread(target=spinner, args=())
-    t1.start()
-    t2.start()
-    t1.join()
+def finance(market:List[str] = MARKETS,quater:bool = typer.Option(default=False,help="get quarterly financials"),from_file:Path = FROM_FILE,concurrency:int = CONCURRENCY,limit:int = LIMIT,page:int = PAGE):
+    def fetch(symbol):
+        if not symbols.exists(symbol):
+            return None
+        df = data.get(symbol, 'financials', quarterly=quater).reset_index()
+        # Row labels first, then one column per period end date
+        return df.rename(columns={df.columns[0]: 'Attribute'})
+    run_batch(fetch, table_renderer('rich', limit, page), read_symbols(market, from_file), concurrency)
 
 @app.command(help="[bold yellow]Show major holders.[/bold yellow]")
-def holders(market:str = typer.Argument(...,help="[italic blue]Enter required market[/italic blue]")):
-    def main():
-        ticker = yf.Ticker(market.upper())
+def holders(market:List[str] = MARKETS,from_file:Path = FROM_FILE,concurrency:int = CONCURRENCY,limit:int = LIMIT,page:int = PAGE):
+    def fetch(symbol):
         # Declare and Initialize `df:DataFrame`
-        df = ticker.major_holders
-        if df.empty:
-            rich.print(f"[yellow][bold]Sorry[/bold] ,unrecognized market:[bold]'{market}'[/bold][/yellow]")
-            typer.Exit()
-        else:
-            # Declare and Initialize `header:List`
-            header = df.columns.values.tolist()
-            # Create `console` instance 
-            console = Console()
-            # Create a table instance 
-            table = Table(str(header[0]),str(header[1]))
-            # Loop `df` DateFrame
-            for index, row in df.iterrows():
-                table.add_row(str(row[header[0]]),str(row[header[1]]),end_section=True)
-            # rich.print Rich's table
-            console.print(table)
-    def spinner():
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            transient=True,
-        ) as progress:
-            progress.add_task(description="Processing...", total=None)
-            time.sleep(5)
-    t1 = threading.Thread(target=main, args=())
-    t2 = threading.Thread(target=spinner, args=())
-    t1.start()
-    t2.start()
-    t1.join()
+        df = data.get(symbol, 'major_holders')
+        return None if df is None or df.empty else df
+    run_batch(fetch, table_renderer('rich', limit, page), read_symbols(market, from_file), concurrency)
 
 @app.command(help="[bold yellow]Show institutional holders.[/bold yellow]")
-def institutional_holders(market:str = typer.Argument(...,help="[italic blue]Enter required market[/italic blue]")):
-    def main():
-        ticker = yf.Ticker(market.upper())
+def institutional_holders(market:List[str] = MARKETS,from_file:Path = FROM_FILE,concurrency:int = CONCURRENCY,limit:int = LIMIT,page:int = PAGE):
+    def fetch(symbol):
         # Declare and Initialize `df:DataFrame`
-        df = ticker.institutional_holders
-        if df.empty:
-            rich.print(f"[yellow][bold]Sorry[/bold] ,unrecognized market:[bold]'{market}'[/bold][/yellow]")
-            typer.Exit()
-        else:
-            # Declare and Initialize `header:List`
-            header = df.columns.values.tolist()
-            # Create `console` instance 
-            console = Console()
-            # Create a table instance 
-            table = Table(str(header[0]),str(header[1]),str(header[2]),str(header[3]),str(header[4]))
-            # Loop `df` DateFrame
-            for index, row in df.iterrows():
-                table.add_row(str(row[header[0]]),str(row[header[1]]),str(row[header[2]]),str(row[header[3]]),str(row[header[4]]),end_section=True)
-            # rich.print Rich's table
-            console.print(table)
-    def spinner():
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            transient=True,
-        ) as progress:
-            progress.add_task(description="Processing...", total=None)
-            time.sleep(5)
-    t1 = threading.Thread(target=main, args=())
-    t2 = threading.Thread(target=spinner, args=())
-    t1.start()
-    t2.start()
-    t1.join()
+        df = data.get(symbol, 'institutional_holders')
+        return None if df is None or df.empty else df
+    run_batch(fetch, table_renderer('rich', limit, page), read_symbols(market, from_file), concurrency)
+
+def table_renderer(style, limit, page):
+    # Render callback for `run_batch`: the whole frame through the shared table renderer
+    def show(symbol, df):
+        if output.active():
+            return output.write(output.frame(df, symbol=symbol))
+        render.print_table(df, style, limit, page)
+    return show
+
+def statement(dataset, quater=None):
+    # Fetch a dataset of a market, after checking the market exists
+    def fetch(symbol):
+        if not symbols.exists(symbol):
+            return None
+        params = {} if quater is None else {'quarterly': quater}
+        # Declare and Initialize `df` DataFrame According to the condition
+        return data.get(symbol, dataset, **params).reset_index()
+    return fetch
 
 @app.command(help="[bold yellow]Show balance sheet.[/bold yellow]")
-def balance_sheet(market:str = typer.Argument(...,help="[italic blue]Enter required market[/italic blue]"),quater:bool = typer.Option(default=False,help="get quarterly balance_sheet")):
-    def main():
-        # Declare and Initialize `ticker` instance 
-        ticker = yf.Ticker(market.upper())
-        hist = ticker.history()
-        if hist.empty:
-            rich.print(f"[yellow][bold]Sorry[/bold] ,unrecognized market:[bold]'{market}'[/bold][/yellow]")
-            typer.Exit()
-        else:
-            # Declare and Initialize `df` DataFrame According to the condition
-            df = ticker.quarterly_balance_sheet.reset_index() if quater else ticker.balance_sheet.reset_index()
-            # Declare and Initialize `headers` and `rows` Lists
-            headers, rows = df.columns.values.tolist(), []
-            # Declare and Initialize `table` instance
-            table = ColorTable(theme=Themes.OCEAN)
-            # Set table header 
-            table.field_names = headers
-            # Set borders 
-            table.hrules = ALL
-            # Set table rows 
-            for index,row in df.iterrows():
-                table.add_row([row[headers[i]] for i in range(len(row))])
-            # Print table 
-            print(table)
-    def spinner():
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            transient=True,
-        ) as progress:
-            progress.add_task(description="Processing...", total=None)
-            time.sleep(5)
-    t1 = threading.Thread(target=main, args=())
-    t2 = threading.Thread(target=spinner, args=())
-    t1.start()
-    t2.start()
-    t1.join()
+def balance_sheet(market:List[str] = MARKETS,quater:bool = typer.Option(default=False,help="get quarterly balance_sheet"),from_file:Path = FROM_FILE,concurrency:int = CONCURRENCY,limit:int = LIMIT,page:int = PAGE):
+    run_batch(statement('balance_sheet', quater), table_renderer('color', limit, page), read_symbols(market, from_file), concurrency)
 
 @app.command(help="[bold yellow]Show cashflow.[/bold yellow]")
-def cashflow(market:str = typer.Argument(...,help="[italic blue]Enter required market[/italic blue]"),quater:bool = typer.Option(default=False,help="get quarterly cashflow")):
-    def main():
-        # Declare and Initialize `ticker` instance 
-        ticker = yf.Ticker(market.upper())
-        hist = ticker.history()
-        if hist.empty:
-            rich.print(f"[yellow][bold]Sorry[/bold] ,unrecognized market:[bold]'{market}'[/bold][/yellow]")
-            typer.Exit()
-        else:
-            # Declare and Initialize `df` DataFrame According to the condition
-            df = ticker.quarterly_cashflow.reset_index() if quater else ticker.cashflow.reset_index()
-            # Declare and Initialize `headers` and `rows` Lists
-            headers, rows = df.columns.values.tolist(), []
-            # Declare and Initialize `table` instance
-            table = ColorTable(theme=Themes.OCEAN)
-            # Set table header 
-            table.field_names = headers
-            # Set borders 
-            table.hrules = ALL
-            # Set table rows 
-            for index,row in df.iterrows():
-                table.add_row([row[headers[i]] for i in range(len(row))])
-            # Print table 
-            print(table)
-    def spinner():
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            transient=True,
-        ) as progress:
-            progress.add_task(description="Processing...", total=None)
-            time.sleep(5)
-    t1 = threading.Thread(target=main, args=())
-    t2 = threading.Thread(target=spinner, args=())
-    t1.start()
-    t2.start()
-    t1.join()
+def cashflow(market:List[str] = MARKETS,quater:bool = typer.Option(default=False,help="get quarterly cashflow"),from_file:Path = FROM_FILE,concurrency:int = CONCURRENCY,limit:int = LIMIT,page:int = PAGE):
+    run_batch(statement('cashflow', quater), table_renderer('color', limit, page), read_symbols(market, from_file), concurrency)
 
 @app.command(help="[bold yellow]Show earnings.[/bold yellow]")
-def earning(market:str = typer.Argument(...,help="[italic blue]Enter required market[/italic blue]"),quater:bool = typer.Option(default=False,help="get quarterly cashflow")):
-    def main():
-        # Declare and Initialize `ticker` instance 
-        ticker = yf.Ticker(market.upper())
-        hist = ticker.history()
-        if hist.empty:
-            rich.print(f"[yellow][bold]Sorry[/bold] ,unrecognized market:[bold]'{market}'[/bold][/yellow]")
-            typer.Exit()
-        else:
-            # Declare and Initialize `df` DataFrame According to the condition
-            df = ticker.quarterly_earnings.reset_index() if quater else ticker.earnings.reset_index()
-            # Declare and Initialize `headers` and `rows` Lists
-            headers, rows = df.columns.values.tolist(), []
-            # Declare and Initialize `table` instance
-            table = ColorTable(theme=Themes.OCEAN)
-            # Set table header 
-            table.field_names = headers
-            # Set borders 
-            table.hrules = ALL
-            # Set table rows 
-            for index,row in df.iterrows():
-                table.add_row([row[headers[i]] for i in range(len(row))])
-            # Print table 
-            print(table)
-    def spinner():
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            transient=True,
-        ) as progress:
-            progress.add_task(description="Processing...", total=None)
-            time.sleep(5)
-    t1 = threading.Thread(target=main, args=())
-    t2 = threading.Thread(target=spinner, args=())
-    t1.start()
-    t2.start()
-    t1.join()
+def earning(market:List[str] = MARKETS,quater:bool = typer.Option(default=False,help="get quarterly earnings"),from_file:Path = FROM_FILE,concurrency:int = CONCURRENCY,limit:int = LIMIT,page:int = PAGE):
+    run_batch(statement('earnings', quater), table_renderer('color', limit, page), read_symbols(market, from_file), concurrency)
+
+@app.command(help="[bold yellow]Show income, balance sheet, cash flow and earnings with ratios.[/bold yellow]")
+def statements(market:List[str] = MARKETS,quater:bool = typer.Option(default=False,help="get quarterly statements"),from_file:Path = FROM_FILE,concurrency:int = CONCURRENCY,limit:int = LIMIT,page:int = PAGE):
+    from stockcli.statements import fetch as fetch_statements, ratios, stack
+    panels = {}
+    def fetch(symbol):
+        if not symbols.exists(symbol):
+            return None
+        return fetch_statements(symbol, quater)
+    def show(symbol, result):
+        panel, earnings = result
+        panels[symbol] = panel
+        if output.active():
+            # One record per period: every statement item, then the ratios
+            stacked = stack({symbol: panel})
+            return output.write(output.frame(stacked.join(ratios(stacked))))
+        render.print_table(panel.reset_index(), 'color', limit, page)
+        if earnings is not None and not earnings.empty:
+            render.print_table(earnings.reset_index(), 'color')
+    try:
+        run_batch(fetch, show, read_symbols(market, from_file), concurrency)
+    finally:
+        # One table of ratios for every symbol and period, computed in one go
+        if panels and not output.active():
+            rich.print("[bold green3]Ratios[/bold green3]")
+            render.print_table(ratios(stack(panels)).reset_index(), 'rich')
 
 @app.command(help="[bold yellow]Show sustainability.[/bold yellow]")
-def sustainability(market:str = typer.Argument(...,help="[italic blue]Enter required market[/italic blue]")):
-    def main():
-        # Declare and Initialize `ticker` instance 
-        ticker = yf.Ticker(market.upper())
-        hist = ticker.history()
-        if hist.empty:
-            rich.print(f"[yellow][bold]Sorry[/bold] ,unrecognized market:[bold]'{market}'[/bold][/yellow]")
-            typer.Exit()
-        else:
-            # Declare and Initialize `df` DataFrame
-            df = ticker.sustainability.reset_index()
-            # Declare and Initialize `headers` and `rows` Lists
-            headers, rows = df.columns.values.tolist(), []
-            # Declare and Initialize `table` instance
-            table = ColorTable(theme=Themes.OCEAN)
-            # Set table header 
-            table.field_names = headers
-            # Set borders 
-            table.hrules = ALL
-            # Set table rows 
-            for index,row in df.iterrows():
-                table.add_row([row[headers[i]] for i in range(len(row))])
-            # Print table 
-            print(table)
-    def spinner():
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            transient=True,
-        ) as progress:
-            progress.add_task(description="Processing...", total=None)
-            time.sleep(5)
-    t1 = threading.Thread(target=main, args=())
-    t2 = threading.Thread(target=spinner, args=())
-    t1.start()
-    t2.start()
-    t1.join()
+def sustainability(market:List[str] = MARKETS,from_file:Path = FROM_FILE,concurrency:int = CONCURRENCY,limit:int = LIMIT,page:int = PAGE):
+    run_batch(statement('sustainability'), table_renderer('color', limit, page), read_symbols(market, from_file), concurrency)
 
 @app.command(help="[bold yellow]Show analysts recommendations.[/bold yellow]")
-def recommendations(market:str = typer.Argument(...,help="[italic blue]Enter required market[/italic blue]")):
-    def main():
-        ticker = yf.Ticker(market.upper())
-        # Declare and Initialize `df:DataFrame`
-        hist = ticker.history()
-        if hist.empty:
-            rich.print(f"[yellow][bold]Sorry[/bold] ,unrecognized market:[bold]'{market}'[/bold][/yellow]")
-            typer.Exit()
-        else:
-            # Declare and Initialize `df` DataFrame
-            df = ticker.recommendations.reset_index()
-            # Declare and Initialize `header:List`
-            header = df.columns.values.tolist()
-            # Create `console` instance 
-            console = Console()
-            # Create a table instance 
-            table = Table(str(header[0]),str(header[1]),str(header[2]),str(header[3]),str(header[4]))
-            # Loop `df` DateFrame
-            for index, row in df.iterrows():
-                table.add_row(str(row[header[0]]),str(row[header[1]]),str(row[header[2]]),str(row[header[3]]),str(row[header[4]]),end_section=True)
-            # rich.print Rich's table
-            console.print(table)
-    def spinner():
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            transient=True,
-        ) as progress:
-            progress.add_task(description="Processing...", total=None)
-            time.sleep(5)
-    t1 = threading.Thread(target=main, args=())
-    t2 = threading.Thread(target=spinner, args=())
-    t1.start()
-    t2.start()
-    t1.join()
+def recommendations(market:List[str] = MARKETS,from_file:Path = FROM_FILE,concurrency:int = CONCURRENCY,limit:int = LIMIT,page:int = PAGE):
+    run_batch(statement('recommendations'), table_renderer('rich', limit, page), read_symbols(market, from_file), concurrency)
 
 @app.command(help="[bold yellow]Show next event (earnings, etc).[/bold yellow]")
-def calendar(market:str = typer.Argument(...,help="[italic blue]Enter required market[/italic blue]")):
-    def main():
-        ticker = yf.Ticker(market.upper())
-        # Declare and Initialize `df:DataFrame`
-        hist = ticker.history()
-        if hist.empty:
-            rich.print(f"[yellow][bold]Sorry[/bold] ,unrecognized market:[bold]'{market}'[/bold][/yellow]")
-            typer.Exit()
-        else:
-            # Declare and Initialize `df` DataFrame
-            df = ticker.calendar.reset_index()
-            # Declare and Initialize `header:List`
-            header = df.columns.values.tolist()
-            # Create `console` instance 
-            console = Console()
-            # Create a table instance 
-            table = Table(str(header[0]),str(header[1]),str(header[2]))
-            # Loop `df` DateFrame
-            for index, row in df.iterrows():
-                table.add_row(str(row[header[0]]),str(row[header[1]]),str(row[header[2]]),end_section=True)
-            # rich.print Rich's table
-            console.print(table)
-    def spinner():
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            transient=True,
-        ) as progress:
-            progress.add_task(description="Processing...", total=None)
-            time.sleep(5)
-    t1 = threading.Thread(target=main, args=())
-    t2 = threading.Thread(target=spinner, args=())
-    t1.start()
-    t2.start()
-    t1.join()
+def calendar(market:List[str] = MARKETS,from_file:Path = FROM_FILE,concurrency:int = CONCURRENCY,limit:int = LIMIT,page:int = PAGE):
+    run_batch(statement('calendar'), table_renderer('rich', limit, page), read_symbols(market, from_file), concurrency)
+
+def news_panels(news):
+    from datetime import datetime
+    from rich.columns import Columns
+    from rich.panel import Panel
+    def get_news_panel(n):
+        return f"[bold green3]{n['publisher']}[/bold green3] {n['type']}\n[bold light_cyan1]{n['title']}.[/bold light_cyan1]\n[light_cyan1]Visit for more details[/light_cyan1] [italic blue]{n['link']}[/italic blue]\n[bold]{datetime.utcfromtimestamp(n['providerPublishTime']).strftime('%Y-%m-%d')}[/bold]"
+    return Columns([Panel(get_news_panel(n), expand=True) for n in news])
 
 @app.command(help="[bold yellow]Show news.[/bold yellow]")
-def news(market:str = typer.Argument(...,help="[italic blue]Enter required market[/italic blue]")):
-    def main():
-        ticker = yf.Ticker(market.upper())
-        # Declare and Initialize `df:DataFrame`
-        hist = ticker.history()
-        if hist.empty:
-            rich.print(f"[yellow][bold]Sorry[/bold] ,unrecognized market:[bold]'{market}'[/bold][/yellow]")
-            typer.Exit()
-        else:
-            # Create `console` instance 
-            console = Console()
-            # Create `news` Dict 
-            news = ticker.news
-            def get_news_panel(n):
-                return f"[bold green3]{n['publisher']}[/bold green3] {n['type']}\n[bold light_cyan1]{n['title']}.[/bold light_cyan1]\n[light_cyan1]Visit for more details[/light_cyan1] [italic blue]{n['link']}[/italic blue]\n[bold]{datetime.utcfromtimestamp(n['providerPublishTime']).strftime('%Y-%m-%d')}[/bold]"
-            news = [Panel(get_news_panel(n), expand=True) for n in news]
-            console.print(Columns(news))
-    def spinner():
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            transient=True,
-        ) as progress:
-            progress.add_task(description="Processing...", total=None)
-            time.sleep(0.5)
-    t1 = threading.Thread(target=main, args=())
-    t2 = threading.Thread(target=spinner, args=())
-    t1.start()
-    t2.start()
-    t1.join()
+def news(market:List[str] = MARKETS,from_file:Path = FROM_FILE,watchlist:Path = typer.Option(None,"--watchlist",help="show only articles not shown before, once across the markets of this watchlist file"),follow:bool = typer.Option(False,"--follow",help="keep checking for new articles"),interval:float = typer.Option(60.0,help="seconds between checks, with --follow"),count:int = typer.Option(None,help="stop after this many checks, with --follow"),concurrency:int = CONCURRENCY):
+    if watchlist or follow:
+        return news_feed(read_symbols(market, watchlist or from_file), follow, interval, count, concurrency)
+    def fetch(symbol):
+        if not symbols.exists(symbol):
+            return None
+        return data.get(symbol, 'news')
+    def show(symbol, news):
+        if output.active():
+            return output.write(output.frame(news, symbol=symbol))
+        from rich.console import Console
+        Console().print(news_panels(news))
+    run_batch(fetch, show, read_symbols(market, from_file), concurrency)
+
+def news_feed(markets, follow, interval, count, concurrency):
+    # Only the articles not emitted before, as they come in
+    from stockcli import feed
+    require_markets(markets, '--watchlist')
+    # Markets known not to exist are skipped without asking Yahoo
+    markets = [m for m in markets if symbols.lookup(m) is not False]
+    failed = False
+    try:
+        for articles, errors in feed.polls(markets, interval, count if follow else 1, concurrency):
+            for symbol, error in errors.items():
+                report(symbol, None, error)
+            failed = bool(errors)
+            if not articles:
+                continue
+            if output.active():
+                output.write(output.frame([{f: a.get(f) for f in feed.FIELDS} for a in articles]))
+            else:
+                from rich.console import Console
+                Console().print(news_panels(articles))
+    except KeyboardInterrupt:
+        return
+    if failed:
+        raise typer.Exit(code=1)
+
+@app.command(help="[bold yellow]Keep stockcli warm in a resident daemon, other commands are forwarded to it.[/bold yellow]")
+def serve(stop:bool = typer.Option(False,"--stop",help="stop the running daemon")):
+    from stockcli import daemon
+    if stop:
+        if not daemon.stop():
+            say("[yellow]No stockcli daemon is running.[/yellow]")
+            raise typer.Exit(code=1)
+        return rich.print("[green]Stopped the stockcli daemon.[/green]")
+    probe = daemon.connect()
+    if probe is not None:
+        probe.close()
+        say(f"[red]Error: a stockcli daemon is already listening on [bold]{daemon.socket_path()}[/bold].[/red]")
+        raise typer.Exit(code=1)
+    try:
+        daemon.serve(ready=lambda path: rich.print(f"[green]Listening on [bold]{path}[/bold], stop with [bold]stockcli serve --stop[/bold].[/green]"))
+    except KeyboardInterrupt:
+        pass
+
+@app.command(help="[bold yellow]Run commands in an interactive shell that keeps fetched data between them.[/bold yellow]")
+def shell():
+    from stockcli import shell as repl
+    repl.main()
+
+@cache_app.command("stats",help="[bold yellow]Show cache hit rate and size.[/bold yellow]")
+def cache_stats():
+    if output.active():
+        return output.write(output.frame(cache.stats()))
+    from rich.console import Console
+    from rich.table import Table
+    stats = cache.stats()
+    console = Console()
+    table = Table("Name", "Value")
+    table.add_row("path",stats['path'],end_section=True)
+    table.add_row("entries",str(stats['entries']),end_section=True)
+    table.add_row("bytes",str(stats['bytes']),end_section=True)
+    table.add_row("bytes on disk",str(stats['bytes_on_disk']),end_section=True)
+    table.add_row("hits",str(stats['hits']),end_section=True)
+    table.add_row("misses",str(stats['misses']),end_section=True)
+    table.add_row("hit rate",f"{stats['hit_rate']:.1%}",end_section=True)
+    for name, ds in stats['datasets'].items():
+        table.add_row(f"dataset {name}",f"{ds['entries']} entries, {ds['bytes']} bytes",end_section=True)
+    for name, value in stats['requests'].items():
+        table.add_row(f"requests {name}",str(value),end_section=True)
+    console.print(table)
+
+@cache_app.command("clear",help="[bold yellow]Remove every cached response.[/bold yellow]")
+def cache_clear():
+    removed = cache.clear()
+    if output.active():
+        return output.write(output.frame({'removed': removed}))
+    rich.print(f"[green]Removed [bold]{removed}[/bold] cached entries.[/green]")
 
+@cache_app.command("prune",help="[bold yellow]Remove expired entries and evict down to the size cap.[/bold yellow]")
+def cache_prune(max_bytes:int = typer.Option(None,help="size cap in bytes (defaults to STOCKCLI_CACHE_MAX_BYTES or 256MB)")):
+    removed = cache.prune(max_bytes)
+    if output.active():
+        return output.write(output.frame({'removed': removed}))
+    rich.print(f"[green]Removed [bold]{removed}[/bold] cached entries.[/green]")
@@ -0,0 +1,61 @@
+import os
+import threading
+from urllib.parse import urlsplit, urlunsplit
+from stockcli import scheduler, trace
+
+# Point every Yahoo request at another host, e.g. a local stand-in server:
+#   STOCKCLI_YAHOO_URL=http://127.0.0.1:8800 stockcli info AAPL
+YAHOO_URL_ENV = 'STOCKCLI_YAHOO_URL'
+# Connections kept open per host, enough for the batch fetch pool
+POOL_SIZE = 64
+
+_session = None
+_lock = threading.Lock()
+
+
+def rewrite(url):
+    base = os.environ.get(YAHOO_URL_ENV)
+    if not base:
+        return url
+    parts = urlsplit(url)
+    if not parts.netloc.endswith('yahoo.com'):
+        return url
+    target = urlsplit(base)
+    return urlunsplit((target.scheme, target.netloc, target.path.rstrip('/') + parts.path, parts.query, parts.fragment))
+
+
+def key_of(method, url, params):
+    """What identifies a request that may share another's answer (None: it may not)."""
+    if method.upper() != 'GET':
+        return None
+    if isinstance(params, dict):
+        params = sorted(params.items())
+    return f'{url}?{params!r}' if params else url
+
+
+def session():
+    """The process-wide `requests` session handed to every `yf.Ticker`.
+
+    Sharing it keeps connections alive across tickers and threads.
+    """
+    global _session
+    with _lock:
+        if _session is None:
+            import requests
+
+            class YahooSession(requests.Session):
+                def request(self, method, url, *args, **kwargs):
+                    url = rewrite(url)
+
+                    def send():
+                        with trace.span(f'{method} {urlsplit(url).path}', 'http', url=url):
+                            return super(YahooSession, self).request(method, url, *args, **kwargs)
+                    # Threads asking for the same quote at once share the answer
+                    key = key_of(method, url, kwargs.get('params')) if not args else None
+                    return scheduler.call(urlsplit(url).netloc, send, (requests.ConnectionError, requests.Timeout), key)
+
+            _session = YahooSession()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+            _session.mount('https://', adapter)
+            _session.mount('http://', adapter)
+        return _session
@@ -0,0 +1,128 @@
+import sys
+import rich
+import typer
+from stockcli import trace
+
+# Output formats; everything but `table` writes records instead of drawing tables
+FORMATS = ['table', 'json', 'ndjson', 'csv', 'parquet', 'arrow']
+# Written in one go when the command ends (needs pyarrow)
+BINARY = ['parquet', 'arrow']
+
+# Set by the global `--format` / `--output` options
+format = 'table'
+path = None
+
+_out = None
+_written = 0
+_frames = []
+# Columns of the CSV header, written with the first frame, and the ones left out
+_columns = None
+_left_out = set()
+
+
+def active():
+    return format != 'table'
+
+
+def check():
+    """Exit early when the chosen format can't be written."""
+    if format in BINARY:
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            rich.print(f"[red]Error: [bold]--format {format}[/bold] needs pyarrow ([bold]pip install pyarrow[/bold]).[/red]", file=sys.stderr)
+            raise typer.Exit(code=1)
+        if path is None and sys.stdout.isatty():
+            rich.print(f"[red]Error: [bold]{format}[/bold] is a binary format, write it to a file with [bold]--output[/bold].[/red]", file=sys.stderr)
+            raise typer.Exit(code=1)
+
+
+def frame(value, **keys):
+    """`value` (a DataFrame, a dict or a list of dicts) as a flat DataFrame with `keys` as leading columns."""
+    import pandas as pd
+    from stockcli import render
+    with trace.span('records', 'transform'):
+        if isinstance(value, dict):
+            df = pd.DataFrame([value])
+        elif isinstance(value, list):
+            df = pd.DataFrame(value)
+        elif isinstance(value.index, pd.RangeIndex):
+            df = value.copy()
+        else:
+            df = value.reset_index()
+        # Statement columns are period end dates
+        df.columns = [render.header(c) for c in df.columns]
+        for i, (name, key) in enumerate(keys.items()):
+            df.insert(i, name, df.pop(name) if name in df else key)
+    return df
+
+
+def stream():
+    global _out
+    if _out is None:
+        binary = format in BINARY
+        if path is not None:
+            _out = open(path, 'wb' if binary else 'w', newline='' if format == 'csv' else None)
+        else:
+            _out = sys.stdout.buffer if binary else sys.stdout
+    return _out
+
+
+def write(df):
+    """Write the records of `df`.
+
+    ndjson, csv and json are written (and flushed) as soon as each frame is ready,
+    so a consumer sees every symbol as it arrives. Binary formats are written on `close`.
+    CSV rows all follow the header of the first frame: later frames are put in
+    its columns, and columns it doesn't have are left out with a warning.
+    """
+    global _written, _columns
+    if df.empty:
+        return
+    if format in BINARY:
+        _frames.append(df)
+        return
+    out = stream()
+    if format == 'ndjson':
+        text = df.to_json(orient='records', lines=True, date_format='iso', force_ascii=False)
+        out.write(text if text.endswith('\n') else text + '\n')
+    elif format == 'csv':
+        if _columns is None:
+            _columns = list(df.columns)
+        extra = [str(c) for c in df.columns if c not in _columns and str(c) not in _left_out]
+        if extra:
+            _left_out.update(extra)
+            rich.print(f"[yellow]Warning: left out of the CSV, not in its header: {', '.join(extra)}. "
+                       f"Use [bold]--format ndjson[/bold] to keep them.[/yellow]", file=sys.stderr)
+        df.reindex(columns=_columns).to_csv(out, index=False, header=_written == 0)
+    elif format == 'json':
+        out.write('[' if _written == 0 else ',')
+        out.write(df.to_json(orient='records', date_format='iso', force_ascii=False)[1:-1])
+    out.flush()
+    _written += 1
+
+
+def close():
+    """Finish the output: close the JSON array, write binary formats, close the file."""
+    global _out, _written, _columns
+    if not active():
+        return
+    if format == 'json':
+        stream().write('[]\n' if _written == 0 else ']\n')
+    elif format in BINARY and _frames:
+        import pandas as pd
+        import pyarrow as pa
+        table = pa.Table.from_pandas(pd.concat(_frames, ignore_index=True), preserve_index=False)
+        if format == 'parquet':
+            import pyarrow.parquet as pq
+            pq.write_table(table, stream())
+        else:
+            with pa.ipc.new_stream(stream(), table.schema) as writer:
+                writer.write_table(table)
+    if _out is not None:
+        _out.flush()
+        if path is not None:
+            _out.close()
+    _out, _written, _columns = None, 0, None
+    _frames.clear()
+    _left_out.clear()
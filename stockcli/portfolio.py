@@ -0,0 +1,166 @@
+"""Portfolio analytics over one aligned (markets, days) price matrix.
+
+Every market's daily closes (split-adjusted) are placed in a single
+contiguous float64 array, one row per market on the sorted union of their
+trading days, and its dividends in another; a dividend counts in the return
+of its ex-date. Everything else is whole-array NumPy: returns along the rows,
+the covariance matrix as one matrix product, drawdowns from running maxima
+and rolling windows from cumulative sums (see `stockcli.indicators.rolling`).
+1,000 markets over 10 years is a 1000x2520 array, 20 MB.
+"""
+import warnings
+from contextlib import contextmanager
+
+import numpy as np
+from stockcli import indicators, trace
+
+# Trading days per year, to annualize daily figures
+YEAR = 252
+# Bars of the rolling windows (about three months)
+WINDOW = 63
+MATRICES = ['corr', 'cov']
+
+
+@contextmanager
+def quiet():
+    # Rows without a value are NaN; nanmean/nanstd warn about them whatever np.errstate says
+    with warnings.catch_warnings(), np.errstate(invalid='ignore', divide='ignore'):
+        warnings.simplefilter('ignore', RuntimeWarning)
+        yield
+
+
+def weights(specs):
+    """`(symbols, weights)` of `SYMBOL[=WEIGHT]` specs, the weights scaled to sum to 1.
+
+    Without any weight the markets are equally weighted. Raises ValueError for
+    a bad weight, or weights given to only some markets.
+    """
+    symbols, given = [], []
+    for spec in specs:
+        symbol, _, weight = spec.partition('=')
+        symbols.append(symbol.upper())
+        given.append(float(weight) if weight else None)
+    if all(w is None for w in given):
+        given = [1.0] * len(symbols)
+    elif any(w is None for w in given):
+        raise ValueError('give a weight to every market or to none')
+    total = sum(given)
+    if not total:
+        raise ValueError('the weights add up to 0')
+    return symbols, np.array(given) / total
+
+
+def matrix(series):
+    """The sorted union of the days of `[(days, prices)]` and the (series, days) price matrix, NaN where a series has no bar."""
+    with trace.span('align prices', 'transform', series=len(series)):
+        days = [np.asarray(d, dtype='datetime64[D]') for d, _ in series]
+        union = np.unique(np.concatenate(days)) if days else np.array([], dtype='datetime64[D]')
+        prices = np.full((len(series), len(union)), np.nan)
+        rows = np.repeat(np.arange(len(series)), [len(d) for d in days])
+        if len(rows):
+            prices[rows, np.searchsorted(union, np.concatenate(days))] = np.concatenate([np.asarray(p, dtype=float) for _, p in series])
+        return union, prices
+
+
+def returns(prices, dividends=None):
+    """Daily total returns of the rows of `prices`, with the `dividends` paid on each day.
+
+    A missing bar repeats the last price, NaN before a row starts.
+    """
+    filled = indicators.ffill(prices, np.full(prices.shape[:-1], np.nan))
+    paid = 0.0 if dividends is None else np.nan_to_num(dividends[..., 1:])
+    return (filled[..., 1:] + paid) / filled[..., :-1] - 1
+
+
+def combine(asset_returns, weights):
+    """Returns of the portfolio rebalanced to `weights` every day.
+
+    Markets without a return on a day (not listed yet) are left out of it and
+    the others scaled up to the full weight.
+    """
+    valid = ~np.isnan(asset_returns)
+    present = weights @ valid
+    with quiet():
+        return np.where(present != 0, weights @ np.where(valid, asset_returns, 0.0) / present, np.nan)
+
+
+def drawdowns(r):
+    """The fall of the compounded wealth of the rows of `r` from its running peak, every day."""
+    wealth = np.cumprod(1 + np.nan_to_num(r), axis=-1)
+    return wealth / np.maximum(np.maximum.accumulate(wealth, axis=-1), 1.0) - 1
+
+
+def covariance(r):
+    """Covariance of every pair of rows of `r` over the days both have, in one matrix product.
+
+    Each row is centred on its mean over all of its days rather than on the
+    days it shares with the other row, which is what makes it one product.
+    """
+    valid = ~np.isnan(r)
+    counts = valid.astype(float)
+    pairs = counts @ counts.T
+    with quiet():
+        centred = np.where(valid, r - np.nanmean(r, axis=-1, keepdims=True), 0.0)
+        return np.where(pairs > 1, centred @ centred.T / (pairs - 1), np.nan)
+
+
+def correlation(cov):
+    scale = np.sqrt(np.diag(cov))
+    with quiet():
+        corr = np.clip(cov / np.outer(scale, scale), -1, 1)
+    # Exactly 1, not 0.9999999 from rounding
+    np.fill_diagonal(corr, np.where(scale > 0, 1.0, np.nan))
+    return corr
+
+
+def beta(r, market):
+    """Beta of every row of `r` against the `market` returns, over the days both have."""
+    valid = ~np.isnan(r) & ~np.isnan(market)
+    x = np.where(valid, r, np.nan)
+    m = np.where(valid, market, np.nan)
+    with quiet():
+        x = x - np.nanmean(x, axis=-1, keepdims=True)
+        m = m - np.nanmean(m, axis=-1, keepdims=True)
+        return np.nansum(x * m, axis=-1) / np.nansum(m * m, axis=-1)
+
+
+def metrics(symbols, weights, asset_returns, market=None, window=WINDOW):
+    """One row of figures per market, and one for the portfolio (as PORTFOLIO)."""
+    import pandas as pd
+    with trace.span('portfolio metrics', 'transform', markets=len(symbols)):
+        r = np.vstack([asset_returns, combine(asset_returns, weights)])
+        with quiet():
+            days = (~np.isnan(r)).sum(axis=-1)
+            total = np.expm1(np.nansum(np.log1p(r), axis=-1))
+            mean, std = np.nanmean(r, axis=-1), np.nanstd(r, axis=-1, ddof=1)
+            recent = np.nanstd(r[:, -window:], axis=-1, ddof=1)
+            frame = pd.DataFrame({
+                'weight': np.append(weights, weights.sum()),
+                'days': days,
+                'total return': total,
+                'annual return': np.where(days > 0, (1 + total) ** (YEAR / np.maximum(days, 1)) - 1, np.nan),
+                'annual volatility': std * np.sqrt(YEAR),
+                'sharpe': mean / std * np.sqrt(YEAR),
+                'max drawdown': drawdowns(r).min(axis=-1, initial=0.0),
+                'beta': beta(r, market) if market is not None else np.nan,
+                f'volatility {window}d': recent * np.sqrt(YEAR),
+            }, index=pd.Index(symbols + ['PORTFOLIO'], name='market'))
+    return frame
+
+
+def rolling(days, portfolio, market=None, window=WINDOW):
+    """The portfolio's return, volatility, beta and drawdown over the last `window` days, every day."""
+    import pandas as pd
+    with trace.span('rolling metrics', 'transform', days=len(days)):
+        m = np.full_like(portfolio, np.nan) if market is None else market
+        # One pass over the log returns, the returns, the market and their product
+        rows = np.vstack([np.log1p(portfolio), portfolio, m, portfolio * m])
+        mean, variance, _ = indicators.rolling(rows, window, np.empty((len(rows), 0)))
+        with quiet():
+            frame = pd.DataFrame({
+                'return': np.expm1(mean[0] * window),
+                'volatility': np.sqrt(variance[1] * window / (window - 1) * YEAR),
+                'beta': (mean[3] - mean[1] * mean[2]) / variance[2],
+                'drawdown': drawdowns(portfolio),
+            }, index=pd.DatetimeIndex(days, name='Date'))
+    return frame
@@ -0,0 +1,89 @@
+import math
+import rich
+
+# Table styles: rich `Table` (most commands) or prettytable's OCEAN `ColorTable`
+STYLES = ['rich', 'color']
+
+
+def format_column(column):
+    """Format a whole Series to strings at once instead of calling `str()` per cell.
+
+    Dates without a time part print as YYYY-MM-DD, whole floats print without
+    the trailing `.0`, other floats keep up to 4 decimals, missing values are blank.
+    """
+    import numpy as np
+    import pandas as pd
+    if pd.api.types.is_datetime64_any_dtype(column):
+        times = column.dt.tz_localize(None) if column.dt.tz is not None else column
+        midnight = (times.dropna() == times.dropna().dt.normalize()).all()
+        text = column.dt.strftime('%Y-%m-%d' if midnight else '%Y-%m-%d %H:%M:%S')
+    elif pd.api.types.is_bool_dtype(column):
+        text = column.astype(str)
+    elif pd.api.types.is_integer_dtype(column):
+        text = column.astype(str)
+    elif pd.api.types.is_float_dtype(column):
+        values = column.to_numpy(dtype='float64')
+        finite = np.isfinite(values)
+        whole = finite & (np.mod(values, 1) == 0) & (np.abs(values) < 1e15)
+        text = pd.Series(np.where(finite, np.round(values, 4), 0).astype(str), index=column.index)
+        if whole.any():
+            text[whole] = values[whole].astype('int64').astype(str)
+    else:
+        text = column.astype(str)
+    return text.where(column.notna(), '').tolist()
+
+
+def header(column):
+    # Statement columns are period end dates
+    if hasattr(column, 'strftime'):
+        return column.strftime('%Y-%m-%d' if (column.hour, column.minute, column.second) == (0, 0, 0) else '%Y-%m-%d %H:%M:%S')
+    return str(column)
+
+
+def paginate(df, limit=None, page=1):
+    """Rows of `page` (1-based) when `limit` rows are shown per page, and a footer line."""
+    total = len(df)
+    if not limit or total <= limit:
+        return df, None
+    pages = math.ceil(total / limit)
+    page = min(max(page, 1), pages)
+    first = (page - 1) * limit
+    rows = df.iloc[first:first + limit]
+    return rows, f"Rows {first + 1}-{first + len(rows)} of {total} (page {page}/{pages}, use --page to see more)"
+
+
+def build(df, style='rich'):
+    """A rich or prettytable table of every column of `df`, built column-wise."""
+    headers = [header(c) for c in df.columns]
+    columns = [format_column(df.iloc[:, i]) for i in range(len(df.columns))]
+    rows = list(zip(*columns))
+    if style == 'color':
+        from prettytable.colortable import ColorTable,Themes
+        try:
+            from prettytable import HRuleStyle
+            ALL = HRuleStyle.ALL
+        except ImportError:
+            # prettytable < 3.12
+            from prettytable import ALL
+        table = ColorTable(theme=Themes.OCEAN)
+        table.field_names = headers
+        table.hrules = ALL
+        table.add_rows(rows)
+        return table
+    from rich.table import Table
+    table = Table(*headers)
+    for row in rows:
+        table.add_row(*row, end_section=True)
+    return table
+
+
+def print_table(df, style='rich', limit=None, page=1):
+    rows, footer = paginate(df, limit, page)
+    table = build(rows, style)
+    if style == 'color':
+        print(table)
+    else:
+        from rich.console import Console
+        Console().print(table)
+    if footer:
+        rich.print(f"[italic]{footer}[/italic]")
@@ -0,0 +1,174 @@
+import sys
+import threading
+import rich
+import typer
+from rich.progress import Progress, SpinnerColumn, TextColumn
+from stockcli import output, trace
+
+# How long a task may run before the spinner is shown. Results that arrive
+# faster than this never flash a spinner on screen.
+SPINNER_DELAY = 0.1
+
+
+def spinner(*columns):
+    # Records own stdout under `--format`, the spinner then goes to stderr
+    from rich.console import Console
+    console = Console(stderr=True) if output.active() else rich.get_console()
+    return Progress(SpinnerColumn(), *columns, transient=True, console=console, disable=not console.is_terminal)
+
+
+def say(message):
+    # Messages go to stderr when stdout carries records (`--format`)
+    rich.print(message, file=sys.stderr if output.active() else None)
+
+
+def run(task, *args, description="Processing...", **kwargs):
+    """Run `task(*args, **kwargs)` in a worker thread and return its result.
+
+    A transient spinner is shown only while the task is still pending, and the
+    call returns as soon as the task finishes. Exceptions raised by the task are
+    re-raised in the calling thread: `typer.Exit`/`typer.Abort` keep their exit
+    code, anything else is reported and turned into exit code 1.
+    """
+    outcome = {}
+
+    def target():
+        try:
+            with trace.span(description, 'worker'):
+                outcome['result'] = task(*args, **kwargs)
+        except BaseException as e:
+            outcome['error'] = e
+
+    # Daemon thread, so Ctrl-C never waits for a stuck network call
+    worker = threading.Thread(target=target, daemon=True)
+    worker.start()
+    worker.join(SPINNER_DELAY)
+    if worker.is_alive():
+        with spinner(TextColumn("[progress.description]{task.description}")) as progress:
+            progress.add_task(description=description, total=None)
+            while worker.is_alive():
+                worker.join(0.05)
+    if 'error' in outcome:
+        error = outcome['error']
+        if isinstance(error, (typer.Exit, typer.Abort, KeyboardInterrupt)):
+            raise error
+        say(f"[red]Error: {type(error).__name__}: {error}[/red]")
+        raise typer.Exit(code=1) from error
+    return outcome.get('result')
+
+
+def sorry(kind, value):
+    say(f"[yellow][bold]Sorry[/bold] ,unrecognized {kind}:[bold]'{value}'[/bold][/yellow]")
+
+
+def unrecognized(kind, value):
+    """Report an unknown market/interval/view and exit with code 1."""
+    sorry(kind, value)
+    raise typer.Exit(code=1)
+
+
+def require_markets(symbols, option='--from-file'):
+    """Exit with code 1 when no market was given, on the command line or with `option`."""
+    if not symbols:
+        say(f"[red]Error: no market given. Pass one or more symbols or [bold]{option}[/bold].[/red]")
+        raise typer.Exit(code=1)
+
+
+def report(symbol, result, error):
+    """Report a `(symbol, result, error)` of `run_many` that failed or was unrecognized (None); whether it is usable."""
+    if error is not None:
+        say(f"[red]Error: [bold]{symbol}[/bold]: {type(error).__name__}: {error}[/red]")
+    elif result is None:
+        sorry('market', symbol)
+    return error is None and result is not None
+
+
+def give_up(failed, total):
+    """Exit with code 1, saying how many of `total` markets failed, when any did."""
+    if failed:
+        say(f"[yellow]{failed} of {total} markets failed.[/yellow]")
+        raise typer.Exit(code=1)
+
+
+def read_symbols(markets, from_file=None):
+    """Symbols from the command line and/or a watchlist file, upper-cased and de-duplicated.
+
+    Watchlist files hold one symbol per line (or several separated by commas
+    or spaces); blank lines and `#` comments are ignored.
+    """
+    symbols = list(markets or [])
+    if from_file is not None:
+        with open(from_file) as f:
+            for line in f:
+                symbols.extend(line.split('#')[0].replace(',', ' ').split())
+    return list(dict.fromkeys(s.upper() for s in symbols))
+
+
+def run_many(task, symbols, concurrency=8, description="Processing..."):
+    """Run `task(symbol)` for every symbol on a bounded thread pool.
+
+    Yields `(symbol, result, error)` in completion order, so callers can render
+    each symbol as soon as it is ready. A failing symbol yields its exception
+    instead of aborting the batch.
+    """
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
+    def work(symbol):
+        with trace.span(symbol, 'worker'):
+            return task(symbol)
+
+    with spinner(TextColumn("[progress.description]{task.description}"), TextColumn("{task.completed}/{task.total}")) as progress:
+        progress_task = progress.add_task(description=description, total=len(symbols))
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+            futures = {pool.submit(work, symbol): symbol for symbol in symbols}
+            try:
+                for future in as_completed(futures):
+                    progress.advance(progress_task)
+                    error = future.exception()
+                    yield futures[future], None if error else future.result(), error
+            finally:
+                for future in futures:
+                    future.cancel()
+
+
+def collect(task, symbols, concurrency=8, description="Processing..."):
+    """`{symbol: result}` of every symbol `task` recognized, in the order given, and the number that failed.
+
+    For commands that need every result before rendering anything. Failures
+    and unrecognized symbols are reported as they come in.
+    """
+    require_markets(symbols)
+    results, failed = {}, 0
+    for symbol, result, error in run_many(task, symbols, concurrency, description):
+        if report(symbol, result, error):
+            results[symbol] = result
+        else:
+            failed += 1
+    return {symbol: results[symbol] for symbol in symbols if symbol in results}, failed
+
+
+def run_batch(task, render, symbols, concurrency=8):
+    """Fetch and render one or many symbols.
+
+    `task(symbol)` returns None for an unrecognized symbol. With a single symbol
+    this behaves like `run`; with several, results are rendered as they arrive
+    under a heading, failures are reported and the exit code is 1 if any failed.
+    """
+    require_markets(symbols)
+    if len(symbols) == 1:
+        result = run(task, symbols[0])
+        if result is None:
+            unrecognized('market', symbols[0])
+        with trace.span(f'render {symbols[0]}', 'render'):
+            render(symbols[0], result)
+        return
+    failed = 0
+    for symbol, result, error in run_many(task, symbols, concurrency):
+        if not report(symbol, result, error):
+            failed += 1
+            continue
+        if not output.active():
+            rich.print(f"[bold green3]{symbol}[/bold green3]")
+        with trace.span(f'render {symbol}', 'render'):
+            render(symbol, result)
+    give_up(failed, len(symbols))
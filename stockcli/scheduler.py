@@ -0,0 +1,268 @@
+"""The scheduler every network request goes through.
+
+  rate limit   a token bucket per host, kept in the cache database so that
+               every stockcli process running at the same time shares it
+  slow-down    a 429/5xx answer halves the host's rate (and a Retry-After
+               pauses it); the rate doubles back every RECOVERY seconds
+  retries      of connection errors, timeouts and 429/5xx answers, with
+               full-jitter backoff
+  coalescing   identical GETs in flight in this process share one request
+
+Limits come from STOCKCLI_RATE, requests per second and burst size, for
+every host and per host, e.g. `STOCKCLI_RATE=10:20,query2.finance.yahoo.com=2`.
+A rate of 0 turns the limit off.
+"""
+import os
+import random
+import threading
+import time
+import weakref
+from stockcli import cache, trace
+
+RATE_ENV = 'STOCKCLI_RATE'
+RATE = 20.0
+BURST = 40.0
+# Extra attempts after a failed one, waiting up to BACKOFF * 2**attempt seconds
+RETRIES = 3
+BACKOFF = 0.25
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# A slowed-down host never goes below this rate, and regains double its rate this often
+MIN_RATE = 0.5
+RECOVERY = 10.0
+# The longest Retry-After honoured
+MAX_PAUSE = 60.0
+
+COUNTERS = ['queued', 'coalesced', 'throttled', 'retried']
+_counts = dict.fromkeys(COUNTERS, 0)
+_lock = threading.Lock()
+_local = threading.local()
+_flights = {}
+_async_flights = weakref.WeakKeyDictionary()
+
+
+def count(name):
+    with _lock:
+        _counts[name] += 1
+
+
+def counters():
+    """Requests of this process that waited for a token, joined one in flight, were throttled or retried."""
+    with _lock:
+        return dict(_counts)
+
+
+def sent():
+    """Requests the calling thread has sent (or joined in flight) so far."""
+    return getattr(_local, 'sent', 0)
+
+
+def reset():
+    with _lock:
+        _counts.update(dict.fromkeys(COUNTERS, 0))
+
+
+def save():
+    """Move this process's counters into the cache database's (`cache stats`)."""
+    with _lock:
+        values = dict(_counts)
+        _counts.update(dict.fromkeys(COUNTERS, 0))
+    if not any(values.values()):
+        return
+    with cache.connect() as db:
+        for name, value in values.items():
+            db.execute('INSERT INTO counters VALUES (?, ?) ON CONFLICT(name) DO UPDATE SET value = value + ?',
+                       (f'requests_{name}', value, value))
+
+
+def print_counters():
+    from rich.console import Console
+    from rich.table import Table
+    table = Table('Requests', 'Count', title='Request scheduler')
+    for name, value in counters().items():
+        table.add_row(name, str(value))
+    Console(stderr=True).print(table)
+
+
+def limits(host):
+    """`(rate, burst)` of `host` from STOCKCLI_RATE."""
+    rate, burst = RATE, BURST
+    for entry in filter(None, os.environ.get(RATE_ENV, '').replace(' ', '').split(',')):
+        name, _, value = entry.rpartition('=')
+        if name and name != host:
+            continue
+        rate_text, _, burst_text = value.partition(':')
+        rate = float(rate_text)
+        burst = float(burst_text) if burst_text else max(1.0, 2 * rate)
+        if name:
+            break
+    return rate, burst
+
+
+def reserve(host, now=None):
+    """Take a token from `host`'s bucket; the seconds to wait before sending.
+
+    Tokens are reserved ahead: a bucket below zero is a queue, each waiter
+    sends when its token has been refilled.
+    """
+    rate, burst = limits(host)
+    if rate <= 0:
+        return 0.0
+    now = time.time() if now is None else now
+    with cache.connect() as db:
+        db.execute('BEGIN IMMEDIATE')
+        row = db.execute('SELECT tokens, updated, rate, paused FROM buckets WHERE host = ?', (host,)).fetchone()
+        tokens, updated, current, paused = row if row else (burst, now, rate, 0.0)
+        elapsed = max(0.0, now - updated)
+        current = min(rate, current * 2 ** (elapsed / RECOVERY))
+        tokens = min(burst, tokens + elapsed * current) - 1
+        db.execute('INSERT OR REPLACE INTO buckets VALUES (?, ?, ?, ?, ?)', (host, tokens, now, current, paused))
+        db.execute('COMMIT')
+    return max(0.0, -tokens / current, paused - now)
+
+
+def slow_down(host, retry_after=None, now=None):
+    """Halve `host`'s rate, and pause it for `retry_after` seconds when given."""
+    rate, burst = limits(host)
+    if rate <= 0:
+        return
+    now = time.time() if now is None else now
+    with cache.connect() as db:
+        db.execute('BEGIN IMMEDIATE')
+        row = db.execute('SELECT tokens, updated, rate, paused FROM buckets WHERE host = ?', (host,)).fetchone()
+        tokens, updated, current, paused = row if row else (burst, now, rate, 0.0)
+        current = max(min(MIN_RATE, rate), current / 2)
+        if retry_after:
+            paused = max(paused, now + min(retry_after, MAX_PAUSE))
+        db.execute('INSERT OR REPLACE INTO buckets VALUES (?, ?, ?, ?, ?)', (host, tokens, updated, current, paused))
+        db.execute('COMMIT')
+
+
+def retry_after(value):
+    """Seconds of a Retry-After header (seconds or an HTTP date), None without one."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    from email.utils import parsedate_to_datetime
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff(attempt):
+    # Full jitter, so concurrent retries don't hit the server in lockstep
+    return random.uniform(0, BACKOFF * 2 ** attempt)
+
+
+def wait_time(host):
+    wait = reserve(host)
+    if wait > 0:
+        count('queued')
+    return wait
+
+
+def outcome(host, response, error, errors, attempt):
+    """Whether to retry after an attempt, recording throttling and retries."""
+    if error is not None:
+        if not isinstance(error, errors) or attempt == RETRIES:
+            raise error
+    elif response.status_code in RETRY_STATUSES:
+        count('throttled')
+        slow_down(host, retry_after(response.headers.get('Retry-After')))
+        if attempt == RETRIES:
+            return False
+    else:
+        return False
+    count('retried')
+    return True
+
+
+def call(host, send, errors=(), key=None):
+    """`send()` to `host` when the rate limit allows, retried, shared by identical requests.
+
+    `errors` are the exceptions worth retrying; `key` identifies requests that
+    may share one in flight (None: never shared).
+    """
+    _local.sent = sent() + 1
+
+    def attempts():
+        for attempt in range(RETRIES + 1):
+            wait = wait_time(host)
+            if wait > 0:
+                with trace.span(f'rate limit {host}', 'http', wait=round(wait, 3)):
+                    time.sleep(wait)
+            response = error = None
+            try:
+                response = send()
+            except Exception as e:
+                error = e
+            if not outcome(host, response, error, errors, attempt):
+                return response
+            time.sleep(backoff(attempt))
+    return attempts() if key is None else coalesce(key, attempts)
+
+
+async def call_async(host, send, errors=(), key=None):
+    """`call` for coroutines: `send()` returns an awaitable."""
+    import asyncio
+    _local.sent = sent() + 1
+
+    async def attempts():
+        for attempt in range(RETRIES + 1):
+            wait = wait_time(host)
+            if wait > 0:
+                await asyncio.sleep(wait)
+            response = error = None
+            try:
+                response = await send()
+            except Exception as e:
+                error = e
+            if not outcome(host, response, error, errors, attempt):
+                return response
+            await asyncio.sleep(backoff(attempt))
+    if key is None:
+        return await attempts()
+    flights = _async_flights.setdefault(asyncio.get_running_loop(), {})
+    if key in flights:
+        count('coalesced')
+        return await asyncio.shield(flights[key])
+    flights[key] = asyncio.ensure_future(attempts())
+    try:
+        return await flights[key]
+    finally:
+        del flights[key]
+
+
+class Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = self.error = None
+
+
+def coalesce(key, fetch):
+    """`fetch()`, or the result of the identical fetch already in flight on another thread."""
+    with _lock:
+        flight = _flights.get(key)
+        leader = flight is None
+        if leader:
+            flight = _flights[key] = Flight()
+        else:
+            _counts['coalesced'] += 1
+    if not leader:
+        flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+    try:
+        flight.result = fetch()
+    except BaseException as e:
+        flight.error = e
+        raise
+    finally:
+        with _lock:
+            del _flights[key]
+        flight.done.set()
+    return flight.result
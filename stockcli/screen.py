@@ -0,0 +1,114 @@
+import os
+import re
+import time
+from stockcli import cache, trace
+
+# `info` fields kept per symbol, besides the ones a screen asks for
+FIELDS = ['shortName', 'sector', 'industry', 'currency', 'regularMarketPrice', 'marketCap', 'trailingPE',
+          'forwardPE', 'priceToBook', 'dividendYield', 'beta', 'profitMargins', 'returnOnEquity',
+          'debtToEquity', 'revenueGrowth', 'averageVolume', 'fiftyTwoWeekHigh', 'fiftyTwoWeekLow']
+# Shown next to the symbol, with the fields the filter and sort use
+COLUMNS = ['shortName', 'sector', 'regularMarketPrice', 'marketCap', 'trailingPE']
+# How long a symbol's row is used before it is fetched again
+TTL = float(os.environ.get('STOCKCLI_SNAPSHOT_TTL_HOURS', 12)) * 3600
+# `10B` in a filter is 10e9
+SUFFIXES = {'K': 1e3, 'M': 1e6, 'B': 1e9, 'T': 1e12}
+NUMBER = re.compile(r'\b(\d+(?:\.\d+)?)([KMBT])\b')
+
+
+def path():
+    return cache.cache_dir() / 'snapshot'
+
+
+def load():
+    """The snapshot as a DataFrame indexed by symbol, over memory-mapped columns.
+
+    Every field is a column, plus `fetched` (epoch seconds). None when there is no snapshot.
+    """
+    import pandas as pd
+    arrays, _ = cache.load_arrays(path(), lambda meta: ['symbol', 'fetched'] + meta['fields'])
+    if arrays is None:
+        return None
+    index = pd.Index(arrays.pop('symbol'), name='symbol')
+    return pd.DataFrame(arrays, index=index, copy=False)
+
+
+def save(snapshot):
+    arrays = {'symbol': snapshot.index.to_numpy(dtype=str)}
+    for name in snapshot.columns:
+        column = snapshot[name]
+        # Text fields as fixed-width unicode, so they load without pickle
+        arrays[name] = column.to_numpy(dtype='float64') if column.dtype.kind in 'fiub' else column.fillna('').to_numpy(dtype=str)
+    cache.save_arrays(path(), arrays, {'fields': [c for c in snapshot.columns if c != 'fetched']})
+
+
+def stale(snapshot, symbols, fields, now=None):
+    """The `symbols` whose rows are missing, older than TTL or lack one of `fields`."""
+    if snapshot is None or cache.refresh:
+        return list(symbols)
+    if any(field not in snapshot for field in fields):
+        return list(symbols)
+    now = time.time() if now is None else now
+    fetched = snapshot['fetched'].reindex(symbols)
+    return list(fetched.index[~(now - fetched <= TTL)])
+
+
+def row(info, fields):
+    """The `fields` of an `info` dict (all None for an unknown symbol)."""
+    return {field: info.get(field) for field in fields}
+
+
+def merge(snapshot, rows, fields, now=None):
+    """`snapshot` with the rows `{symbol: {field: value}}` fetched at `now` put in.
+
+    Fields new to the snapshot leave the rows that weren't fetched stale.
+    """
+    import pandas as pd
+    now = time.time() if now is None else now
+    with trace.span('merge snapshot', 'transform', symbols=len(rows)):
+        fresh = pd.DataFrame.from_dict(rows, orient='index', columns=fields)
+        fresh.insert(0, 'fetched', now)
+        fresh.index.name = 'symbol'
+        for name in fresh.columns[1:]:
+            # Numbers stay numbers, anything else is text
+            numeric = pd.to_numeric(fresh[name], errors='coerce')
+            if numeric.notna().sum() == fresh[name].notna().sum():
+                fresh[name] = numeric.astype('float64')
+        if snapshot is None:
+            return fresh
+        old = snapshot.drop(index=fresh.index, errors='ignore')
+        if any(field not in snapshot for field in fields):
+            old = old.assign(fetched=0.0)
+        # A field with text in either part is text
+        return pd.concat([old, fresh])
+
+
+def expression(where):
+    # Amounts like 10B or 1.5T as plain numbers
+    return NUMBER.sub(lambda m: repr(float(m.group(1)) * SUFFIXES[m.group(2)]), where)
+
+
+def sort_keys(sort):
+    """`(columns, ascending)` of `-marketCap,trailingPE`: a leading `-` sorts descending."""
+    keys = [key.strip() for key in sort.split(',') if key.strip()]
+    return [key.lstrip('-') for key in keys], [not key.startswith('-') for key in keys]
+
+
+def evaluate(snapshot, where=None, sort=None, limit=None):
+    """The rows of `snapshot` matching `where`, sorted by `sort`, at most `limit`.
+
+    `where` is a pandas query over the fields (`trailingPE < 15 and
+    marketCap > 10B`), evaluated on whole columns at once.
+    """
+    with trace.span('screen', 'transform', rows=len(snapshot)):
+        rows = snapshot.query(expression(where)) if where else snapshot
+        if sort:
+            columns, ascending = sort_keys(sort)
+            rows = rows.sort_values(columns, ascending=ascending, na_position='last', kind='stable')
+        return rows.iloc[:limit] if limit else rows
+
+
+def referenced(snapshot, where=None, sort=None):
+    """The fields `where` and `sort` use, in order."""
+    names = re.findall(r'[A-Za-z_][A-Za-z0-9_]*', ' '.join(filter(None, [where, sort])))
+    return [name for name in dict.fromkeys(names) if name in snapshot.columns and name != 'fetched']
@@ -0,0 +1,284 @@
+"""The `stockcli shell` REPL.
+
+Commands run in one process, one after another, over a session that keeps
+  tickers   the last TICKERS `yf.Ticker` objects, with whatever yfinance has
+            fetched through them
+  frames    the last FRAMES datasets and price windows fetched, reused while
+            younger than their cache TTL (store.FRESH for price windows)
+After a command, the datasets likely asked for next about its markets are
+fetched in the background (see NEXT). `:timing` shows after every command
+how long it took and where its data came from.
+"""
+import shlex
+import threading
+import time
+from collections import Counter, OrderedDict
+from stockcli import cache, data, net, scheduler
+from stockcli.runner import say
+
+TICKERS = 64
+FRAMES = 256
+PREFETCH_WORKERS = 4
+# Markets of one command whose next datasets are prefetched
+PREFETCH_MARKETS = 8
+# Command -> the datasets most often asked for next ('bars': the default chart window)
+NEXT = {
+    'info': ['bars', 'financials', 'major_holders'],
+    'chart': ['info', 'financials'],
+    'indicators': ['info', 'financials'],
+    'finance': ['balance_sheet', 'cashflow', 'major_holders'],
+    'balance-sheet': ['financials', 'cashflow'],
+    'cashflow': ['financials', 'balance_sheet'],
+    'holders': ['institutional_holders', 'info'],
+    'institutional-holders': ['major_holders', 'info'],
+    'news': ['info', 'bars'],
+}
+# Prefetched with the parameters the commands ask for by default
+PARAMS = {'financials': {'quarterly': False}, 'balance_sheet': {'quarterly': False}, 'cashflow': {'quarterly': False}}
+# Commands that can't run inside the shell
+NESTED = {'shell', 'serve'}
+META = [':timing', ':help', ':quit']
+PROMPT = 'stockcli> '
+HISTORY_ENTRIES = 1000
+SOURCES = ['memory', 'cache', 'network']
+
+
+class Session:
+    """Ticker objects and frames kept between the commands of one shell."""
+
+    def __init__(self):
+        self.tickers = OrderedDict()
+        self.frames = OrderedDict()
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        # Where the frames of the current command came from
+        self.served = Counter()
+        self.pending = {}
+        self.pool = None
+        self.symbols = set()
+        self.timing = False
+        self._commands = None
+
+    def ticker(self, symbol):
+        import yfinance as yf
+        symbol = symbol.upper()
+        with self.lock:
+            if symbol not in self.tickers:
+                self.tickers[symbol] = yf.Ticker(symbol, session=net.session())
+            self.tickers.move_to_end(symbol)
+            while len(self.tickers) > TICKERS:
+                self.tickers.popitem(last=False)
+            return self.tickers[symbol]
+
+    def frame(self, key, load, ttl):
+        """`load()`, or the copy kept of `key` while younger than `ttl` (and not --refresh)."""
+        with self.lock:
+            held = self.frames.get(key)
+            if held is not None:
+                self.frames.move_to_end(key)
+        if held is not None and not cache.refresh and time.time() - held[0] <= ttl:
+            self.count('memory')
+            return held[1]
+        before = scheduler.sent()
+        value = load()
+        self.count('network' if scheduler.sent() > before else 'cache')
+        if not cache.is_empty(value):
+            with self.lock:
+                self.frames[key] = (time.time(), value)
+                self.frames.move_to_end(key)
+                while len(self.frames) > FRAMES:
+                    self.frames.popitem(last=False)
+        return value
+
+    def count(self, source):
+        # Prefetches are not part of any command
+        if not getattr(self.local, 'prefetching', False):
+            with self.lock:
+                self.served[source] += 1
+
+    def prefetch(self, command, markets):
+        """Fetch the datasets likely asked for after `command` about `markets`, in the background."""
+        from concurrent.futures import ThreadPoolExecutor
+        if command not in NEXT:
+            return
+        if self.pool is None:
+            self.pool = ThreadPoolExecutor(PREFETCH_WORKERS, thread_name_prefix='prefetch')
+        for symbol in markets[:PREFETCH_MARKETS]:
+            futures = [f for f in self.pending.get(symbol, []) if not f.done()]
+            futures += [self.pool.submit(self.fetch, symbol, name) for name in NEXT[command]]
+            self.pending[symbol] = futures
+
+    def fetch(self, symbol, name):
+        from stockcli import main, symbols
+        self.local.prefetching = True
+        try:
+            if symbols.lookup(symbol) is False:
+                return
+            if name == 'bars':
+                main.history('1d', '1mo', None)(symbol)
+            else:
+                data.get(symbol, name, **PARAMS.get(name, {}))
+        except Exception:
+            # Only a guess: the command that needs it will fetch it again and report the error
+            pass
+        finally:
+            self.local.prefetching = False
+
+    def settle(self, markets):
+        """Wait for the prefetches of `markets`: the command is about to ask for the same data."""
+        from concurrent.futures import wait
+        wait([f for symbol in markets for f in self.pending.pop(symbol, [])])
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+
+    def commands(self):
+        """The click group of the app, and `{option: takes a value}` of its global options."""
+        if self._commands is None:
+            import typer
+            from stockcli.main import app
+            group = typer.main.get_command(app)
+            options = {opt: not param.is_flag for param in group.params if hasattr(param, 'is_flag') for opt in param.opts}
+            self._commands = group, options
+        return self._commands
+
+    def command_words(self, argv):
+        """`argv` past the global options (and their values): the command and its arguments."""
+        _, options = self.commands()
+        words = list(argv)
+        while words and words[0].startswith('-'):
+            if options.get(words.pop(0)) and words:
+                words.pop(0)
+        return words
+
+    def parse(self, argv):
+        """`(command, markets)` of a command line, `(None, [])` when it names no command."""
+        group, _ = self.commands()
+        words = self.command_words(argv)
+        if not words or words[0] not in group.commands:
+            return None, []
+        name, command = words[0], group.commands[words[0]]
+        try:
+            ctx = command.make_context(name, words[1:], resilient_parsing=True)
+        except Exception:
+            return name, []
+        return name, [m.upper() for m in ctx.params.get('market') or []]
+
+    def complete(self, line, text):
+        """Completions of the word `text` at the end of `line` (the words before it)."""
+        group, options = self.commands()
+        try:
+            words = shlex.split(line)
+        except ValueError:
+            words = line.split()
+        words = self.command_words(words)
+        if not words:
+            candidates = sorted(group.commands) + sorted(options) + META
+        else:
+            command = group.commands.get(words[0])
+            if command is None:
+                return []
+            if hasattr(command, 'commands'):
+                candidates = sorted(command.commands) if len(words) == 1 else []
+            else:
+                candidates = sorted(opt for param in command.params for opt in param.opts if opt.startswith('-'))
+                candidates += sorted(self.symbols)
+            candidates += ['--help']
+        return [c for c in candidates if c.startswith(text) or c.startswith(text.upper())]
+
+    def execute(self, line):
+        """Run one line typed at the prompt; False when it asks to leave."""
+        from stockcli.daemon import invoke
+        try:
+            argv = shlex.split(line)
+        except ValueError as e:
+            say(f"[red]Error: {e}[/red]")
+            return True
+        if not argv:
+            return True
+        if argv[0].startswith(':'):
+            return self.meta(argv)
+        command, markets = self.parse(argv)
+        if command in NESTED:
+            say(f"[red]Error: [bold]{command}[/bold] can't run inside the shell.[/red]")
+            return True
+        self.settle(markets)
+        self.served.clear()
+        start = time.perf_counter()
+        code = invoke(argv)
+        if self.timing:
+            self.report(time.perf_counter() - start)
+        if code == 0 and markets:
+            self.symbols.update(markets)
+            self.prefetch(command, markets)
+        return True
+
+    def meta(self, argv):
+        if argv[0] in (':quit', ':exit', ':q'):
+            return False
+        if argv[0] == ':timing':
+            self.timing = argv[1:] != ['off'] if argv[1:] else not self.timing
+            say(f"[green]Timing is [bold]{'on' if self.timing else 'off'}[/bold].[/green]")
+        elif argv[0] == ':help':
+            say("Run any stockcli command without the [bold]stockcli[/bold], e.g. [bold]info AAPL[/bold].\n"
+                "[bold]:timing[/bold]  show how long each command took and where its data came from\n"
+                "[bold]:quit[/bold]    leave (or Ctrl-D)")
+        else:
+            say(f"[red]Error: unknown command [bold]{argv[0]}[/bold], see [bold]:help[/bold].[/red]")
+        return True
+
+    def report(self, seconds):
+        sources = ', '.join(f'{self.served[s]} from {s}' for s in SOURCES if self.served[s])
+        say(f"[dim]{seconds:.3f} s, {sources or 'nothing fetched'}[/dim]")
+
+
+def setup_readline(session):
+    """Tab completion and a persistent history, where readline is available; the history file."""
+    try:
+        import readline
+    except ImportError:
+        return None
+
+    def complete(text, state):
+        matches = session.complete(readline.get_line_buffer()[:readline.get_begidx()], text)
+        return matches[state] if state < len(matches) else None
+    readline.set_completer(complete)
+    readline.set_completer_delims(' \t\n')
+    readline.parse_and_bind('tab: complete')
+    path = cache.cache_dir() / 'shell_history'
+    try:
+        readline.read_history_file(path)
+    except OSError:
+        pass
+    readline.set_history_length(HISTORY_ENTRIES)
+    return path
+
+
+def main():
+    session = Session()
+    data.session = session
+    history = setup_readline(session)
+    say("[bold]stockcli shell[/bold]: [bold]:help[/bold] for help, Ctrl-D to leave.")
+    try:
+        while True:
+            try:
+                line = input(PROMPT)
+            except EOFError:
+                print()
+                break
+            except KeyboardInterrupt:
+                print()
+                continue
+            try:
+                if not session.execute(line):
+                    break
+            except KeyboardInterrupt:
+                print()
+    finally:
+        data.session = None
+        session.close()
+        if history is not None:
+            import readline
+            history.parent.mkdir(parents=True, exist_ok=True)
+            readline.write_history_file(history)
@@ -0,0 +1,51 @@
+from stockcli import data, trace
+
+# Statement datasets, in the order they are shown
+STATEMENTS = {'financials': 'Income', 'balance_sheet': 'Balance Sheet', 'cashflow': 'Cash Flow'}
+
+
+def fetch(symbol, quarterly=False):
+    """All statements of `symbol` in one pass.
+
+    Returns `(panel, earnings)`: `panel` is a numeric DataFrame indexed by
+    (statement, item) with one column per period end date, `earnings` is the
+    yearly/quarterly revenue and earnings frame. None when there are no statements.
+    """
+    import pandas as pd
+    frames = data.get_many(symbol, list(STATEMENTS) + ['earnings'], quarterly=quarterly)
+    parts = {STATEMENTS[name]: frames[name] for name in STATEMENTS if frames[name] is not None and not frames[name].empty}
+    if not parts:
+        return None
+    # Align every statement on the same period columns, keep the numbers numeric
+    with trace.span('align statements', 'transform', symbol=symbol):
+        panel = pd.concat(parts, names=['Statement', 'Item']).apply(pd.to_numeric, errors='coerce')
+        panel = panel[sorted(panel.columns, reverse=True)]
+    return panel, frames['earnings']
+
+
+def stack(panels):
+    """Stack {symbol: panel} into one (symbol, period) x item frame."""
+    import pandas as pd
+    rows = {}
+    for symbol, panel in panels.items():
+        items = panel.droplevel('Statement')
+        # e.g. Net Income is reported in both the income and cash flow statements
+        rows[symbol] = items[~items.index.duplicated()].T
+    return pd.concat(rows, names=['symbol', 'period'])
+
+
+def ratios(stacked):
+    """Common ratios for every (symbol, period) row at once."""
+    import pandas as pd
+    item = lambda name: stacked[name] if name in stacked else pd.Series(float('nan'), index=stacked.index)
+    revenue = item('Total Revenue')
+    equity = item('Total Stockholder Equity')
+    debt = item('Long Term Debt').fillna(0) + item('Short Long Term Debt').fillna(0)
+    return pd.DataFrame({
+        'Gross Margin': item('Gross Profit') / revenue,
+        'Operating Margin': item('Operating Income') / revenue,
+        'Net Margin': item('Net Income') / revenue,
+        'ROE': item('Net Income') / equity,
+        'Free Cash Flow': item('Total Cash From Operating Activities') + item('Capital Expenditures'),
+        'Debt/Equity': debt.where(equity.notna()) / equity,
+    }, index=stacked.index)
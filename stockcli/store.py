@@ -0,0 +1,118 @@
+import time
+from datetime import datetime, timezone
+from stockcli import cache, trace
+
+# Columns kept per bar. Open/High/Low/Close, Volume and Dividends are only
+# split-adjusted, so new bars leave them alone except on a split (see `rebase`).
+# Adj Close is also dividend-adjusted, as of the download of each bar: after a
+# dividend the stored bars no longer match newer ones. Returns are computed
+# from Close and Dividends instead (see stockcli.portfolio).
+COLUMNS = ['Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume', 'Dividends']
+PERIOD_DAYS = {'1d': 1, '5d': 5, '1mo': 30, '3mo': 91, '6mo': 182, '1y': 365, '2y': 730, '5y': 1826, '10y': 3652}
+PERIODS = list(PERIOD_DAYS) + ['ytd', 'max']
+# Yahoo only serves intraday bars for a limited look-back
+MAX_DAYS = {'1m': 7, '2m': 60, '5m': 60, '15m': 60, '30m': 60, '90m': 60, '60m': 730, '1h': 730}
+# Seconds `stockcli shell` reuses a window it fetched before asking for newer bars
+FRESH = 60
+
+
+def path(symbol, interval):
+    return cache.cache_dir() / 'history' / symbol.upper() / interval
+
+
+def window_start(interval, period='1mo', start=None):
+    """Epoch seconds of the first bar wanted, or None for the whole history."""
+    now = time.time()
+    if start is not None:
+        begin = start.replace(tzinfo=timezone.utc).timestamp()
+    elif period == 'max':
+        begin = None
+    elif period == 'ytd':
+        begin = datetime(datetime.utcnow().year, 1, 1, tzinfo=timezone.utc).timestamp()
+    else:
+        begin = now - PERIOD_DAYS[period] * 86400
+    if interval in MAX_DAYS:
+        floor = now - MAX_DAYS[interval] * 86400 + 3600
+        begin = floor if begin is None else max(begin, floor)
+    return begin
+
+
+def load(symbol, interval):
+    """The stored bars of (symbol, interval) as a DataFrame over memory-mapped columns, and its metadata."""
+    import pandas as pd
+    arrays, meta = cache.load_arrays(path(symbol, interval), lambda meta: ['index'] + COLUMNS)
+    if arrays is None:
+        return None, {}
+    index = pd.DatetimeIndex(arrays.pop('index'), tz='UTC').tz_convert(meta['tz'])
+    index.name = meta.get('index_name', 'Date')
+    return pd.DataFrame(arrays, index=index, copy=False), meta
+
+
+def save(symbol, interval, df, meta):
+    arrays = {'index': df.index.tz_convert('UTC').tz_localize(None).values.astype('datetime64[ns]').view('int64')}
+    arrays.update({name: df[name].to_numpy(dtype='float64') for name in COLUMNS})
+    cache.save_arrays(path(symbol, interval), arrays, meta)
+
+
+def download(symbol, interval, begin):
+    from stockcli import data
+    ticker = data.ticker(symbol)
+    if begin is None:
+        return ticker.history(period='max', interval=interval, auto_adjust=False, debug=False)
+    return ticker.history(start=int(begin), interval=interval, auto_adjust=False, debug=False)
+
+
+def rebase(df, splits):
+    # Bars stored before a split were priced in pre-split shares; bring them in line
+    df = df.copy()
+    for when, ratio in splits.items():
+        before = df.index < when
+        df.loc[before, ['Open', 'High', 'Low', 'Close', 'Adj Close', 'Dividends']] /= ratio
+        df.loc[before, 'Volume'] *= ratio
+    return df
+
+
+def update(symbol, interval, period='1mo', start=None):
+    """Bring the local store of (symbol, interval) up to date and return the requested window.
+
+    Only bars newer than the last stored one are requested (the last bar is
+    re-fetched, it may have been incomplete). The store is re-based when the new
+    bars carry a split, and extended backwards when a longer window is asked for.
+    Returns an empty DataFrame for unknown symbols.
+    """
+    import pandas as pd
+    begin = window_start(interval, period, start)
+    stored, meta = (None, {}) if cache.refresh or not cache.enabled else load(symbol, interval)
+    covered = meta.get('covered_from')
+    if stored is None or stored.empty or (covered is not None and (begin is None or begin < covered)):
+        fresh = download(symbol, interval, begin)
+        covered = begin
+    else:
+        fresh = download(symbol, interval, stored.index[-1].timestamp())
+    with trace.span('merge history', 'transform', symbol=symbol):
+        if fresh.empty and stored is None:
+            return fresh
+        if fresh.empty:
+            merged = stored
+        else:
+            tz = str(fresh.index.tz)
+            splits = fresh.loc[fresh['Stock Splits'] > 0, 'Stock Splits']
+            merged = fresh[COLUMNS].astype('float64')
+            if stored is not None and not stored.empty:
+                old = stored.tz_convert(tz)
+                splits = splits[splits.index > old.index[-1]]
+                if not splits.empty:
+                    old = rebase(old, splits)
+                merged = pd.concat([old, merged])
+                merged = merged[~merged.index.duplicated(keep='last')].sort_index()
+            if cache.enabled:
+                save(symbol, interval, merged, {
+                    'tz': tz,
+                    'index_name': fresh.index.name or 'Date',
+                    # Earliest time the store is complete from (None: the whole history)
+                    'covered_from': covered,
+                    'synced': time.time(),
+                })
+    if begin is not None:
+        merged = merged[merged.index >= pd.Timestamp(begin, unit='s', tz='UTC')]
+    return merged
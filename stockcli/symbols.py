@@ -0,0 +1,43 @@
+import os
+import time
+from stockcli import cache, trace
+
+# How long a confirmed symbol skips the existence probe
+VALID_TTL = float(os.environ.get('STOCKCLI_SYMBOL_TTL_HOURS', 24)) * 3600
+# Unknown symbols are re-checked sooner, in case they were just listed
+INVALID_TTL = float(os.environ.get('STOCKCLI_BAD_SYMBOL_TTL_HOURS', 1)) * 3600
+
+
+def lookup(symbol):
+    """True/False when the index knows `symbol` and the answer is fresh, else None."""
+    if not cache.enabled or cache.refresh:
+        return None
+    with cache.connect() as db:
+        row = db.execute('SELECT valid, checked FROM symbols WHERE symbol = ?', (symbol.upper(),)).fetchone()
+    if row is None:
+        return None
+    valid, checked = bool(row[0]), row[1]
+    return valid if time.time() - checked <= (VALID_TTL if valid else INVALID_TTL) else None
+
+
+def remember(symbol, valid):
+    if not cache.enabled:
+        return
+    with cache.connect() as db:
+        db.execute('INSERT OR REPLACE INTO symbols VALUES (?, ?, ?)', (symbol.upper(), int(valid), time.time()))
+
+
+def probe(symbol):
+    # Five daily bars: a single small chart request (one day can be empty over a weekend)
+    from stockcli import data
+    return not data.ticker(symbol).history(period='5d', debug=False).empty
+
+
+def exists(symbol):
+    """Whether `symbol` is a known market, probing Yahoo only when the index can't tell."""
+    with trace.span('resolve', 'resolve', symbol=symbol):
+        valid = lookup(symbol)
+        if valid is None:
+            valid = probe(symbol)
+            remember(symbol, valid)
+        return valid
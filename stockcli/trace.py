@@ -0,0 +1,139 @@
+import builtins
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# Phases in the order `--profile` lists them
+CATEGORIES = ['startup', 'import', 'resolve', 'http', 'fetch', 'worker', 'transform', 'render', 'command']
+
+# Set by the global `--profile` / `--trace` options
+enabled = False
+
+STARTED = time.perf_counter()
+_events = []
+_threads = {}
+# Named tracks of spans that overlap on one thread (concurrent asyncio requests)
+_tracks = {}
+_lock = threading.Lock()
+_local = threading.local()
+_import = builtins.__import__
+_command = None
+
+
+def record(name, category, start, end, track=None, **args):
+    """Add a span; `track` puts it on its own named track instead of the current thread's."""
+    thread = threading.current_thread()
+    with _lock:
+        if track is None:
+            tid = thread.ident
+            _threads[tid] = thread.name
+        else:
+            tid = _tracks.setdefault(track, -len(_tracks) - 1)
+            _threads[tid] = track
+        event = {'name': name, 'cat': category, 'ph': 'X', 'pid': os.getpid(), 'tid': tid,
+                 'ts': round((start - STARTED) * 1e6, 1), 'dur': round((end - start) * 1e6, 1)}
+        if args:
+            event['args'] = args
+        _events.append(event)
+
+
+@contextmanager
+def span(name, category, track=None, **args):
+    """Time the enclosed block as one span (a no-op unless tracing is on)."""
+    if not enabled:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, category, start, time.perf_counter(), track, **args)
+
+
+def timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+    # One span per top-level module imported for the first time; the modules
+    # it pulls in itself are part of its span
+    if level or name in sys.modules or getattr(_local, 'importing', False):
+        return _import(name, globals, locals, fromlist, level)
+    _local.importing = True
+    start = time.perf_counter()
+    try:
+        return _import(name, globals, locals, fromlist, level)
+    finally:
+        _local.importing = False
+        record(f"import {name.split('.')[0]}", 'import', start, time.perf_counter())
+
+
+def start(command):
+    """Start tracing `command`; the time since stockcli was imported counts as startup."""
+    global enabled, _command
+    enabled, _command = True, (command, time.perf_counter())
+    record('startup', 'startup', STARTED, _command[1])
+    builtins.__import__ = timed_import
+
+
+def stop():
+    global enabled
+    if not enabled:
+        return
+    builtins.__import__ = _import
+    enabled = False
+    name, begin = _command
+    record(name or 'stockcli', 'command', begin, time.perf_counter())
+
+
+def events():
+    with _lock:
+        return list(_events)
+
+
+def write(path):
+    """Write the spans as a Chrome trace (chrome://tracing, ui.perfetto.dev), one track per thread."""
+    with _lock:
+        names = [{'name': 'thread_name', 'ph': 'M', 'pid': os.getpid(), 'tid': tid, 'args': {'name': name}}
+                 for tid, name in _threads.items()]
+        trace = {'traceEvents': names + _events, 'displayTimeUnit': 'ms'}
+    with open(path, 'w') as f:
+        json.dump(trace, f)
+
+
+def summary():
+    """`[(category, name, calls, total ms, max ms)]`, phases in order, slowest first within a phase."""
+    totals = {}
+    for event in events():
+        key = (event['cat'], event['name'])
+        calls, total, longest = totals.get(key, (0, 0.0, 0.0))
+        totals[key] = (calls + 1, total + event['dur'] / 1000, max(longest, event['dur'] / 1000))
+    rows = [(cat, name, calls, total, longest) for (cat, name), (calls, total, longest) in totals.items()]
+    return sorted(rows, key=lambda r: (CATEGORIES.index(r[0]), -r[3]))
+
+
+def print_summary():
+    from rich.console import Console
+    from rich.table import Table
+    table = Table('Phase', 'Span', 'Calls', 'Total (ms)', 'Max (ms)', title='Time per phase', caption='Spans on worker threads overlap, totals can exceed the wall time')
+    for category, name, calls, total, longest in summary():
+        table.add_row(category, name, str(calls), f'{total:.1f}', f'{longest:.1f}')
+    Console(stderr=True).print(table)
+
+
+def finish(profile=False, path=None):
+    """Stop tracing, then print the `--profile` summary and/or write the `--trace` file."""
+    stop()
+    if path is not None:
+        write(path)
+    if profile:
+        print_summary()
+
+
+def reset():
+    global _command
+    stop()
+    with _lock:
+        _events.clear()
+        _threads.clear()
+        _tracks.clear()
+    _command = None
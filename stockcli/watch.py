@@ -0,0 +1,143 @@
+import time
+from stockcli import net
+
+# One request returns the quotes of every symbol on the board
+QUOTE_URL = 'https://query1.finance.yahoo.com/v7/finance/quote'
+COLUMNS = {
+    'Price': 'regularMarketPrice',
+    'Change': 'regularMarketChange',
+    '% Change': 'regularMarketChangePercent',
+    'Volume': 'regularMarketVolume',
+}
+TIMEOUT = 10
+# Polling slows down (doubling, up to MAX_INTERVAL seconds) while Yahoo throttles or fails
+MAX_INTERVAL = 300
+# Nothing moves outside trading hours, poll at most once a minute
+CLOSED_STATES = {'CLOSED', 'PREPRE', 'POSTPOST'}
+CLOSED_INTERVAL = 60
+
+MISSING = object()
+
+
+def fetch(symbols):
+    """`(status, {symbol: quote})` for every symbol, in one batched request."""
+    response = net.session().get(QUOTE_URL, params={'symbols': ','.join(symbols)}, timeout=TIMEOUT)
+    if response.status_code != 200:
+        return response.status_code, {}
+    return 200, {quote['symbol']: quote for quote in response.json()['quoteResponse']['result']}
+
+
+def next_delay(interval, backoff, throttled, closed):
+    """Seconds until the next poll, and the new backoff factor.
+
+    The factor doubles on every throttled poll and halves on every good one.
+    """
+    backoff = min(backoff * 2, MAX_INTERVAL / interval if interval else 1) if throttled else max(1, backoff / 2)
+    delay = interval * backoff
+    if closed:
+        delay = max(delay, CLOSED_INTERVAL)
+    return min(delay, MAX_INTERVAL), backoff
+
+
+def fmt(value):
+    if value is None or value is MISSING:
+        return '-'
+    if isinstance(value, float):
+        return f'{value:,.4f}'.rstrip('0').rstrip('.')
+    if isinstance(value, int):
+        return f'{value:,}'
+    return str(value)
+
+
+class Board:
+    """The cells of the quote board.
+
+    Cells are `rich.text.Text` objects kept between polls: only the ones whose
+    value changed are re-formatted, and flash green/red until the next poll.
+    """
+
+    def __init__(self, symbols):
+        from rich.text import Text
+        self.symbols = symbols
+        self.values = {}
+        self.cells = {s: [Text(s, style='bold blue')] + [Text('-', justify='right') for _ in COLUMNS] for s in symbols}
+
+    def update(self, quotes):
+        """Apply a poll's quotes, returning the number of cells that changed."""
+        changed = 0
+        for symbol in self.symbols:
+            quote = quotes.get(symbol, {})
+            for i, (name, field) in enumerate(COLUMNS.items(), 1):
+                cell, key = self.cells[symbol][i], (symbol, name)
+                value, old = quote.get(field), self.values.get(key, MISSING)
+                if value == old:
+                    if cell.style:
+                        cell.style = ''
+                        changed += 1
+                    continue
+                self.values[key] = value
+                cell.plain = fmt(value)
+                if isinstance(value, (int, float)) and isinstance(old, (int, float)):
+                    cell.style = 'green' if value > old else 'red'
+                changed += 1
+        return changed
+
+    def render(self, status):
+        from rich.table import Table
+        table = Table('Symbol', *COLUMNS, caption=status, caption_justify='left')
+        for symbol in self.symbols:
+            table.add_row(*self.cells[symbol])
+        return table
+
+
+def polls(symbols, interval=5.0, count=None, sleep=time.sleep):
+    """Poll `symbols` every `interval` seconds (adjusted by `next_delay`).
+
+    Yields `(status, quotes, closed, delay)` per poll; stops after `count` polls,
+    or runs until interrupted when `count` is None.
+    """
+    import requests
+    backoff, done = 1, 0
+    while count is None or done < count:
+        try:
+            code, quotes = fetch(symbols)
+        except requests.RequestException as e:
+            code, quotes = type(e).__name__, {}
+        done += 1
+        closed = bool(quotes) and all(q.get('marketState') in CLOSED_STATES for q in quotes.values())
+        delay, backoff = next_delay(interval, backoff, code != 200, closed)
+        yield code, quotes, closed, delay
+        if count is None or done < count:
+            sleep(delay)
+
+
+def watch(symbols, interval=5.0, count=None, console=None, sleep=time.sleep):
+    """Keep a live board of `symbols` on screen.
+
+    The screen is only redrawn when a cell or the status line changed.
+    """
+    from rich.live import Live
+    board = Board(symbols)
+    status, last_change = 'Loading...', '-'
+    with Live(board.render(status), console=console, auto_refresh=False) as live:
+        for code, quotes, closed, delay in polls(symbols, interval, count, sleep):
+            changed = board.update(quotes) if code == 200 else 0
+            if changed:
+                last_change = time.strftime('%H:%M:%S')
+            if code != 200:
+                state = f'[red]No quotes ({code})[/red], retrying in {delay:g}s'
+            else:
+                state = f"Market {'closed' if closed else 'open'}, every {delay:g}s"
+            new_status = f'{state} · last change {last_change}'
+            if changed or new_status != status:
+                status = new_status
+                live.update(board.render(status), refresh=True)
+
+
+def records(symbols, interval=5.0, count=None, sleep=time.sleep):
+    """Write the board's fields of every poll as records (`--format`)."""
+    from stockcli import output
+    fields = ['symbol', 'marketState', 'regularMarketTime'] + list(COLUMNS.values())
+    for code, quotes, closed, delay in polls(symbols, interval, count, sleep):
+        if quotes:
+            output.write(output.frame([{f: q.get(f) for f in fields} for q in quotes.values()]))
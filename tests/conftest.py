@@ -0,0 +1,56 @@
+import warnings
+
+import pytest
+
+from stockcli import cache, output, scheduler, trace
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    # Keep every test's on-disk state out of the user's cache directory
+    monkeypatch.setenv('STOCKCLI_CACHE_DIR', str(tmp_path / 'cache'))
+    # ...and the in-memory copies of another test's entries out of this one
+    cache._memory.clear()
+    return tmp_path / 'cache'
+
+
+@pytest.fixture(autouse=True)
+def table_output(monkeypatch):
+    # `--format` is process-wide state, set again by every command invocation
+    monkeypatch.setattr(output, 'format', 'table')
+    monkeypatch.setattr(output, 'path', None)
+
+
+@pytest.fixture(autouse=True)
+def no_tracing():
+    yield
+    # `--profile`/`--trace` collect spans process-wide
+    trace.reset()
+
+
+@pytest.fixture(autouse=True)
+def no_rate_limit(monkeypatch):
+    # Tests about the scheduler set their own limits
+    monkeypatch.setenv('STOCKCLI_RATE', '0')
+    scheduler.reset()
+
+
+@pytest.fixture
+def yahoo_env():
+    # The variables `yahoo_server` points at the stand-in; a module overrides
+    # this fixture to point others (STOCKCLI_MARKETS_URL) at it too
+    return ['STOCKCLI_YAHOO_URL']
+
+
+@pytest.fixture
+def yahoo_server(yahoo_env, monkeypatch):
+    """The stand-in Yahoo server of benchmarks.standin, for one test."""
+    from benchmarks import standin
+    server = standin.serve()
+    for name in yahoo_env:
+        monkeypatch.setenv(name, server.url)
+    # yfinance's deprecation warnings, in the tests that drive it and until they end
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        yield server
+    server.shutdown()
@@ -0,0 +1,46 @@
+"""Synthetic market data, shared by the tests and the benchmarks."""
+
+
+def history(bars, seed=0):
+    """A random walk of `bars` 5-minute OHLCV bars."""
+    import numpy as np
+    import pandas as pd
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, bars)))
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    spread = np.abs(rng.normal(0, 0.001, bars)) * close
+    return pd.DataFrame({
+        'Open': open_,
+        'High': np.maximum(open_, close) + spread,
+        'Low': np.minimum(open_, close) - spread,
+        'Close': close,
+        'Volume': rng.integers(1_000, 100_000, bars),
+    }, index=pd.date_range('2024-01-02 14:30', periods=bars, freq='5min', tz='UTC'))
+
+
+def snapshot(symbols, seed=0):
+    """A snapshot of `symbols` synthetic rows, as `screen.merge` builds it."""
+    import numpy as np
+    from stockcli import screen
+    rng = np.random.default_rng(seed)
+    sectors = ['Technology', 'Energy', 'Healthcare', 'Financial Services', 'Utilities']
+    rows = {f'S{i:05d}': {
+        'shortName': f'S{i:05d} Corp', 'sector': sectors[i % len(sectors)], 'regularMarketPrice': float(rng.uniform(1, 500)),
+        'marketCap': float(rng.lognormal(22, 2)), 'trailingPE': float(rng.uniform(2, 80)), 'beta': float(rng.uniform(0, 3)),
+    } for i in range(symbols)}
+    return screen.merge(None, rows, screen.FIELDS)
+
+
+def closes(symbols, days, seed=0):
+    """`[(days, prices)]` of `symbols` random walks on weekdays, some listed later, some with gaps."""
+    import numpy as np
+    rng = np.random.default_rng(seed)
+    calendar = np.arange(np.datetime64('2015-01-02'), np.datetime64('2015-01-02') + days * 7 // 5 + 7)
+    calendar = calendar[np.is_busday(calendar)][:days]
+    series = []
+    for i in range(symbols):
+        first = int(rng.integers(0, days // 4)) if i % 10 == 0 else 0
+        kept = calendar[first:][rng.random(days - first) > 0.01]
+        prices = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.02, len(kept))))
+        series.append((kept, prices))
+    return series
@@ -0,0 +1,38 @@
+import time
+
+import pytest
+import typer
+
+from stockcli.runner import read_symbols, run_batch, run_many
+
+
+def test_read_symbols_merges_args_and_watchlist(tmp_path):
+    watchlist = tmp_path / 'watchlist.txt'
+    watchlist.write_text('# tech\nmsft, goog\n\nAAPL  # duplicate\n')
+    assert read_symbols(['aapl'], watchlist) == ['AAPL', 'MSFT', 'GOOG']
+
+
+def test_run_many_is_concurrent_and_streams_in_completion_order():
+    delays = {'SLOW': 0.3, 'FAST': 0.0, 'MID': 0.1}
+    def task(symbol):
+        time.sleep(delays[symbol])
+        return symbol.lower()
+    start = time.perf_counter()
+    results = list(run_many(task, list(delays), concurrency=3))
+    assert time.perf_counter() - start < 0.55
+    assert [r[0] for r in results] == ['FAST', 'MID', 'SLOW']
+    assert all(error is None for _, _, error in results)
+
+
+def test_run_batch_reports_failures_without_aborting(capsys):
+    def task(symbol):
+        if symbol == 'BOOM':
+            raise RuntimeError('network down')
+        return None if symbol == 'NOPE' else symbol
+    rendered = []
+    with pytest.raises(typer.Exit) as e:
+        run_batch(task, lambda s, r: rendered.append(r), ['A', 'BOOM', 'NOPE', 'B'], concurrency=2)
+    assert e.value.exit_code == 1
+    assert sorted(rendered) == ['A', 'B']
+    out = capsys.readouterr().out
+    assert 'network down' in out and "'NOPE'" in out and '2 of 4' in out
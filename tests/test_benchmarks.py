@@ -0,0 +1,38 @@
+from benchmarks import bench_indicators, standin, suite
+
+
+def test_compare_flags_regressions_beyond_threshold_and_slack():
+    baseline = {'info': {'total': 1.0, 'peak_rss_kib': 100000, 'throughput': 10.0, 'exit_code': 0}}
+    assert suite.compare({'info': {'total': 1.2, 'peak_rss_kib': 100000, 'throughput': 9.0, 'exit_code': 0}}, baseline, 0.25) == []
+    regressions = suite.compare({'info': {'total': 1.5, 'peak_rss_kib': 200000, 'throughput': 5.0, 'exit_code': 1}}, baseline, 0.25)
+    assert [line.split(':')[0] for line in regressions] == ['info total', 'info peak_rss_kib', 'info throughput', 'info']
+    # Relative jumps smaller than the slack are noise
+    assert suite.compare({'fast': {'total': 0.1}}, {'fast': {'total': 0.01}}, 0.25) == []
+    # A command or a metric the baseline doesn't have fails
+    missing = suite.compare({'info': {'total': 1.0, 'first_output': 0.5}, 'new': {'total': 1.0}}, {'info': {'total': 1.0}}, 0.25)
+    assert [line.split(':')[0] for line in missing] == ['info first_output', 'new']
+
+
+def test_bench_measures_a_command(yahoo_server):
+    result = suite.bench('news', ['AAPL'], yahoo_server, repeat=1, batch=3)
+    assert result['exit_code'] == 0
+    assert 0 < result['first_output'] <= result['total']
+    assert result['peak_rss_kib'] > 10 * 1024 and result['throughput'] > 0
+
+
+def test_indicator_benchmark_times_every_mode():
+    call, stacked, update = bench_indicators.bench('macd:12,26,9', bars=5000, symbols=4, stacked_bars=100, repeat=1)
+    assert call > 0 and stacked > 0 and 0 < update < call
+
+
+def test_standin_serves_recorded_responses(tmp_path):
+    import requests
+    (tmp_path / 'v7' / 'finance').mkdir(parents=True)
+    (tmp_path / 'v7' / 'finance' / 'quote.json').write_text('{"recorded": true}')
+    server = standin.serve(fixtures=tmp_path)
+    try:
+        assert requests.get(f'{server.url}/v7/finance/quote?symbols=AAPL').json() == {'recorded': True}
+        # Anything not recorded is generated
+        assert 'chart' in requests.get(f'{server.url}/v8/finance/chart/AAPL').json()
+    finally:
+        server.shutdown()
@@ -0,0 +1,63 @@
+import time
+
+import pytest
+
+from stockcli import cache
+
+
+@pytest.fixture(autouse=True)
+def reset_flags(monkeypatch):
+    monkeypatch.setattr(cache, 'enabled', True)
+    monkeypatch.setattr(cache, 'refresh', False)
+
+
+def test_cached_serves_second_call_from_disk():
+    calls = []
+    loader = lambda: calls.append(1) or {'price': 1}
+    assert cache.cached('aapl', 'info', loader) == {'price': 1}
+    assert cache.cached('AAPL', 'info', loader) == {'price': 1}
+    assert len(calls) == 1
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['entries']) == (1, 1, 1)
+    assert stats['hit_rate'] == 0.5
+
+
+def test_key_includes_params():
+    assert cache.make_key('msft', 'balance_sheet', quarterly=True) == 'MSFT|balance_sheet|quarterly=True'
+    cache.cached('MSFT', 'balance_sheet', lambda: [1], quarterly=True)
+    assert cache.cached('MSFT', 'balance_sheet', lambda: [2], quarterly=False) == [2]
+
+
+def test_expired_entries_are_refetched(monkeypatch):
+    cache.cached('AAPL', 'info', lambda: [1])
+    now = time.time()
+    monkeypatch.setattr(time, 'time', lambda: now + cache.TTLS['info'] + 1)
+    assert cache.cached('AAPL', 'info', lambda: [2]) == [2]
+
+
+def test_refresh_and_no_cache(monkeypatch):
+    cache.cached('AAPL', 'info', lambda: [1])
+    monkeypatch.setattr(cache, 'refresh', True)
+    assert cache.cached('AAPL', 'info', lambda: [2]) == [2]
+    monkeypatch.setattr(cache, 'refresh', False)
+    assert cache.cached('AAPL', 'info', lambda: [3]) == [2]
+    monkeypatch.setattr(cache, 'enabled', False)
+    assert cache.cached('AAPL', 'info', lambda: [4]) == [4]
+
+
+def test_empty_results_are_not_stored():
+    cache.cached('NOPE', 'info', lambda: {})
+    assert cache.stats()['entries'] == 0
+
+
+def test_lru_eviction(monkeypatch):
+    blob = 'x' * 1000
+    cache.cached('A', 'info', lambda: blob)
+    cache.cached('B', 'info', lambda: blob)
+    cache.cached('A', 'info', lambda: blob)  # A is now the most recently used
+    monkeypatch.setattr(cache, 'MAX_BYTES', 2500)
+    cache.cached('C', 'info', lambda: blob)
+    assert cache.get(cache.make_key('B', 'info'), 'info') is cache.MISS
+    assert cache.get(cache.make_key('A', 'info'), 'info') == blob
+    assert cache.prune(max_bytes=0) == 2
+    assert cache.stats()['entries'] == 0
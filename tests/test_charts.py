@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+from typer.testing import CliRunner
+
+from stockcli import charts
+from stockcli.main import app
+from tests.synthetic import history
+
+
+def test_downsample_keeps_every_bucket_ohlcv():
+    hist = history(1000)
+    hist.iloc[5, hist.columns.get_loc('High')] = np.nan
+    merged = charts.downsample(hist, 300)
+    # Buckets of 4 bars: 250 candles
+    assert len(merged) == 250 and list(merged.index[:2]) == list(hist.index[[0, 4]])
+    first = hist.iloc[4:8]
+    assert merged.iloc[1].tolist() == [first['Open'].iloc[0], first['High'].max(), first['Low'].min(), first['Close'].iloc[-1], first['Volume'].sum()]
+    assert merged['High'].max() == hist['High'].max() and merged['Low'].min() == hist['Low'].min()
+    assert merged['Volume'].sum() == hist['Volume'].sum()
+    assert merged['Close'].iloc[-1] == hist['Close'].iloc[-1]
+    assert charts.downsample(hist, 0) is hist and charts.downsample(hist, 5000) is hist
+
+
+@pytest.mark.filterwarnings('ignore')
+def test_save_renders_images_on_a_process_pool(tmp_path):
+    histories = [('AAA', history(2000)), ('BBB', history(50, seed=1))]
+    results = sorted(charts.save(iter(histories), tmp_path, '5m', 'svg', workers=2))
+    assert [(symbol, error) for symbol, _, error in results] == [('AAA', None), ('BBB', None)]
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['AAA_5m.svg', 'BBB_5m.svg']
+    assert (tmp_path / 'AAA_5m.svg').read_text().startswith('<?xml')
+    (symbol, path, error), = charts.save(iter(histories[1:]), tmp_path, '1d', 'png', workers=1)
+    assert open(path, 'rb').read(4) == b'\x89PNG'
+
+
+def test_chart_out_saves_every_market(yahoo_server, tmp_path):
+    result = CliRunner().invoke(app, ['chart', 'AAPL', 'MSFT', 'ZZBAD', '--out', str(tmp_path / 'charts'), '--interval', '5m', '--workers', '1'])
+    several = CliRunner().invoke(app, ['chart', 'AAPL', 'MSFT'])
+    assert result.exit_code == 1 and "unrecognized market:'ZZBAD'" in result.output
+    assert sorted(p.name for p in (tmp_path / 'charts').iterdir()) == ['AAPL_5m.png', 'MSFT_5m.png']
+    assert several.exit_code == 1 and '--out' in several.output
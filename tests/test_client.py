@@ -0,0 +1,91 @@
+import json
+
+import httpx
+import pytest
+from typer.testing import CliRunner
+
+from benchmarks import standin
+from stockcli import cache, client, scheduler
+from stockcli.main import app
+
+
+@pytest.fixture
+def yahoo_env():
+    return ['STOCKCLI_MARKETS_URL', 'STOCKCLI_YAHOO_URL']
+
+
+@pytest.fixture
+def statuses(monkeypatch):
+    seen = []
+    request = client.request
+    async def spy(session, url, headers=None):
+        response = await request(session, url, headers)
+        seen.append(response.status_code)
+        return response
+    monkeypatch.setattr(client, 'request', spy)
+    return seen
+
+
+def mock(monkeypatch, handler):
+    monkeypatch.setattr(scheduler, 'BACKOFF', 0)
+    monkeypatch.setattr(client, 'client', lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+
+
+def test_repeat_calls_are_answered_with_304(yahoo_server, statuses):
+    urls = [client.markets_url(view) for view in standin.VIEWS]
+    first = client.get_all(urls, 'markets')
+    second = client.get_all(urls, 'markets')
+    assert statuses == [200] * 4 + [304] * 4
+    assert second == first and [len(rows) for rows in first] == [100] * 4
+
+
+def test_refresh_skips_revalidation(yahoo_server, statuses, monkeypatch):
+    url = client.markets_url('gainers')
+    client.get_all([url], 'markets')
+    monkeypatch.setattr(cache, 'refresh', True)
+    client.get_all([url], 'markets')
+    assert statuses == [200, 200]
+
+
+def test_retries_errors_and_timeouts(monkeypatch):
+    calls = []
+    def handler(request):
+        calls.append(request)
+        if len(calls) == 1:
+            raise httpx.ConnectTimeout('timed out', request=request)
+        if len(calls) == 2:
+            return httpx.Response(503)
+        return httpx.Response(200, json={'ok': True})
+    mock(monkeypatch, handler)
+    assert client.get_all(['http://markets.test/gainers'], 'markets') == [{'ok': True}]
+    assert len(calls) == 3
+
+
+def test_gives_up_after_the_last_retry(monkeypatch):
+    calls = []
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(503)
+    mock(monkeypatch, handler)
+    with pytest.raises(httpx.HTTPStatusError):
+        client.get_all(['http://markets.test/gainers'], 'markets')
+    assert len(calls) == scheduler.RETRIES + 1
+
+
+def test_markets_all(yahoo_server):
+    result = CliRunner().invoke(app, ['markets', '--all'])
+    assert result.exit_code == 0
+    assert all(view in result.output for view in standin.VIEWS)
+    assert all(yahoo_server.hits[view] == 1 for view in standin.VIEWS)
+
+
+def test_markets_enrich_batches_the_quotes(yahoo_server):
+    result = CliRunner().invoke(app, ['--format', 'json', 'markets', 'gainers', '--enrich', '--sort', '-marketCap', '--field', 'beta'])
+    assert result.exit_code == 0, result.output
+    rows = json.loads(result.output)
+    assert len(rows) == 100 and all(row['regularMarketPrice'] is not None and 'beta' in row for row in rows)
+    assert [row['marketCap'] for row in rows] == sorted((row['marketCap'] for row in rows), reverse=True)
+    # One request for the view, and the 100 quotes QUOTE_BATCH at a time
+    assert yahoo_server.hits['gainers'] == 1 and yahoo_server.hits['v7'] == 100 // client.QUOTE_BATCH
+    bad = CliRunner().invoke(app, ['markets', 'gainers', '--enrich', '--sort', 'nope'])
+    assert bad.exit_code == 1
@@ -0,0 +1,53 @@
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from stockcli import daemon
+
+
+@pytest.fixture
+def served(yahoo_server, tmp_path, monkeypatch):
+    path = str(tmp_path / 'stockcli.sock')
+    env = dict(os.environ, STOCKCLI_SOCKET=path, COLUMNS='120')
+    monkeypatch.setenv('STOCKCLI_SOCKET', path)
+    monkeypatch.setenv('COLUMNS', '120')
+    proc = subprocess.Popen([sys.executable, '-c', 'from stockcli.main import app; app()', 'serve'],
+                            env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 60
+    while daemon.connect() is None:
+        assert proc.poll() is None and time.monotonic() < deadline, 'the daemon did not start'
+        time.sleep(0.1)
+    yield yahoo_server
+    assert daemon.stop()
+    proc.wait(timeout=10)
+    assert not os.path.exists(path)
+
+
+def test_commands_run_on_the_daemon(served, capfd):
+    assert daemon.forward(['info', 'AAPL']) == 0
+    first = capfd.readouterr()
+    assert 'AAPL' in first.out
+    hits = dict(served.hits)
+    start = time.perf_counter()
+    assert daemon.forward(['info', 'AAPL']) == 0
+    elapsed = time.perf_counter() - start
+    # The second run is served from the daemon's in-memory cache
+    assert capfd.readouterr().out == first.out
+    assert dict(served.hits) == hits and elapsed < 0.25
+
+    assert daemon.forward(['info']) == 1
+    assert 'no market given' in capfd.readouterr().out
+
+
+def test_local_commands_and_no_daemon_run_in_process(tmp_path, monkeypatch):
+    monkeypatch.setenv('STOCKCLI_SOCKET', str(tmp_path / 'missing.sock'))
+    assert daemon.forward(['info', 'AAPL']) is None
+    assert daemon.forward(['chart', 'AAPL']) is None
+    assert daemon.forward(['--profile', 'info', 'AAPL']) is None
+    assert not daemon.stop()
+    monkeypatch.setattr(daemon, 'connect', lambda path=None: pytest.fail('forwarded to the daemon'))
+    assert daemon.forward(['--trace=out.json', 'info', 'AAPL']) is None
+    assert daemon.forward(['--cprofile=out.prof', 'info', 'AAPL']) is None
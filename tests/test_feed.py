@@ -0,0 +1,56 @@
+import json
+
+from typer.testing import CliRunner
+
+from stockcli import cache, feed
+from stockcli.main import app
+
+
+def article(uuid, published, **fields):
+    return {'uuid': uuid, 'title': uuid, 'link': f'https://news.example/{uuid}', 'providerPublishTime': published, **fields}
+
+
+def test_merge_keeps_each_article_once_with_its_markets():
+    merged = feed.merge({'AAPL': [article('a', 20), article('b', 10)], 'MSFT': [article('a', 20), {'link': 'c', 'providerPublishTime': 30}]}, now=40)
+    assert [feed.key(a) for a in merged] == ['b', 'a', 'c']
+    assert merged[1]['symbols'] == ['AAPL', 'MSFT']
+    # Older than MAX_AGE: not shown at all
+    assert feed.merge({'AAPL': [article('a', 0)]}, now=feed.MAX_AGE + 1) == []
+
+
+def test_unseen_remembers_across_runs_and_forgets_by_age():
+    assert [a['uuid'] for a in feed.unseen([article('a', 100), article('b', 100)], now=100)] == ['a', 'b']
+    assert feed.unseen([article('a', 100), article('c', 200)], now=200) == [article('c', 200)]
+    # Once `a` and `b` are past MAX_AGE they leave the index
+    feed.unseen([], now=150 + feed.MAX_AGE)
+    with cache.connect() as db:
+        assert [row[0] for row in db.execute('SELECT id FROM news_seen')] == ['c']
+
+
+def test_unseen_without_cache(monkeypatch):
+    monkeypatch.setattr(cache, 'enabled', False)
+    monkeypatch.setattr(feed, '_seen', {})
+    assert feed.unseen([article('a', 100)], now=100) == [article('a', 100)]
+    assert feed.unseen([article('a', 100)], now=100) == []
+
+
+def test_polls_fetch_only_the_feeds(yahoo_server):
+    polls = list(feed.polls(['AAPL', 'MSFT', 'ZZBAD'], interval=0, count=2, sleep=lambda _: None))
+    (first, errors), (second, _) = polls
+    assert len(first) == len({feed.key(a) for a in first}) > 8
+    assert second == [] and errors == {}
+    # One search per market per poll, no history probe
+    assert set(yahoo_server.hits) == {'v1'}
+    assert yahoo_server.hits['v1'] == 6
+
+
+def test_news_watchlist_streams_ndjson_once(yahoo_server, tmp_path):
+    watchlist = tmp_path / 'watchlist.txt'
+    watchlist.write_text('AAPL\nMSFT\n')
+    result = CliRunner(mix_stderr=False).invoke(app, ['--format', 'ndjson', 'news', '--watchlist', str(watchlist)])
+    assert result.exit_code == 0, result.output
+    rows = [json.loads(line) for line in result.stdout.splitlines()]
+    assert len(rows) == len({row['uuid'] for row in rows})
+    assert all(row['symbols'] for row in rows)
+    again = CliRunner(mix_stderr=False).invoke(app, ['--format', 'ndjson', 'news', '--watchlist', str(watchlist), '--follow', '--count', '1'])
+    assert again.exit_code == 0 and again.stdout == ''
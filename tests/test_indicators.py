@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from stockcli import indicators
+from tests.synthetic import history
+
+
+def reference(hist):
+    """Every default indicator the usual pandas way."""
+    close = hist['Close']
+    change = close.diff()
+    gain = change.clip(lower=0).ewm(alpha=1 / 14, adjust=False).mean()
+    loss = (-change).clip(lower=0).ewm(alpha=1 / 14, adjust=False).mean()
+    macd = close.ewm(span=12, adjust=False).mean() - close.ewm(span=26, adjust=False).mean()
+    signal = macd.ewm(span=9, adjust=False).mean()
+    mean, std = close.rolling(20).mean(), close.rolling(20).std(ddof=0)
+    typical = (hist['High'] + hist['Low'] + hist['Close']) / 3
+    day = hist.index.normalize()
+    return pd.DataFrame({
+        'SMA_20': mean,
+        'EMA_20': close.ewm(span=20, adjust=False).mean(),
+        'RSI_14': 100 - 100 / (1 + gain / loss),
+        'MACD_12_26_9': macd, 'MACDs_12_26_9': signal, 'MACDh_12_26_9': macd - signal,
+        'BBL_20_2': mean - 2 * std, 'BBM_20_2': mean, 'BBU_20_2': mean + 2 * std,
+        'VWAP': (typical * hist['Volume']).groupby(day).cumsum() / hist['Volume'].groupby(day).cumsum(),
+    })
+
+
+def defaults():
+    return [indicators.parse(spec) for spec in indicators.DEFAULT]
+
+
+def test_indicators_match_the_pandas_reference():
+    hist = history(3000)
+    computed = indicators.compute({'A': hist}, defaults(), sessions=True)['A']
+    expected = reference(hist)
+    for column in expected:
+        pd.testing.assert_series_equal(computed[column], expected[column], check_names=False, rtol=1e-9, atol=1e-9)
+
+
+def test_updates_continue_the_series():
+    hist = history(2000, seed=3)
+    bars = indicators.arrays(hist, sessions=True)
+    whole = indicators.Engine(defaults()).update(bars)
+    engine = indicators.Engine(defaults())
+    cuts = [0, 1, 5, 19, 20, 700, 701, 2000]
+    parts = [engine.update({k: v[a:b] for k, v in bars.items()}) for a, b in zip(cuts, cuts[1:])]
+    for column, values in whole.items():
+        np.testing.assert_allclose(np.concatenate([p[column] for p in parts]), values, rtol=1e-9, atol=1e-9, err_msg=column)
+
+
+def test_stacked_symbols_get_their_own_values():
+    histories = {'A': history(500), 'B': history(80, seed=1), 'C': history(3, seed=2)}
+    stacked = indicators.compute(histories, defaults(), sessions=True)
+    for symbol, hist in histories.items():
+        alone = indicators.compute({symbol: hist}, defaults(), sessions=True)[symbol]
+        pd.testing.assert_frame_equal(stacked[symbol], alone, rtol=1e-9, atol=1e-9)
+    assert stacked['C']['SMA_20'].isna().all() and list(stacked['C'].index) == list(histories['C'].index)
+
+
+@pytest.mark.parametrize('spec, columns', [
+    ('sma:50', ['SMA_50']),
+    ('MACD:5,35,5', ['MACD_5_35_5', 'MACDs_5_35_5', 'MACDh_5_35_5']),
+    ('bbands:20,2.5', ['BBL_20_2.5', 'BBM_20_2.5', 'BBU_20_2.5']),
+    ('vwap', ['VWAP']),
+])
+def test_parse(spec, columns):
+    assert indicators.parse(spec).columns == columns
+
+
+@pytest.mark.parametrize('spec', ['foo', 'sma:x', 'sma:0', 'vwap:3', 'rsi:1,2,3,4'])
+def test_parse_rejects(spec):
+    assert indicators.parse(spec) is None
+
+
+def test_an_indicator_must_implement_update():
+    class Stub(indicators.Indicator):
+        name = 'stub'
+    with pytest.raises(TypeError):
+        Stub()
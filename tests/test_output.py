@@ -0,0 +1,63 @@
+import json
+import sys
+
+import pytest
+from typer.testing import CliRunner
+
+from stockcli import output
+from stockcli.main import app
+
+
+def invoke(*args):
+    return CliRunner(mix_stderr=False).invoke(app, list(args))
+
+
+def test_ndjson_streams_one_record_per_row(yahoo_server):
+    result = invoke('--format', 'ndjson', 'actions', 'AAPL', 'MSFT', 'ZZBAD')
+    assert result.exit_code == 1
+    records = [json.loads(line) for line in result.stdout.splitlines()]
+    assert {r['symbol'] for r in records} == {'AAPL', 'MSFT'}
+    assert all(isinstance(r['Dividends'], float) and r['Date'].endswith('Z') for r in records)
+    # Headings and errors stay off stdout
+    assert "unrecognized market:'ZZBAD'" in result.stderr
+
+
+def test_json_keeps_info_values_typed(yahoo_server):
+    result = invoke('--format', 'json', 'info', 'AAPL')
+    assert result.exit_code == 0
+    [record] = json.loads(result.stdout)
+    assert list(record)[0] == 'symbol'
+    assert isinstance(record['marketCap'], int) and isinstance(record['beta'], float)
+
+
+def test_csv_writes_one_header(yahoo_server):
+    result = invoke('--format', 'csv', 'chart', 'AAPL', '--period', '5d')
+    lines = result.stdout.splitlines()
+    assert lines[0] == 'symbol,Date,Open,High,Low,Close,Adj Close,Volume,Dividends'
+    assert len(lines) > 1 and all(line.startswith('AAPL,') for line in lines[1:])
+
+
+def test_csv_rows_follow_the_first_header(monkeypatch, capsys):
+    import pandas as pd
+    monkeypatch.setattr(output, 'format', 'csv')
+    output.write(output.frame(pd.DataFrame({'2024-09-30': [1]}, index=pd.Index(['Rev'], name='Attribute')), symbol='AAPL'))
+    output.write(output.frame(pd.DataFrame({'2024-06-30': [3], '2024-09-30': [2]}, index=pd.Index(['Rev'], name='Attribute')), symbol='MSFT'))
+    output.close()
+    captured = capsys.readouterr()
+    assert captured.out.splitlines() == ['symbol,Attribute,2024-09-30', 'AAPL,Rev,1', 'MSFT,Rev,2']
+    assert '2024-06-30' in captured.err
+
+
+def test_parquet(yahoo_server, tmp_path):
+    pq = pytest.importorskip('pyarrow.parquet')
+    path = tmp_path / 'history.parquet'
+    result = invoke('--format', 'parquet', '--output', str(path), 'chart', 'AAPL')
+    assert result.exit_code == 0 and result.stdout == ''
+    table = pq.read_table(path)
+    assert table.column_names[:2] == ['symbol', 'Date'] and table.num_rows > 10
+
+
+def test_binary_formats_need_pyarrow(monkeypatch):
+    monkeypatch.setitem(sys.modules, 'pyarrow', None)
+    result = invoke('--format', 'arrow', 'actions', 'AAPL')
+    assert result.exit_code == 1 and 'needs pyarrow' in result.stderr
@@ -0,0 +1,86 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+from typer.testing import CliRunner
+
+from benchmarks import bench_portfolio as bench
+from stockcli import portfolio
+from stockcli.main import app
+from tests.synthetic import closes
+
+
+def test_weights():
+    assert portfolio.weights(['aapl', 'msft'])[0] == ['AAPL', 'MSFT']
+    np.testing.assert_allclose(portfolio.weights(['AAPL', 'MSFT'])[1], [0.5, 0.5])
+    np.testing.assert_allclose(portfolio.weights(['AAPL=3', 'MSFT=1'])[1], [0.75, 0.25])
+    with pytest.raises(ValueError):
+        portfolio.weights(['AAPL=1', 'MSFT'])
+
+
+def test_matrix_aligns_on_the_union_of_days():
+    days, prices = portfolio.matrix([(['2024-01-02', '2024-01-04'], [1.0, 2.0]), (['2024-01-03', '2024-01-04'], [5.0, 6.0])])
+    assert list(days.astype(str)) == ['2024-01-02', '2024-01-03', '2024-01-04']
+    np.testing.assert_array_equal(prices, [[1, np.nan, 2], [np.nan, 5, 6]])
+    assert prices.flags.c_contiguous
+
+
+def test_returns_carry_gaps_and_start_late():
+    r = portfolio.returns(np.array([[1.0, np.nan, 2.0], [np.nan, 5.0, 6.0]]))
+    np.testing.assert_allclose(r, [[0, 1], [np.nan, 0.2]])
+    # Until MSFT starts, the portfolio is all AAPL
+    np.testing.assert_allclose(portfolio.combine(r, np.array([0.5, 0.5])), [0, 0.6])
+
+
+def test_dividends_count_on_their_ex_date():
+    prices = np.array([[100.0, 99.0, 99.0]])
+    np.testing.assert_allclose(portfolio.returns(prices, np.array([[0.0, 1.0, np.nan]])), [[0, 0]])
+
+
+def test_figures_match_pandas():
+    days, prices = portfolio.matrix(closes(6, 500))
+    r = portfolio.returns(prices)
+    frame = pd.DataFrame(r.T)
+    full = frame.dropna()
+    np.testing.assert_allclose(portfolio.covariance(full.to_numpy().T), full.cov(), rtol=1e-9)
+    corr = portfolio.correlation(portfolio.covariance(r))
+    assert np.all(np.diag(corr) == 1)
+    np.testing.assert_allclose(portfolio.beta(np.vstack([2 * r[1], -r[1]]), r[1]), [2, -1])
+    np.testing.assert_allclose(portfolio.drawdowns(np.array([0.1, -0.5, 0.2])), [0, -0.5, -0.4])
+    rolling = portfolio.rolling(days[1:], r[0], r[1], window=20)
+    expected = frame[0].rolling(20).std() * np.sqrt(portfolio.YEAR)
+    np.testing.assert_allclose(rolling['volatility'], expected, rtol=1e-7)
+
+
+def test_metrics_have_a_portfolio_row():
+    _, prices = portfolio.matrix(closes(3, 300))
+    r = portfolio.returns(prices)
+    metrics = portfolio.metrics(['A', 'B', 'C'], np.array([0.5, 0.3, 0.2]), r, r[0])
+    assert list(metrics.index) == ['A', 'B', 'C', 'PORTFOLIO']
+    assert metrics.loc['A', 'beta'] == pytest.approx(1)
+    assert (metrics['max drawdown'] <= 0).all()
+    assert metrics.loc['PORTFOLIO', 'annual volatility'] < metrics['annual volatility'].iloc[:3].max()
+
+
+def test_benchmark_times_every_phase():
+    timings, rss = bench.bench(symbols=20, days=300)
+    assert set(timings) == {'load', 'align', 'metrics', 'matrix', 'rolling'}
+    assert rss > 0
+
+
+def test_portfolio_command(yahoo_server):
+    result = CliRunner().invoke(app, ['--format', 'json', 'portfolio', 'AAPL=0.6', 'MSFT=0.4'])
+    assert result.exit_code == 0, result.output
+    rows = json.loads(result.output)
+    assert [row['market'] for row in rows] == ['AAPL', 'MSFT', 'PORTFOLIO']
+    assert rows[2]['beta'] is not None
+    matrix = CliRunner().invoke(app, ['--format', 'json', 'portfolio', 'AAPL', 'MSFT', '--matrix', 'corr', '--benchmark', ''])
+    assert json.loads(matrix.output)[0] == {'market': 'AAPL', 'AAPL': 1.0, 'MSFT': pytest.approx(json.loads(matrix.output)[1]['AAPL'])}
+    bad = CliRunner().invoke(app, ['portfolio', 'AAPL=1', 'MSFT'])
+    assert bad.exit_code == 1
+    unknown = CliRunner().invoke(app, ['portfolio', 'AAPL', 'ZZBAD'])
+    assert unknown.exit_code == 1 and 'AAPL' in unknown.output
+    # Only the short position is left
+    short = CliRunner().invoke(app, ['portfolio', 'AAPL=-1', 'ZZBAD=2'])
+    assert short.exit_code == 1 and 'add up' in short.output and '1 of 3 markets failed' in short.output
@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+
+from stockcli import render
+
+
+def test_format_column_handles_each_dtype():
+    dates = pd.Series(pd.to_datetime(['2022-01-03', None, '2022-01-05']).tz_localize('America/New_York'))
+    assert render.format_column(dates) == ['2022-01-03', '', '2022-01-05']
+    times = pd.Series(pd.to_datetime(['2022-01-03 09:30', '2022-01-03 09:35']))
+    assert render.format_column(times) == ['2022-01-03 09:30:00', '2022-01-03 09:35:00']
+    assert render.format_column(pd.Series([1.0, 2.5, np.nan, 1234567890.0, 0.123456])) == \
+        ['1', '2.5', '', '1234567890', '0.1235']
+    assert render.format_column(pd.Series([1, 2])) == ['1', '2']
+    assert render.format_column(pd.Series(['a', None])) == ['a', '']
+
+
+def test_paginate():
+    df = pd.DataFrame({'a': range(25)})
+    rows, footer = render.paginate(df, limit=10, page=3)
+    assert rows['a'].tolist() == list(range(20, 25))
+    assert footer.startswith('Rows 21-25 of 25 (page 3/3')
+    assert render.paginate(df)[1] is None
+
+
+def test_build_takes_any_number_of_columns():
+    df = pd.DataFrame(np.arange(24.0).reshape(3, 8), columns=[pd.Timestamp('2022-12-31')] + list('abcdefg'))
+    table = render.build(df)
+    assert [c.header for c in table.columns] == ['2022-12-31'] + list('abcdefg')
+    assert table.row_count == 3
+    color = render.build(df, 'color')
+    assert color.field_names[0] == '2022-12-31' and len(color.rows) == 3
@@ -0,0 +1,43 @@
+import time
+
+import pytest
+import typer
+
+from stockcli.runner import give_up, report, require_markets, run
+
+
+def test_run_returns_as_soon_as_task_finishes():
+    start = time.perf_counter()
+    assert run(lambda x: x * 2, 21) == 42
+    assert time.perf_counter() - start < 0.5
+
+
+def test_run_keeps_exit_codes():
+    def task():
+        raise typer.Exit(code=3)
+    with pytest.raises(typer.Exit) as e:
+        run(task)
+    assert e.value.exit_code == 3
+
+
+def test_run_reports_errors_with_exit_code_1(capsys):
+    def task():
+        raise ValueError('boom')
+    with pytest.raises(typer.Exit) as e:
+        run(task)
+    assert e.value.exit_code == 1
+    assert 'boom' in capsys.readouterr().out
+
+
+def test_report_and_give_up(capsys):
+    assert report('AAPL', {'price': 1}, None)
+    assert not report('ZZBAD', None, None)
+    assert not report('MSFT', None, ValueError('boom'))
+    out = capsys.readouterr().out
+    assert "unrecognized market:'ZZBAD'" in out and 'MSFT: ValueError: boom' in out
+    give_up(0, 3)
+    with pytest.raises(typer.Exit):
+        give_up(2, 3)
+    with pytest.raises(typer.Exit):
+        require_markets([], '--watchlist')
+    assert '--watchlist' in capsys.readouterr().out
@@ -0,0 +1,64 @@
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+from benchmarks import standin
+from stockcli import cache, net, scheduler
+
+
+def test_limits_per_host(monkeypatch):
+    monkeypatch.setenv('STOCKCLI_RATE', '10:20,slow.example.com=2')
+    assert scheduler.limits('fast.example.com') == (10.0, 20.0)
+    assert scheduler.limits('slow.example.com') == (2.0, 4.0)
+
+
+def test_bucket_queues_requests_past_the_burst(monkeypatch):
+    monkeypatch.setenv('STOCKCLI_RATE', '10:2')
+    waits = [scheduler.reserve('example.com', now=100.0) for _ in range(4)]
+    assert waits == pytest.approx([0, 0, 0.1, 0.2])
+    # One second refills ten tokens, capped at the burst
+    assert scheduler.reserve('example.com', now=101.0) == 0
+
+
+def test_throttling_halves_the_rate_and_honours_retry_after(monkeypatch):
+    monkeypatch.setenv('STOCKCLI_RATE', '10:1')
+    scheduler.reserve('example.com', now=100.0)
+    scheduler.slow_down('example.com', retry_after=3, now=100.0)
+    assert scheduler.reserve('example.com', now=100.0) == pytest.approx(3)
+    with cache.connect() as db:
+        assert db.execute('SELECT rate FROM buckets').fetchone()[0] == 5
+    # ...and doubles back RECOVERY seconds later
+    scheduler.reserve('example.com', now=100.0 + scheduler.RECOVERY)
+    with cache.connect() as db:
+        assert db.execute('SELECT rate FROM buckets').fetchone()[0] == 10
+
+
+def test_retries_throttled_answers(monkeypatch):
+    monkeypatch.setattr(scheduler, 'BACKOFF', 0)
+    answers = iter([429, 503, 200])
+    response = scheduler.call('example.com', lambda: SimpleNamespace(status_code=next(answers), headers={}))
+    assert response.status_code == 200
+    assert scheduler.counters() == {'queued': 0, 'coalesced': 0, 'throttled': 2, 'retried': 2}
+
+
+def test_identical_requests_share_one_fetch(monkeypatch):
+    server = standin.serve(latency=0.2)
+    try:
+        monkeypatch.setenv('STOCKCLI_YAHOO_URL', server.url)
+        url = 'https://query2.finance.yahoo.com/v7/finance/quote'
+        with ThreadPoolExecutor(8) as pool:
+            responses = list(pool.map(lambda _: net.session().get(url, params={'symbols': 'AAPL'}), range(8)))
+    finally:
+        server.shutdown()
+    assert server.hits['v7'] == 1
+    assert {r.json()['quoteResponse']['result'][0]['symbol'] for r in responses} == {'AAPL'}
+    assert scheduler.counters()['coalesced'] == 7
+
+
+def test_counters_are_kept_in_the_cache():
+    scheduler.count('throttled')
+    scheduler.save()
+    scheduler.count('throttled')
+    scheduler.save()
+    assert cache.stats()['requests'] == {'coalesced': 0, 'queued': 0, 'retried': 0, 'throttled': 2}
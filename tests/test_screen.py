@@ -0,0 +1,53 @@
+import time
+
+from typer.testing import CliRunner
+
+from benchmarks import bench_screen as bench
+from stockcli import cache, screen
+from stockcli.main import app
+from tests.synthetic import snapshot
+
+
+def test_merge_keeps_types_and_marks_new_fields_stale():
+    now = time.time()
+    first = screen.merge(None, {'A': {'sector': 'Energy', 'marketCap': 5e9}, 'B': {'sector': None, 'marketCap': None}}, ['sector', 'marketCap'], now)
+    assert first['marketCap'].dtype == 'float64' and first.loc['A', 'sector'] == 'Energy'
+    assert screen.stale(first, ['A', 'B', 'C'], ['sector', 'marketCap'], now) == ['C']
+    assert screen.stale(first, ['A'], ['sector', 'marketCap'], now + screen.TTL + 1) == ['A']
+    # A new field: the rows fetched without it are stale again
+    second = screen.merge(first, {'A': {'sector': 'Energy', 'marketCap': 6e9, 'beta': 1.1}}, ['sector', 'marketCap', 'beta'], now)
+    assert second.loc['A', 'marketCap'] == 6e9 and second.loc['B', 'fetched'] == 0
+    screen.save(second)
+    loaded = screen.load()
+    assert list(loaded.index) == ['B', 'A'] and loaded.loc['A', 'beta'] == 1.1
+    assert screen.stale(loaded, ['A', 'B'], ['sector', 'marketCap', 'beta'], now) == ['B']
+    cache.clear()
+    assert screen.load() is None
+
+
+def test_evaluate_filters_and_sorts_whole_columns():
+    rows = snapshot(10000)
+    matches = screen.evaluate(rows, bench.WHERE, bench.SORT, limit=5)
+    expected = rows[(rows.trailingPE < 15) & (rows.marketCap > 10e9) & (rows.sector == 'Technology')]
+    assert list(matches.index) == list(expected.sort_values('marketCap', ascending=False).index[:5])
+    assert screen.referenced(rows, bench.WHERE, bench.SORT) == ['trailingPE', 'marketCap', 'sector']
+
+
+def test_screening_ten_thousand_symbols_takes_milliseconds():
+    load, run = bench.bench(10000, repeat=5)
+    assert load + run < 0.1
+
+
+def test_screen_fetches_only_stale_symbols(yahoo_server, tmp_path):
+    universe = tmp_path / 'universe.txt'
+    universe.write_text('AAPL\nMSFT\nGOOG\nZZBAD\n')
+    first = CliRunner().invoke(app, ['screen', '--from-file', str(universe), '--where', 'marketCap > 1B', '--sort', '-marketCap'])
+    assert first.exit_code == 0 and '3 of 4 markets match' in first.output
+    hits = sum(yahoo_server.hits.values())
+    universe.write_text('AAPL\nMSFT\nGOOG\nZZBAD\nNVDA\n')
+    second = CliRunner().invoke(app, ['screen', '--from-file', str(universe), '--where', 'marketCap > 1B'])
+    assert second.exit_code == 0 and '4 of 5 markets match' in second.output
+    # Only NVDA was fetched; one info lookup is a handful of requests
+    assert 0 < sum(yahoo_server.hits.values()) - hits < hits / 3
+    bad = CliRunner().invoke(app, ['screen', '--where', 'nope > 1'])
+    assert bad.exit_code == 1 and "can't screen" in bad.output
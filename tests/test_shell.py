@@ -0,0 +1,69 @@
+import pytest
+
+from stockcli import data, shell
+
+
+@pytest.fixture
+def session(yahoo_server, monkeypatch):
+    session = shell.Session()
+    monkeypatch.setattr(data, 'session', session)
+    yield session, yahoo_server
+    session.close()
+
+
+def test_tickers_are_kept_per_symbol(session, monkeypatch):
+    session, _ = session
+    monkeypatch.setattr(shell, 'TICKERS', 2)
+    aapl = session.ticker('aapl')
+    assert session.ticker('AAPL') is aapl
+    session.ticker('MSFT')
+    session.ticker('GOOG')
+    assert list(session.tickers) == ['MSFT', 'GOOG']
+
+
+def test_repeated_commands_are_served_from_memory(session, capsys):
+    session, server = session
+    session.timing = True
+    session.execute('info AAPL')
+    # ...once the datasets prefetched after it are in
+    session.settle(['AAPL'])
+    first = sum(server.hits.values())
+    session.execute('info AAPL')
+    assert sum(server.hits.values()) == first
+    assert session.served == {'memory': 1}
+    assert '1 from memory' in capsys.readouterr().out
+
+
+def test_next_datasets_are_prefetched(session):
+    session, server = session
+    session.execute('info AAPL')
+    session.settle(['AAPL'])
+    hits = sum(server.hits.values())
+    session.execute('finance AAPL')
+    assert sum(server.hits.values()) == hits
+    assert session.served == {'memory': 1}
+
+
+def test_completion(session):
+    session, _ = session
+    session.symbols.add('AAPL')
+    assert session.complete('', 'in') == ['indicators', 'info', 'institutional-holders']
+    assert session.complete('--format json chart ', '--int') == ['--interval']
+    assert session.complete('info ', 'aa') == ['AAPL']
+    assert session.complete('', ':t') == [':timing']
+
+
+def test_commands_parse_into_their_markets(session):
+    session, _ = session
+    assert session.parse(['--format', 'json', 'chart', 'aapl', '--interval', '5m', 'msft']) == ('chart', ['AAPL', 'MSFT'])
+    assert session.parse(['cache', 'stats']) == ('cache', [])
+    assert session.parse(['nope']) == (None, [])
+
+
+def test_meta_commands(session, capsys):
+    session, _ = session
+    assert session.execute(':timing')
+    assert session.timing
+    assert session.execute('shell')
+    assert "can't run inside the shell" in capsys.readouterr().out
+    assert not session.execute(':quit')
@@ -0,0 +1,82 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+HEAVY = {'yfinance', 'mplfinance', 'matplotlib', 'pandas', 'httpx', 'prettytable'}
+
+# Modules each command is allowed to pull in, out of the heavy set.
+# (yfinance itself imports pandas, so every Ticker-based command loads it.)
+COMMANDS = {
+    'markets': ({'httpx'}, ['gainers']),
+    'info': ({'yfinance', 'pandas'}, ['AAPL']),
+    'chart': ({'yfinance', 'pandas', 'mplfinance', 'matplotlib'}, ['AAPL']),
+    'actions': ({'yfinance', 'pandas'}, ['AAPL']),
+    'splits': ({'yfinance', 'pandas'}, ['AAPL']),
+    'finance': ({'yfinance', 'pandas'}, ['AAPL']),
+    'holders': ({'yfinance', 'pandas'}, ['AAPL']),
+    'institutional-holders': ({'yfinance', 'pandas'}, ['AAPL']),
+    'balance-sheet': ({'yfinance', 'pandas', 'prettytable'}, ['AAPL']),
+    'cashflow': ({'yfinance', 'pandas', 'prettytable'}, ['AAPL']),
+    'earning': ({'yfinance', 'pandas', 'prettytable'}, ['AAPL']),
+    'sustainability': ({'yfinance', 'pandas', 'prettytable'}, ['AAPL']),
+    'recommendations': ({'yfinance', 'pandas'}, ['AAPL']),
+    'calendar': ({'yfinance', 'pandas'}, ['AAPL']),
+    'news': ({'yfinance', 'pandas'}, ['AAPL']),
+    'statements': ({'yfinance', 'pandas', 'prettytable'}, ['AAPL']),
+    'cache': (set(), ['stats']),
+    'watch': (set(), ['AAPL', '--count', '1']),
+    'serve': (set(), ['--stop']),
+    'indicators': ({'yfinance', 'pandas'}, ['AAPL']),
+    'screen': ({'yfinance', 'pandas'}, ['AAPL']),
+    'shell': (set(), []),
+    'portfolio': ({'yfinance', 'pandas'}, ['AAPL']),
+}
+
+# Runs `stockcli ARGS` and dumps the top-level modules it imported to the file
+# named by MODULES_ENV; nothing is written without it
+MODULES_ENV = 'STOCKCLI_TEST_MODULES'
+SCRIPT = f"""
+import atexit, json, os, sys
+path = os.environ['{MODULES_ENV}']
+def dump():
+    with open(path, 'w') as f:
+        json.dump(sorted({{m.split('.')[0] for m in sys.modules}}), f)
+atexit.register(dump)
+from stockcli.main import app
+sys.argv = ['stockcli'] + sys.argv[1:]
+app()
+"""
+
+
+def imported_modules(tmp_path, *args):
+    out = tmp_path / 'modules.json'
+    env = dict(os.environ, **{MODULES_ENV: str(out)})
+    # Point every proxy at a closed port so network calls fail immediately.
+    for var in ('HTTP_PROXY', 'HTTPS_PROXY', 'http_proxy', 'https_proxy'):
+        env[var] = 'http://127.0.0.1:9'
+    env.pop('NO_PROXY', None)
+    env.pop('no_proxy', None)
+    # No daemon to forward to, or for `serve --stop` to stop
+    env['STOCKCLI_SOCKET'] = str(tmp_path / 'stockcli.sock')
+    # `shell` reads commands until its input ends
+    subprocess.run([sys.executable, '-c', SCRIPT, *args], env=env, stdin=subprocess.DEVNULL,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=120)
+    return set(json.loads(out.read_text()))
+
+
+def test_help_imports_no_heavy_modules(tmp_path):
+    assert not imported_modules(tmp_path, '--help') & HEAVY
+
+
+@pytest.mark.parametrize('command', sorted(COMMANDS))
+def test_command_help_imports_no_heavy_modules(tmp_path, command):
+    assert not imported_modules(tmp_path, command, '--help') & HEAVY
+
+
+@pytest.mark.parametrize('command', sorted(COMMANDS))
+def test_command_imports_only_its_dependencies(tmp_path, command):
+    allowed, args = COMMANDS[command]
+    assert imported_modules(tmp_path, command, *args) & HEAVY <= allowed
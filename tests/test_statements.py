@@ -0,0 +1,38 @@
+import json
+
+from typer.testing import CliRunner
+
+from stockcli import data, statements
+from stockcli.main import app
+
+
+def test_statements_are_aligned_numeric_frames(yahoo_server):
+    panel, earnings = statements.fetch('AAPL')
+    assert list(panel.index.names) == ['Statement', 'Item']
+    assert set(panel.index.get_level_values('Statement')) == set(statements.STATEMENTS.values())
+    assert all(dtype.kind == 'f' for dtype in panel.dtypes)
+    assert list(panel.columns) == sorted(panel.columns, reverse=True)
+    assert not earnings.empty
+    # Every statement costs the same requests as fetching one of them alone
+    one_pass = sum(yahoo_server.hits.values())
+    data.get('MSFT', 'financials')
+    assert sum(yahoo_server.hits.values()) == 2 * one_pass
+
+
+def test_ratios_across_symbols(yahoo_server):
+    panels = {symbol: statements.fetch(symbol)[0] for symbol in ('AAPL', 'MSFT')}
+    table = statements.ratios(statements.stack(panels))
+    assert list(table.index.names) == ['symbol', 'period']
+    assert set(table.index.get_level_values('symbol')) == {'AAPL', 'MSFT'}
+    assert table['Gross Margin'].round(4).eq(0.4).all()
+    assert table['Net Margin'].round(4).eq(0.18).all()
+
+
+def test_statements_command(yahoo_server):
+    result = CliRunner().invoke(app, ['statements', 'AAPL', 'ZZBAD'])
+    assert result.exit_code == 1
+    assert "unrecognized market:'ZZBAD'" in result.output
+    assert 'Ratios' in result.output and '0.6667' in result.output
+    records = CliRunner().invoke(app, ['--format', 'json', 'statements', 'AAPL'])
+    # Keyed like the records of every other command
+    assert list(json.loads(records.output)[0])[:2] == ['symbol', 'period']
@@ -0,0 +1,87 @@
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from stockcli import store
+
+DAY = 86400
+
+
+def bars(start, end, split_at=None, ratio=2.0):
+    """Daily bars as Yahoo would serve them today: split-adjusted, split on `split_at`."""
+    index = pd.date_range(pd.Timestamp(start, unit='s', tz='UTC').normalize(), pd.Timestamp(end, unit='s', tz='UTC'),
+                          freq='D', tz='UTC').tz_convert('America/New_York')
+    close = np.arange(len(index), dtype=float) + 100
+    df = pd.DataFrame({'Open': close, 'High': close + 1, 'Low': close - 1, 'Close': close, 'Adj Close': close,
+                       'Volume': 1000.0, 'Dividends': 0.0, 'Stock Splits': 0.0}, index=index)
+    df.index.name = 'Date'
+    if split_at is not None:
+        df.loc[df.index >= split_at, 'Stock Splits'] = 0.0
+        df.loc[df.index[df.index >= split_at][:1], 'Stock Splits'] = ratio
+    return df
+
+
+@pytest.fixture
+def downloads(monkeypatch):
+    calls = []
+    state = {'split_at': None, 'days_ahead': 0}
+    def download(symbol, interval, begin):
+        calls.append(begin)
+        end = time.time() + state['days_ahead'] * DAY
+        return bars(begin if begin is not None else time.time() - 400 * DAY, end, state['split_at'])
+    monkeypatch.setattr(store, 'download', download)
+    return calls, state
+
+
+def test_second_update_only_requests_new_bars(downloads):
+    calls, _ = downloads
+    first = store.update('AAPL', '1d', '1mo')
+    assert len(first) >= 29
+    last = first.index[-1].timestamp()
+    second = store.update('AAPL', '1d', '1mo')
+    assert calls[1] == last
+    assert second.index.is_unique and second.index.equals(first.index)
+
+
+def test_store_is_memory_mapped_columns():
+    df = bars(time.time() - 10 * DAY, time.time())
+    store.save('MSFT', '1d', df, {'tz': 'America/New_York', 'covered_from': None})
+    loaded, meta = store.load('MSFT', '1d')
+    assert isinstance(loaded['Close'].values.base, np.memmap)
+    pd.testing.assert_frame_equal(loaded, df[store.COLUMNS], check_freq=False)
+
+
+def test_a_save_swaps_every_column_at_once():
+    short = bars(time.time() - 10 * DAY, time.time())
+    store.save('MSFT', '1d', short, {'tz': 'America/New_York', 'covered_from': None})
+    old, _ = store.load('MSFT', '1d')
+    store.save('MSFT', '1d', bars(time.time() - 20 * DAY, time.time()), {'tz': 'America/New_York', 'covered_from': None})
+    # The previous version is gone, only the new one is loaded; maps already open still read the old one
+    assert len(list(store.path('MSFT', '1d').iterdir())) == 2
+    assert len(store.load('MSFT', '1d')[0]) == 21 and len(old) == 11
+    (store.path('MSFT', '1d') / 'meta.json').write_text('{"version": "gone", "tz": "UTC"}')
+    assert store.load('MSFT', '1d') == (None, {})
+
+
+def test_longer_period_extends_the_store_backwards(downloads):
+    calls, _ = downloads
+    store.update('AAPL', '1d', '1mo')
+    year = store.update('AAPL', '1d', '1y')
+    assert calls[1] < calls[0]
+    assert year.index[0] < pd.Timestamp.now(tz='UTC') - pd.Timedelta(days=360)
+    # Covered now: a 3 month chart is served with an incremental request only
+    store.update('AAPL', '1d', '3mo')
+    assert calls[2] > calls[0]
+
+
+def test_new_split_rebases_stored_bars(downloads):
+    _, state = downloads
+    before = store.update('AAPL', '1d', '1mo')
+    # Two new trading days arrive, the second one with a 2:1 split
+    state['days_ahead'] = 2
+    state['split_at'] = before.index[-1] + pd.Timedelta(days=2)
+    after = store.update('AAPL', '1d', '1mo')
+    assert after.loc[before.index[0], 'Close'] == before['Close'].iloc[0] / 2
+    assert after.loc[before.index[0], 'Volume'] == 2000
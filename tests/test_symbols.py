@@ -0,0 +1,52 @@
+import time
+
+import pytest
+from typer.testing import CliRunner
+
+from stockcli import cache, symbols
+from stockcli.main import app
+
+
+@pytest.fixture
+def probes(monkeypatch):
+    calls = []
+    def probe(symbol):
+        calls.append(symbol)
+        return not symbol.startswith('ZZ')
+    monkeypatch.setattr(symbols, 'probe', probe)
+    return calls
+
+
+def test_confirmed_symbols_skip_the_probe(probes):
+    assert symbols.exists('aapl') and symbols.exists('AAPL')
+    assert probes == ['aapl']
+
+
+def test_bad_symbols_are_negatively_cached(probes, monkeypatch):
+    assert not symbols.exists('ZZZ') and not symbols.exists('ZZZ')
+    assert symbols.lookup('ZZZ') is False
+    assert probes == ['ZZZ']
+    now = time.time()
+    monkeypatch.setattr(time, 'time', lambda: now + symbols.INVALID_TTL + 1)
+    assert symbols.lookup('ZZZ') is None
+    assert symbols.lookup('AAPL') is None
+
+
+def test_refresh_reprobes(probes, monkeypatch):
+    symbols.exists('AAPL')
+    monkeypatch.setattr(cache, 'refresh', True)
+    symbols.exists('AAPL')
+    assert probes == ['AAPL', 'AAPL']
+
+
+def test_statement_commands_no_longer_download_history(yahoo_server):
+    runner = CliRunner()
+    assert runner.invoke(app, ['balance-sheet', 'AAPL']).exit_code == 0
+    assert yahoo_server.hits['v8'] == 1
+    # Second run: the index already knows AAPL, no chart request at all
+    assert runner.invoke(app, ['cashflow', 'AAPL']).exit_code == 0
+    assert yahoo_server.hits['v8'] == 1
+    result = runner.invoke(app, ['cashflow', 'ZZBAD'])
+    assert result.exit_code == 1 and "unrecognized market:'ZZBAD'" in result.output
+    result = runner.invoke(app, ['cashflow', 'ZZBAD'])
+    assert result.exit_code == 1 and yahoo_server.hits['v8'] == 2
@@ -0,0 +1,68 @@
+import json
+import pstats
+import sys
+
+import pytest
+from typer.testing import CliRunner
+
+from stockcli import trace
+from stockcli.main import app
+
+
+@pytest.fixture
+def yahoo_env():
+    return ['STOCKCLI_YAHOO_URL', 'STOCKCLI_MARKETS_URL']
+
+
+def invoke(*args):
+    return CliRunner(mix_stderr=False).invoke(app, list(args))
+
+
+def test_spans_are_free_when_tracing_is_off():
+    with trace.span('fetch info', 'fetch'):
+        pass
+    assert trace.events() == []
+
+
+def test_first_imports_are_timed(monkeypatch):
+    monkeypatch.delitem(sys.modules, 'colorsys', raising=False)
+    trace.start('test')
+    import colorsys  # noqa: F401
+    import json  # noqa: F401 (already imported: no span)
+    trace.stop()
+    assert [e['name'] for e in trace.events() if e['cat'] == 'import'] == ['import colorsys']
+
+
+def test_chrome_trace_has_a_span_per_request_and_a_track_per_worker(yahoo_server, tmp_path):
+    path = tmp_path / 'trace.json'
+    result = invoke('--trace', str(path), 'balance-sheet', 'AAPL', 'MSFT')
+    assert result.exit_code == 0
+    events = json.loads(path.read_text())['traceEvents']
+    spans = [e for e in events if e['ph'] == 'X']
+    requests = [e for e in spans if e['cat'] == 'http']
+    assert requests and all(e['args']['url'].startswith(yahoo_server.url) for e in requests)
+    assert len(requests) == sum(yahoo_server.hits.values())
+    workers = {e['tid'] for e in spans if e['cat'] == 'worker'}
+    names = {e['tid']: e['args']['name'] for e in events if e['ph'] == 'M'}
+    assert len(workers) == 2 and all(names[tid].startswith('ThreadPoolExecutor') for tid in workers)
+    assert {'startup', 'resolve', 'fetch', 'render', 'command'} <= {e['cat'] for e in spans}
+
+
+def test_concurrent_async_requests_get_their_own_tracks(yahoo_server, tmp_path):
+    path = tmp_path / 'trace.json'
+    assert invoke('--trace', str(path), 'markets', '--all').exit_code == 0
+    events = json.loads(path.read_text())['traceEvents']
+    requests = [e for e in events if e['ph'] == 'X' and e['cat'] == 'http']
+    assert len(requests) == 4 and len({e['tid'] for e in requests}) == 4
+
+
+def test_profile_prints_a_summary_per_phase(yahoo_server):
+    result = invoke('--profile', 'info', 'AAPL')
+    assert result.exit_code == 0
+    assert 'Time per phase' in result.stderr and 'fetch info' in result.stderr
+
+
+def test_cprofile_dump(yahoo_server, tmp_path):
+    path = tmp_path / 'info.prof'
+    assert invoke('--cprofile', str(path), 'info', 'AAPL').exit_code == 0
+    assert pstats.Stats(str(path)).total_calls > 0
@@ -0,0 +1,70 @@
+import io
+import os
+import time
+import tracemalloc
+
+from rich.console import Console
+
+from stockcli import watch
+
+# Polls of the soak test; a whole trading day at 5s is 4680 (takes a couple of minutes):
+#   STOCKCLI_SOAK_POLLS=4680 python -m pytest tests/test_watch.py
+SOAK_POLLS = int(os.environ.get('STOCKCLI_SOAK_POLLS', 600))
+
+
+def test_polling_slows_down_when_throttled_or_closed():
+    delay, backoff = watch.next_delay(5, 1, throttled=True, closed=False)
+    assert (delay, backoff) == (10, 2)
+    for _ in range(10):
+        delay, backoff = watch.next_delay(5, backoff, throttled=True, closed=False)
+    assert delay == watch.MAX_INTERVAL
+    delay, backoff = watch.next_delay(5, backoff, throttled=False, closed=False)
+    assert delay == watch.MAX_INTERVAL / 2
+    assert watch.next_delay(5, 1, throttled=False, closed=True) == (watch.CLOSED_INTERVAL, 1)
+
+
+def test_only_changed_cells_are_updated():
+    board = watch.Board(['AAPL', 'MSFT'])
+    quotes = {'AAPL': {'regularMarketPrice': 10.0, 'regularMarketVolume': 5},
+              'MSFT': {'regularMarketPrice': 20.0, 'regularMarketVolume': 7}}
+    assert board.update(quotes) == 8
+    assert board.update(quotes) == 0
+    quotes['AAPL']['regularMarketPrice'] = 9.5
+    assert board.update(quotes) == 1
+    price = board.cells['AAPL'][1]
+    assert (price.plain, price.style) == ('9.5', 'red')
+    # The flash is cleared on the next poll
+    assert board.update(quotes) == 1 and price.style == ''
+
+
+def test_one_request_per_poll(yahoo_server):
+    console = Console(file=io.StringIO(), width=100)
+    watch.watch(['AAPL', 'MSFT', 'GOOG', 'ZZBAD'], interval=0, count=3, console=console, sleep=lambda s: None)
+    assert yahoo_server.hits['v7'] == 3
+    output = console.file.getvalue()
+    assert 'AAPL' in output and 'Market open' in output
+
+
+def test_soak(yahoo_server):
+    console = Console(file=io.StringIO(), width=100)
+    symbols = [f'S{i:03d}' for i in range(30)]
+    samples = []
+    def sleep(delay):
+        if len(samples) % (SOAK_POLLS // 6) == 0:
+            console.file.seek(0)
+            console.file.truncate()
+            samples.append((time.process_time(), tracemalloc.get_traced_memory()[0]))
+        else:
+            samples.append(None)
+    tracemalloc.start()
+    try:
+        watch.watch(symbols, interval=5, count=SOAK_POLLS, console=console, sleep=sleep)
+    finally:
+        tracemalloc.stop()
+    assert yahoo_server.hits['v7'] == SOAK_POLLS
+    checkpoints = [s for s in samples if s is not None]
+    cpu = [b[0] - a[0] for a, b in zip(checkpoints, checkpoints[1:])]
+    memory = [m for _, m in checkpoints[1:]]
+    # Flat memory and steady CPU per poll from start to close
+    assert max(memory) - min(memory) < 512 * 1024
+    assert max(cpu[-3:]) < 2 * min(cpu[:3]) + 0.05